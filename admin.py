@@ -1,13 +1,30 @@
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from datetime import date, datetime, timedelta
 import database
+import availability
+import bulk_io
+import clinic_service
+import daily_load
+import occupancy
+import reports
+from db_async import show_error
+import query_stats
+from tree_sync import KeyedTree
+
+SCHEDULE_PAGE_SIZE = 200  # rows fetched per Master Schedule page
+TAB_MAX_AGE = 60  # seconds before a tab re-queries when you switch back to it
+AUTO_STAFF = "(Auto-assign free staff)"  # bulk Verify: first free staff member per slot
 
 
 class AdminScreen(tk.Frame):
+    user_bound = True  # dropped from the view cache on logout
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self.db = controller.db
 
         # Header
         header = tk.Frame(self, bg="#222", height=50)
@@ -19,6 +36,7 @@ class AdminScreen(tk.Frame):
         # Tabs
         tabs = ttk.Notebook(self)
         tabs.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabs = tabs
 
         self.tab_sched = tk.Frame(tabs)
         self.tab_finance = tk.Frame(tabs)
@@ -26,6 +44,8 @@ class AdminScreen(tk.Frame):
         self.tab_doctors = tk.Frame(tabs)
         self.tab_staff = tk.Frame(tabs)
         self.tab_rooms = tk.Frame(tabs)
+        self.tab_load = tk.Frame(tabs)
+        self.tab_diag = tk.Frame(tabs)
 
         tabs.add(self.tab_sched, text="Master Schedule")
         tabs.add(self.tab_finance, text="Transactions")
@@ -33,17 +53,76 @@ class AdminScreen(tk.Frame):
         tabs.add(self.tab_doctors, text="Manage Doctors")
         tabs.add(self.tab_staff, text="Manage Staff")
         tabs.add(self.tab_rooms, text="Manage Rooms")
-
-        self.setup_schedule()
-        self.setup_finance()
-        self.setup_patients()
-        self.setup_doctors()
-        self.setup_staff()
-        self.setup_rooms()
+        tabs.add(self.tab_load, text="Daily Load")
+        tabs.add(self.tab_diag, text="Diagnostics")
+
+        # Tabs are built and queried the first time they are opened, not up front
+        self.tab_loaders = {
+            self.tab_sched: (self.setup_schedule, self.refresh_schedule),
+            self.tab_finance: (self.setup_finance, self.refresh_finance),
+            self.tab_patients: (self.setup_patients, self.refresh_patients),
+            self.tab_doctors: (self.setup_doctors, self.refresh_doctors),
+            self.tab_staff: (self.setup_staff, self.refresh_staff),
+            self.tab_rooms: (self.setup_rooms, self.refresh_rooms),
+            self.tab_load: (self.setup_load, self.refresh_load),
+            self.tab_diag: (self.setup_diagnostics, self.refresh_diagnostics),
+        }
+        self.tab_built = set()
+        self.tab_loaded_at = {}  # tab -> time.monotonic() of its last load; missing = never / invalidated
+        tabs.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.on_tab_changed()
 
     def logout(self):
-        from login_view import LoginScreen
-        self.controller.show_view(LoginScreen)
+        self.controller.logout()
+
+    def on_show(self):
+        # Coming back from the view cache: re-query the open tab if it has gone stale
+        self.on_tab_changed()
+
+    def on_tab_changed(self, event=None):
+        tab = self.nametowidget(self.tabs.select())
+        setup, refresh = self.tab_loaders[tab]
+        if tab not in self.tab_built:
+            setup()
+            self.tab_built.add(tab)
+        loaded_at = self.tab_loaded_at.get(tab)
+        if loaded_at is None or time.monotonic() - loaded_at > TAB_MAX_AGE:
+            self.tab_loaded_at[tab] = time.monotonic()
+            refresh()
+
+    def invalidate(self, *tabs):
+        """Marks tabs stale so they re-query next time they are opened."""
+        for tab in tabs:
+            self.tab_loaded_at.pop(tab, None)
+
+    def run_load(self, name, fetch, render, view):
+        # Query runs on a worker thread; "Loading..." only while the table is still empty
+        self.db.load(name, fetch, render, owner=self, placeholder=None if len(view) else view.tree)
+
+    def run_write(self, name, sql, params, then, error_msg=None, invalidates=()):
+        """
+        Runs one INSERT/UPDATE/DELETE on a worker, then calls then() back on the Tk thread.
+        invalidates: reference tables (see database.get_reference) the write changes.
+        """
+        self.run_work(name, lambda: database.execute_query(sql, params), then, error_msg, invalidates)
+
+    def run_delete(self, name, table, key, then, error_msg=None, invalidates=()):
+        """Like run_write, for deleting a patient/doctor/staff/room row (see daily_load.delete_owner)."""
+        def delete():
+            daily_load.delete_owner(table, key)
+            occupancy.invalidate()  # its appointments were deleted or lost their room
+
+        self.invalidate(self.tab_load, self.tab_rooms)
+        self.run_work(name, delete, then, error_msg, invalidates)
+
+    def run_work(self, name, write, then, error_msg, invalidates):
+        def work():
+            result = write()
+            database.invalidate_reference(*invalidates)
+            return result
+
+        on_error = (lambda e: messagebox.showerror("Error", error_msg)) if error_msg else None
+        self.db.submit(name, work, owner=self, on_done=lambda ok: then(), on_error=on_error)
 
     # ==========================
     # TAB 1: MASTER SCHEDULE
@@ -64,44 +143,177 @@ class AdminScreen(tk.Frame):
         # New Booking Button
         tk.Button(tools, text="+ New Booking", command=self.add_appointment_window).pack(side="right", padx=5)
 
+        # Date-range filter (pushed down into the SQL)
+        tk.Button(tools, text="Filter", command=self.apply_schedule_filter).pack(side="right", padx=5)
+        self.ent_sched_to = tk.Entry(tools, width=11)
+        self.ent_sched_to.pack(side="right")
+        tk.Label(tools, text="To:").pack(side="right")
+        self.ent_sched_from = tk.Entry(tools, width=11)
+        self.ent_sched_from.pack(side="right")
+        tk.Label(tools, text="From:").pack(side="right", padx=(15, 0))
+        self.sched_range = (None, None)
+
         cols = ("ID", "Date", "Time", "Patient", "Doctor", "Room", "Staff", "Status", "Treatment", "Notes")
-        self.tree_appt = ttk.Treeview(self.tab_sched, columns=cols, show='headings', height=15)
+        table = tk.Frame(self.tab_sched)
+        table.pack(fill="both", expand=True)
+        # Ctrl/Shift-click selects several rows for bulk Verify / Cancel
+        self.tree_appt = ttk.Treeview(table, columns=cols, show='headings', height=15, selectmode="extended")
         for c in cols: self.tree_appt.heading(c, text=c)
 
         self.tree_appt.column("ID", width=30)
         self.tree_appt.column("Room", width=50)
         self.tree_appt.column("Status", width=80)
+        self.sched_view = KeyedTree(self.tree_appt)
+        self.sched_more = False
+        self.sched_after = None
+        self.sched_loading = False
+        self.sched_token = 0  # bumped when the filter changes so late pages are ignored
+        self.sched_starts = {}  # appointment id -> startsAt of the rows shown (slot checks read this, not the time text)
+
+        # Next page loads lazily when the scrollbar nears the bottom
+        scroll = ttk.Scrollbar(table, orient="vertical", command=self.tree_appt.yview)
+        self.tree_appt.configure(yscrollcommand=lambda first, last: self.on_schedule_scroll(scroll, first, last))
+        scroll.pack(side="right", fill="y")
         self.tree_appt.pack(fill="both", expand=True)
 
+    def read_date_range(self, from_entry, to_entry):
+        """(from, to) text of two date entries, blank = open-ended; None after an error message."""
+        bounds = []
+        for entry in (from_entry, to_entry):
+            text = entry.get().strip()
+            if text:
+                try:
+                    datetime.strptime(text, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showerror("Format Error", "Date must be YYYY-MM-DD")
+                    return None
+            bounds.append(text or None)
+        return tuple(bounds)
+
+    def apply_schedule_filter(self):
+        bounds = self.read_date_range(self.ent_sched_from, self.ent_sched_to)
+        if bounds is None: return
+        self.sched_range = bounds
+        self.sched_view.clear()  # different range: start again from the first page
+        self.sched_token += 1
+        self.sched_loading = False
         self.refresh_schedule()
 
+    def on_schedule_scroll(self, scroll, first, last):
+        scroll.set(first, last)
+        if float(last) >= 0.95 and self.sched_more:
+            self.load_schedule_page()
+
     def refresh_schedule(self):
-        for i in self.tree_appt.get_children(): self.tree_appt.delete(i)
-        rows = database.fetch_all("""
-            SELECT a.id, a.appointmentDate, a.appointmentTime, p.patientName, d.doctorName, 
+        # Re-read what is on screen (at least one page) and diff it into the tree in place
+        limit, date_range, token = max(SCHEDULE_PAGE_SIZE, len(self.sched_view)), self.sched_range, self.sched_token
+        self.run_load("refresh_schedule", lambda: self.fetch_schedule_page(date_range, None, limit),
+                      lambda rows: self.show_schedule_page(rows, limit, token, self.sched_view.sync),
+                      self.sched_view)
+
+    def load_schedule_page(self):
+        if self.sched_loading: return
+        self.sched_loading = True
+        date_range, after, token = self.sched_range, self.sched_after, self.sched_token
+
+        def failed(error):
+            self.sched_loading = False
+            messagebox.showerror("Database Error", str(error))
+
+        self.db.submit("load_schedule_page", self.fetch_schedule_page, date_range, after, SCHEDULE_PAGE_SIZE,
+                       owner=self, on_error=failed,
+                       on_done=lambda rows: self.show_schedule_page(rows, SCHEDULE_PAGE_SIZE, token,
+                                                                    self.sched_view.append))
+
+    def show_schedule_page(self, rows, limit, token, apply):
+        self.sched_loading = False
+        if token != self.sched_token: return
+        # keyset: (appointmentDate, id) of the last row shown
+        self.sched_more = len(rows) == limit
+        if rows:
+            self.sched_after = (rows[-1]['appointmentDate'], rows[-1]['id'])
+        apply(self.schedule_rows(rows))
+
+    def fetch_schedule_page(self, date_range, after, limit):
+        # Runs on a worker thread: no Tk calls in here
+        conds, params = [], []
+        date_from, date_to = date_range
+        if date_from:
+            conds.append("a.appointmentDate >= %s")
+            params.append(date_from)
+        if date_to:
+            conds.append("a.appointmentDate <= %s")
+            params.append(date_to)
+        if after:
+            last_date, last_id = after
+            conds.append("(a.appointmentDate < %s OR (a.appointmentDate = %s AND a.id < %s))")
+            params += [last_date, last_date, last_id]
+        where = ("WHERE " + " AND ".join(conds)) if conds else ""
+
+        rows = database.fetch_all(f"""
+            SELECT a.id, a.appointmentDate, a.appointmentTime, a.startsAt, p.patientName, d.doctorName, 
                    a.roomNumber, a.appointmentStatus, t.treatment, a.doctorNotes, s.staffName
             FROM appointment a 
             JOIN patient p ON a.patientID=p.patientID 
             JOIN doctor d ON a.doctorID=d.doctorID
             LEFT JOIN treatment t ON a.treatmentID=t.treatmentID
             LEFT JOIN staff s ON a.staffID=s.staffID
-            ORDER BY a.appointmentDate DESC
-        """)
+            {where}
+            ORDER BY a.appointmentDate DESC, a.id DESC
+            LIMIT %s
+        """, (*params, limit))
+        return rows
+
+    def schedule_rows(self, rows):
         for r in rows:
+            self.sched_starts[r['id']] = r['startsAt']
             treat = r['treatment'] if r['treatment'] else "-"
             note = r['doctorNotes'] if r['doctorNotes'] else "-"
             room = r['roomNumber'] if r['roomNumber'] else "-"
             staff = r['staffName'] if r['staffName'] else "Unassigned"
-            self.tree_appt.insert("", "end", values=(
+            yield r['id'], (
                 r['id'], r['appointmentDate'], r['appointmentTime'], r['patientName'],
                 r['doctorName'], room, staff, r['appointmentStatus'], treat, note
-            ))
+            )
 
     # ==========================
-    # TAB 2: TRANSACTIONS (Updated with Date)
+    # TAB 2: TRANSACTIONS (revenue summary from reports.py + newest payments)
     # ==========================
     def setup_finance(self):
-        tk.Label(self.tab_finance, text="Payment History", font=("Arial", 12, "bold")).pack(pady=10)
+        tools = tk.Frame(self.tab_finance, pady=10)
+        tools.pack(fill="x")
+        tk.Label(tools, text="From:").pack(side="left", padx=(5, 0))
+        self.ent_fin_from = tk.Entry(tools, width=11)
+        self.ent_fin_from.insert(0, str(date.today() - timedelta(days=365)))
+        self.ent_fin_from.pack(side="left")
+        tk.Label(tools, text="To:").pack(side="left")
+        self.ent_fin_to = tk.Entry(tools, width=11)
+        self.ent_fin_to.pack(side="left")
+        tk.Label(tools, text="Group by:").pack(side="left", padx=(15, 0))
+        self.cb_fin_by = ttk.Combobox(tools, values=list(reports.GROUPINGS), width=10, state="readonly")
+        self.cb_fin_by.set("month")
+        self.cb_fin_by.pack(side="left")
+        self.cb_fin_by.bind("<<ComboboxSelected>>", lambda e: self.apply_finance_filter())
+        tk.Button(tools, text="Apply", command=self.apply_finance_filter).pack(side="left", padx=5)
+        tk.Button(tools, text="Export CSV", command=self.export_finance).pack(side="right", padx=5)
+        self.fin_range = (self.ent_fin_from.get(), None)
+
+        # Summary panel: totals for the range + one row per group
+        summary = tk.LabelFrame(self.tab_finance, text="Revenue Summary", padx=5, pady=5)
+        summary.pack(fill="x", padx=5)
+        self.lbl_fin_total = tk.Label(summary, text="", font=("Arial", 10, "bold"), anchor="w")
+        self.lbl_fin_total.pack(fill="x")
+        cols = ("Group", "Payments", "Paid", "Outstanding", "Cancelled")
+        self.tree_fin_sum = ttk.Treeview(summary, columns=cols, show='headings', height=8)
+        for c in cols:
+            self.tree_fin_sum.heading(c, text=c)
+            self.tree_fin_sum.column(c, width=100, anchor="e")
+        self.tree_fin_sum.column("Group", width=220, anchor="w")
+        self.tree_fin_sum.pack(fill="x")
+        self.fin_sum_view = KeyedTree(self.tree_fin_sum)
+
+        tk.Label(self.tab_finance, text=f"Payment History (newest {reports.HISTORY_LIMIT} in range)",
+                 font=("Arial", 12, "bold")).pack(pady=(10, 5))
 
         # Columns: Added "Trans. Date"
         cols = ("Pay ID", "Trans. Date", "Patient", "Amount", "Status")
@@ -116,22 +328,34 @@ class AdminScreen(tk.Frame):
         self.tree_fin.column("Status", width=80)
 
         self.tree_fin.pack(fill="both", expand=True)
+        self.fin_view = KeyedTree(self.tree_fin)
+
+    def apply_finance_filter(self):
+        bounds = self.read_date_range(self.ent_fin_from, self.ent_fin_to)
+        if bounds is None: return
+        self.fin_range = bounds
+        self.fin_sum_view.clear()  # different groups: no point diffing against the old ones
         self.refresh_finance()
 
     def refresh_finance(self):
-        # Clear the table first
-        for i in self.tree_fin.get_children(): self.tree_fin.delete(i)
-
-        # 1. FETCH BOTH DATES (paymentDate AND appointmentDate)
-        rows = database.fetch_all("""
-            SELECT pay.paymentID, pay.paymentDate, a.appointmentDate, 
-                   pt.patientName, pay.paymentAmount, pay.paymentStatus
-            FROM payment pay 
-            JOIN appointment a ON pay.paymentID = a.paymentID
-            JOIN patient pt ON a.patientID = pt.patientID 
-            ORDER BY pay.paymentID DESC
-        """)
-
+        by, (date_from, date_to) = self.cb_fin_by.get(), self.fin_range
+        self.run_load("finance_summary", lambda: reports.revenue(by, date_from, date_to),
+                      lambda result: self.show_finance_summary(by, *result), self.fin_sum_view)
+        self.run_load("refresh_finance", self.fetch_finance, self.show_finance, self.fin_view)
+
+    def fetch_finance(self):
+        return reports.payment_history(*self.fin_range)
+
+    def show_finance_summary(self, by, groups, total):
+        self.lbl_fin_total.config(
+            text=f"{total['payments']} payments    Paid ${total['paid']:,.2f}    "
+                 f"Outstanding ${total['outstanding']:,.2f}    Cancelled {int(total['cancelled'])}")
+        self.fin_sum_view.sync((g['grp'], (g['grp'], g['payments'], f"${g['paid']:,.2f}",
+                                           f"${g['outstanding']:,.2f}", int(g['cancelled'])))
+                               for g in groups)
+
+    def show_finance(self, rows):
+        view = []
         for r in rows:
             # 2. THE FALLBACK LOGIC
             # If paymentDate exists, use it. If not, use appointmentDate.
@@ -140,13 +364,22 @@ class AdminScreen(tk.Frame):
             else:
                 display_date = f"{r['appointmentDate']} (Est.)"
 
-            self.tree_fin.insert("", "end", values=(
+            view.append((r['paymentID'], (
                 r['paymentID'],
                 display_date,            # Shows the calculated date
                 r['patientName'],
                 f"${r['paymentAmount']}",
                 r['paymentStatus']
-            ))
+            )))
+        self.fin_view.sync(view)
+
+    def export_finance(self):
+        path = filedialog.asksaveasfilename(title="Export Payments", defaultextension=".csv",
+                                            initialfile="payments.csv", filetypes=[("CSV files", "*.csv")])
+        if not path: return
+        self.db.submit("export_payments", reports.export_payments, path, *self.fin_range, owner=self,
+                       on_done=lambda n: messagebox.showinfo("Export", f"{n} payments written to {path}"),
+                       on_error=lambda e: messagebox.showerror("Export Failed", str(e)))
 
     # ==========================
     # TAB 3: PATIENTS
@@ -167,30 +400,32 @@ class AdminScreen(tk.Frame):
 
         tk.Button(form, text="Add", bg="#333", fg="white", command=self.add_patient).pack(side="left", padx=10)
         tk.Button(form, text="Remove", bg="red", fg="white", command=self.del_patient).pack(side="left")
+        self.add_csv_buttons(form, 'patient', self.tab_patients)
 
         self.tree_pat = ttk.Treeview(self.tab_patients, columns=("ID", "Name", "Gender", "Phone"), show='headings')
         for c in ("ID", "Name", "Gender", "Phone"): self.tree_pat.heading(c, text=c)
         self.tree_pat.pack(fill="both", expand=True)
-        self.refresh_patients()
+        self.pat_view = KeyedTree(self.tree_pat)
 
     def refresh_patients(self):
-        for i in self.tree_pat.get_children(): self.tree_pat.delete(i)
-        for r in database.fetch_all("SELECT * FROM patient"):
-            self.tree_pat.insert("", "end",
-                                 values=(r['patientID'], r['patientName'], r['patientGender'], r['patientPhoneNumber']))
+        self.run_load("refresh_patients", lambda: database.fetch_all("SELECT * FROM patient"),
+                      lambda rows: self.pat_view.sync(
+                          (r['patientID'], (r['patientID'], r['patientName'], r['patientGender'], r['patientPhoneNumber']))
+                          for r in rows),
+                      self.pat_view)
 
     def add_patient(self):
-        database.execute_query(
-            "INSERT INTO patient (patientName, patientGender, patientBirthDate, patientPhoneNumber) VALUES (%s, %s, %s, %s)",
-            (self.ent_p_name.get(), self.ent_p_gen.get(), self.ent_p_dob.get(), self.ent_p_phone.get()))
-        self.refresh_patients()
+        self.run_write("add_patient",
+                       "INSERT INTO patient (patientName, patientGender, patientBirthDate, patientPhoneNumber) VALUES (%s, %s, %s, %s)",
+                       (self.ent_p_name.get(), self.ent_p_gen.get(), self.ent_p_dob.get(), self.ent_p_phone.get()),
+                       self.refresh_patients)
 
     def del_patient(self):
         pid = self.get_sel_id(self.tree_pat)
-        if pid and database.execute_query("DELETE FROM patient WHERE patientID=%s", (pid,)):
-            self.refresh_patients()
-        else:
-            messagebox.showerror("Error", "Cannot delete: Patient has records.")
+        if not pid:
+            return messagebox.showerror("Error", "Cannot delete: Patient has records.")
+        self.run_delete("del_patient", 'patient', pid, self.refresh_patients,
+                        error_msg="Cannot delete: Patient has records.")
 
     # ==========================
     # TAB 4: DOCTORS
@@ -212,31 +447,36 @@ class AdminScreen(tk.Frame):
 
         tk.Button(form, text="Add", bg="#333", fg="white", command=self.add_doctor).pack(side="left", padx=10)
         tk.Button(form, text="Remove", bg="red", fg="white", command=self.del_doctor).pack(side="left")
+        self.add_csv_buttons(form, 'doctor', self.tab_doctors)
 
         self.tree_doc = ttk.Treeview(self.tab_doctors, columns=("ID", "Name", "Spec", "Room"), show='headings')
         for c in ("ID", "Name", "Spec", "Room"): self.tree_doc.heading(c, text=c)
         self.tree_doc.pack(fill="both", expand=True)
-        self.refresh_doctors()
+        self.doc_view = KeyedTree(self.tree_doc)
 
     def refresh_doctors(self):
-        rooms = database.fetch_all("SELECT roomNumber FROM room")
-        self.cb_d_room['values'] = [r['roomNumber'] for r in rooms]
-        for i in self.tree_doc.get_children(): self.tree_doc.delete(i)
-        for r in database.fetch_all("SELECT * FROM doctor"):
-            self.tree_doc.insert("", "end",
-                                 values=(r['doctorID'], r['doctorName'], r['doctorSpecialty'], r['assignedRoom']))
+        def fetch():
+            return database.get_room_numbers(), database.get_doctors()
+
+        def show(result):
+            rooms, doctors = result
+            self.cb_d_room['values'] = rooms
+            self.doc_view.sync((r['doctorID'], (r['doctorID'], r['doctorName'], r['doctorSpecialty'], r['assignedRoom']))
+                               for r in doctors)
+
+        self.run_load("refresh_doctors", fetch, show, self.doc_view)
 
     def add_doctor(self):
-        database.execute_query("INSERT INTO doctor (doctorName, doctorSpecialty, assignedRoom) VALUES (%s, %s, %s)",
-                               (self.ent_d_name.get(), self.ent_d_spec.get(), self.cb_d_room.get()))
-        self.refresh_doctors()
+        self.run_write("add_doctor", "INSERT INTO doctor (doctorName, doctorSpecialty, assignedRoom) VALUES (%s, %s, %s)",
+                       (self.ent_d_name.get(), self.ent_d_spec.get(), self.cb_d_room.get()), self.refresh_doctors,
+                       invalidates=('doctor',))
 
     def del_doctor(self):
         did = self.get_sel_id(self.tree_doc)
-        if did and database.execute_query("DELETE FROM doctor WHERE doctorID=%s", (did,)):
-            self.refresh_doctors()
-        else:
-            messagebox.showerror("Error", "Cannot delete: Doctor has records.")
+        if not did:
+            return messagebox.showerror("Error", "Cannot delete: Doctor has records.")
+        self.run_delete("del_doctor", 'doctor', did, self.refresh_doctors,
+                        error_msg="Cannot delete: Doctor has records.", invalidates=('doctor',))
 
     # ==========================
     # TAB 5: STAFF
@@ -252,27 +492,27 @@ class AdminScreen(tk.Frame):
         self.ent_s_role.pack(side="left", padx=5)
         tk.Button(form, text="Add", bg="#333", fg="white", command=self.add_staff).pack(side="left", padx=10)
         tk.Button(form, text="Remove", bg="red", fg="white", command=self.del_staff).pack(side="left")
+        self.add_csv_buttons(form, 'staff', self.tab_staff)
 
         self.tree_staff = ttk.Treeview(self.tab_staff, columns=("ID", "Name", "Role"), show='headings')
         for c in ("ID", "Name", "Role"): self.tree_staff.heading(c, text=c)
         self.tree_staff.pack(fill="both", expand=True)
-        self.refresh_staff()
+        self.staff_view = KeyedTree(self.tree_staff)
 
     def refresh_staff(self):
-        for i in self.tree_staff.get_children(): self.tree_staff.delete(i)
-        for r in database.fetch_all("SELECT * FROM staff"):
-            self.tree_staff.insert("", "end", values=(r['staffID'], r['staffName'], r['staffRole']))
+        self.run_load("refresh_staff", database.get_staff,
+                      lambda rows: self.staff_view.sync(
+                          (r['staffID'], (r['staffID'], r['staffName'], r['staffRole'])) for r in rows),
+                      self.staff_view)
 
     def add_staff(self):
-        database.execute_query("INSERT INTO staff (staffName, staffRole) VALUES (%s, %s)",
-                               (self.ent_s_name.get(), self.ent_s_role.get()))
-        self.refresh_staff()
+        self.run_write("add_staff", "INSERT INTO staff (staffName, staffRole) VALUES (%s, %s)",
+                       (self.ent_s_name.get(), self.ent_s_role.get()), self.refresh_staff, invalidates=('staff',))
 
     def del_staff(self):
         sid = self.get_sel_id(self.tree_staff)
         if sid:
-            database.execute_query("DELETE FROM staff WHERE staffID=%s", (sid,))
-            self.refresh_staff()
+            self.run_delete("del_staff", 'staff', sid, self.refresh_staff, invalidates=('staff',))
 
     # ==========================
     # TAB 6: ROOMS
@@ -285,27 +525,139 @@ class AdminScreen(tk.Frame):
         self.ent_room.pack(side="left", padx=5)
         tk.Button(form, text="Add", bg="#333", fg="white", command=self.add_room).pack(side="left", padx=10)
         tk.Button(form, text="Remove", bg="red", fg="white", command=self.del_room).pack(side="left")
+        self.add_csv_buttons(form, 'room', self.tab_rooms)
 
-        self.tree_room = ttk.Treeview(self.tab_rooms, columns=("Number", "Status"), show='headings')
-        for c in ("Number", "Status"): self.tree_room.heading(c, text=c)
+        # State right now, derived from today's bookings (occupancy.py); roomStatus only marks Maintenance
+        cols = ("Number", "Status", "Until", "Next Booking", "Booked Today")
+        self.tree_room = ttk.Treeview(self.tab_rooms, columns=cols, show='headings')
+        for c in cols: self.tree_room.heading(c, text=c)
         self.tree_room.pack(fill="both", expand=True)
-        self.refresh_rooms()
+        self.room_view = KeyedTree(self.tree_room)
 
     def refresh_rooms(self):
-        for i in self.tree_room.get_children(): self.tree_room.delete(i)
-        for r in database.fetch_all("SELECT * FROM room"):
-            self.tree_room.insert("", "end", values=(r['roomNumber'], r['roomStatus']))
+        self.run_load("refresh_rooms", occupancy.room_states,
+                      lambda rows: self.room_view.sync((r['roomNumber'], (
+                          r['roomNumber'], r['state'], f"{r['until']:%H:%M}" if r['until'] else "-",
+                          f"{r['next_slot']:%H:%M}" if r['next_slot'] else "-",
+                          f"{r['booked']}/{len(availability.SLOTS)}")) for r in rows),
+                      self.room_view)
 
     def add_room(self):
-        database.execute_query("INSERT INTO room (roomNumber, roomStatus) VALUES (%s, 'Available')",
-                               (self.ent_room.get(),))
-        self.refresh_rooms()
+        self.invalidate(self.tab_doctors)  # room dropdown on the Doctors tab
+        self.run_write("add_room", "INSERT INTO room (roomNumber, roomStatus) VALUES (%s, 'Available')",
+                       (self.ent_room.get(),), self.refresh_rooms, invalidates=('room',))
 
     def del_room(self):
         rid = self.get_sel_id(self.tree_room)
         if rid:
-            database.execute_query("DELETE FROM room WHERE roomNumber=%s", (rid,))
-            self.refresh_rooms()
+            self.invalidate(self.tab_doctors)
+            self.run_delete("del_room", 'room', rid, self.refresh_rooms, invalidates=('room', 'doctor'))
+
+    # ==========================
+    # TAB 7: DAILY LOAD (summary tables from daily_load.py, never a scan of appointment)
+    # ==========================
+    def setup_load(self):
+        tools = tk.Frame(self.tab_load, pady=10)
+        tools.pack(fill="x")
+        tk.Label(tools, text="From:").pack(side="left", padx=(5, 0))
+        self.ent_load_from = tk.Entry(tools, width=11)
+        self.ent_load_from.insert(0, str(date.today()))
+        self.ent_load_from.pack(side="left")
+        tk.Label(tools, text="To:").pack(side="left")
+        self.ent_load_to = tk.Entry(tools, width=11)
+        self.ent_load_to.insert(0, str(date.today() + timedelta(days=6)))
+        self.ent_load_to.pack(side="left")
+        tk.Button(tools, text="Apply", command=self.apply_load_filter).pack(side="left", padx=5)
+        self.load_range = (self.ent_load_from.get(), self.ent_load_to.get())
+
+        cols = ("Name", "Pending", "Scheduled", "Completed", "Cancelled", "Utilisation")
+        self.load_views = {}
+        for view, title in (('doctor', "Doctors"), ('room', "Rooms"), ('staff', "Staff")):
+            tk.Label(self.tab_load, text=title, font=("Arial", 10, "bold")).pack(anchor="w", pady=(5, 0))
+            tree = ttk.Treeview(self.tab_load, columns=cols, show='headings', height=6)
+            for c in cols:
+                tree.heading(c, text=c)
+                tree.column(c, width=90, anchor="e")
+            tree.column("Name", width=220, anchor="w")
+            tree.pack(fill="both", expand=True)
+            self.load_views[view] = KeyedTree(tree)
+
+    def apply_load_filter(self):
+        date_from, date_to = [e.get().strip() for e in (self.ent_load_from, self.ent_load_to)]
+        try:
+            if datetime.strptime(date_from, "%Y-%m-%d") > datetime.strptime(date_to, "%Y-%m-%d"):
+                return messagebox.showerror("Error", "'From' must not be after 'To'.")
+        except ValueError:
+            return messagebox.showerror("Format Error", "Date must be YYYY-MM-DD")
+        self.load_range = (date_from, date_to)
+        self.refresh_load()
+
+    def refresh_load(self):
+        date_from, date_to = self.load_range
+        for view, keyed in self.load_views.items():
+            self.run_load(f"daily_load_{view}", lambda view=view: daily_load.load(view, date_from, date_to),
+                          lambda rows, keyed=keyed: keyed.sync((r['id'], (
+                              r['name'], r['pending'], r['scheduled'], r['completed'], r['cancelled'],
+                              f"{r['utilisation']:.0%}")) for r in rows),
+                          keyed)
+
+    # ==========================
+    # TAB 8: DIAGNOSTICS (query_stats.py)
+    # ==========================
+    def setup_diagnostics(self):
+        tools = tk.Frame(self.tab_diag, pady=10)
+        tools.pack(fill="x")
+        tk.Button(tools, text="Refresh", command=self.refresh_diagnostics).pack(side="left", padx=5)
+        tk.Button(tools, text="Reset", command=self.reset_diagnostics).pack(side="left", padx=5)
+        tk.Button(tools, text="Save Report...", command=self.save_diagnostics).pack(side="left", padx=5)
+        stats = query_stats.stats
+        tk.Label(tools, fg="#555", text=f"Slow-query log (>= {stats.slow_ms} ms): {stats.slow_log}").pack(
+            side="left", padx=20)
+
+        # What each screen action costs: round trips and time spent in the database
+        tk.Label(self.tab_diag, text="Operations", font=("Arial", 10, "bold")).pack(anchor="w")
+        cols = ("Operation", "Calls", "Avg Trips", "Max Trips", "DB ms", "Avg ms", "p95 ms", "p99 ms")
+        self.tree_ops = ttk.Treeview(self.tab_diag, columns=cols, show='headings', height=8)
+        for c in cols:
+            self.tree_ops.heading(c, text=c)
+            self.tree_ops.column(c, width=80, anchor="e")
+        self.tree_ops.column("Operation", width=260, anchor="w")
+        self.tree_ops.pack(fill="x")
+        self.ops_view = KeyedTree(self.tree_ops)
+
+        tk.Label(self.tab_diag, text="Statements", font=("Arial", 10, "bold")).pack(anchor="w", pady=(10, 0))
+        cols = ("Statement", "Calls", "Avg ms", "p95 ms", "p99 ms", "Max ms", "Rows", "Acquire ms", "Caller")
+        self.tree_queries = ttk.Treeview(self.tab_diag, columns=cols, show='headings')
+        for c in cols:
+            self.tree_queries.heading(c, text=c)
+            self.tree_queries.column(c, width=70, anchor="e")
+        self.tree_queries.column("Statement", width=420, anchor="w")
+        self.tree_queries.column("Caller", width=220, anchor="w")
+        self.tree_queries.pack(fill="both", expand=True)
+        self.queries_view = KeyedTree(self.tree_queries)
+
+    def refresh_diagnostics(self):
+        # In-memory numbers, no query: always re-read when the tab is opened
+        self.invalidate(self.tab_diag)
+        self.ops_view.sync((o['operation'], (
+            o['operation'], o['calls'], f"{o['avg_round_trips']:.1f}", o['max_round_trips'],
+            f"{o['avg_db_ms']:.1f}", f"{o['avg_ms']:.1f}", f"{o['p95_ms']:.1f}", f"{o['p99_ms']:.1f}"))
+            for o in query_stats.stats.operation_rows())
+        self.queries_view.sync((q['fingerprint'], (
+            " ".join(q['fingerprint'].split())[:200], q['calls'], f"{q['avg_ms']:.1f}", f"{q['p95_ms']:.1f}",
+            f"{q['p99_ms']:.1f}", f"{q['max_ms']:.1f}", f"{q['avg_rows']:.0f}", f"{q['avg_acquire_ms']:.1f}",
+            q['callers'][0][0] if q['callers'] else "-"))
+            for q in query_stats.stats.query_rows())
+
+    def reset_diagnostics(self):
+        query_stats.stats.reset()
+        self.refresh_diagnostics()
+
+    def save_diagnostics(self):
+        path = filedialog.asksaveasfilename(title="Save Query Report", defaultextension=".txt",
+                                            initialfile="query_report.txt", filetypes=[("Text files", "*.txt")])
+        if path:
+            query_stats.stats.dump(path)
 
     # ==========================
     # CORE ACTIONS (Logic)
@@ -314,6 +666,36 @@ class AdminScreen(tk.Frame):
         sel = tree.selection()
         return tree.item(sel[0])['values'][0] if sel else None
 
+    # --- BULK CSV IMPORT / EXPORT (see bulk_io.py) ---
+    def add_csv_buttons(self, form, table, tab):
+        tk.Button(form, text="Import CSV", command=lambda: self.import_table(table, tab)).pack(side="left", padx=(20, 2))
+        tk.Button(form, text="Export CSV", command=lambda: self.export_table(table)).pack(side="left")
+
+    def import_table(self, table, tab):
+        path = filedialog.askopenfilename(title=f"Import {table} CSV", filetypes=[("CSV files", "*.csv")])
+        if not path: return
+
+        def done(result):
+            self.invalidate(tab)
+            if table == 'room':
+                self.invalidate(self.tab_doctors)  # room dropdown on the Doctors tab
+            self.on_tab_changed()
+            errors = "\n".join(f"line {line}: {error}" for line, error in result.errors[:15])
+            more = f"\n... {len(result.errors) - 15} more" if len(result.errors) > 15 else ""
+            show = messagebox.showwarning if result.errors else messagebox.showinfo
+            show("Import", result.summary() + (f"\n\n{errors}{more}" if errors else ""))
+
+        self.db.submit(f"import_{table}", bulk_io.import_csv, table, path, owner=self, on_done=done,
+                       on_error=lambda e: messagebox.showerror("Import Failed", str(e)))
+
+    def export_table(self, table):
+        path = filedialog.asksaveasfilename(title=f"Export {table} CSV", defaultextension=".csv",
+                                            initialfile=f"{table}.csv", filetypes=[("CSV files", "*.csv")])
+        if not path: return
+        self.db.submit(f"export_{table}", bulk_io.export_csv, table, path, owner=self,
+                       on_done=lambda n: messagebox.showinfo("Export", f"{n} {table} rows written to {path}"),
+                       on_error=lambda e: messagebox.showerror("Export Failed", str(e)))
+
     # --- ADD APPOINTMENT POPUP (Includes Validation & Reschedule logic) ---
     def add_appointment_window(self, block_date=None, block_time=None):
         top = tk.Toplevel(self)
@@ -333,108 +715,145 @@ class AdminScreen(tk.Frame):
         e_pid = make_field("Patient ID:")
         e_did = make_field("Doctor ID:")
         e_date = make_field("Date (YYYY-MM-DD):")
-        e_time = make_field("Time (HH:MM):")
 
-        def save_new_booking():
-            pid, did, date, time = e_pid.get(), e_did.get(), e_date.get(), e_time.get()
-            if not (pid and did and date and time):
-                return messagebox.showerror("Error", "All fields are required!", parent=top)
+        tk.Label(top, text="Time (HH:MM):").pack()
+        e_time = ttk.Combobox(top, width=18)
+        e_time.pack()
 
-            # --- VALIDATION: Prevent Past Dates ---
+        def show_open_slots(event=None):
+            # One range query for the doctor's day instead of probing each slot
             try:
-                input_date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-                today = datetime.now().date()
-                if input_date_obj < today:
-                    return messagebox.showerror("Logic Error", "Cannot book an appointment in the past!", parent=top)
+                did = int(e_did.get())
+                day = datetime.strptime(e_date.get(), "%Y-%m-%d").date()
             except ValueError:
-                return messagebox.showerror("Format Error", "Date must be YYYY-MM-DD", parent=top)
-            # --------------------------------------
-
-            # --- VALIDATION: Reschedule Restriction (Block old slot) ---
-            if block_date and block_time:
-                # Basic string comparison to prevent exact rebooking
-                if str(date) == str(block_date) and str(time) == str(block_time):
-                    return messagebox.showerror(
-                        "Reschedule Error",
-                        f"You cannot reschedule to the same slot ({date} at {time}).\nPlease pick a different time.",
-                        parent=top
-                    )
-            # -----------------------------------------------------------
-
-            # Insert Booking (Status: Pending)
-            database.execute_query("""
-                INSERT INTO appointment (appointmentDate, appointmentTime, appointmentStatus, 
-                                         patientID, doctorID, paymentID, staffID)
-                VALUES (%s, %s, 'Pending', %s, %s, NULL, NULL)
-            """, (date, time, pid, did))
-
-            # Generate Payment Record (WITH DATE) & Link it
-            last_id = database.fetch_all("SELECT MAX(id) as mid FROM appointment")[0]['mid']
-
-            # --- UPDATED INSERT: Uses CURDATE() ---
-            database.execute_query("""
-                INSERT INTO payment (paymentAmount, paymentStatus, paymentDate, appointmentID) 
-                VALUES (0, 'Pending', CURDATE(), %s)
-            """, (last_id,))
-
-            # Link back (Redundant safety, but good to keep)
-            database.execute_query("UPDATE appointment SET paymentID=(SELECT MAX(paymentID) FROM payment) WHERE id=%s",
-                                   (last_id,))
-
-            messagebox.showinfo("Success", "New appointment created!\nPlease VERIFY it to assign a room.", parent=top)
-            self.refresh_schedule()
-            top.destroy()
+                return
+            self.db.submit("doctor_availability", availability.doctor_availability, did, day, owner=top,
+                           on_done=lambda grid: e_time.configure(
+                               values=[s.strftime("%H:%M") for s in grid.free_slots(day)]))
+
+        e_time.bind("<FocusIn>", show_open_slots)
+
+        def save_new_booking():
+            # Validation (required fields, past dates, the slot being rescheduled away from) lives in clinic_service
+            blocked = (block_date, block_time) if block_date and block_time else None
+
+            def done(_):
+                messagebox.showinfo("Success", "New appointment created!\nPlease VERIFY it to assign a room.", parent=top)
+                self.invalidate(self.tab_finance, self.tab_load)
+                self.refresh_schedule()
+                top.destroy()
+
+            self.db.submit("save_new_booking", clinic_service.create_booking,
+                           e_pid.get(), e_did.get(), e_date.get(), e_time.get(), blocked,
+                           owner=top, on_done=done, on_error=lambda e: show_error(e, parent=top))
 
         tk.Button(top, text="Confirm Booking", bg="green", fg="white", command=save_new_booking).pack(pady=20)
 
+    def selected_appointments(self, refuse):
+        """
+        (id, date, time) of the selected schedule rows. refuse(status) returns an error
+        message for rows the action does not apply to; those are left out, and if that
+        leaves nothing the first message is shown.
+        """
+        picked, errors = [], []
+        for iid in self.tree_appt.selection():
+            values = self.tree_appt.item(iid)['values']
+            error = refuse(values[7])
+            if error:
+                errors.append(error)
+            else:
+                picked.append((values[0], values[1], values[2]))
+        if not picked and errors:
+            messagebox.showerror("Error", errors[0])
+        return picked
+
+    def report_skipped(self, title, done, skipped):
+        """Result of a bulk action; skipped is {id: error} from clinic_service."""
+        if not skipped:
+            return
+        lines = "\n".join(f"#{aid}: {error}" for aid, error in list(skipped.items())[:15])
+        messagebox.showwarning(title, f"{done} done, {len(skipped)} skipped:\n\n{lines}")
+
     # --- VERIFY & SCHEDULE ---
     def verify_window(self):
-        sel = self.tree_appt.selection()
-        if not sel: return
-
-        item = self.tree_appt.item(sel[0])
-        status = item['values'][7]
-        if status in ['Cancelled', 'Completed']:
-            return messagebox.showerror("Error", f"Appointment is {status}.")
-
-        self.ver_id = item['values'][0]
-        date, time = item['values'][1], item['values'][2]
+        picked = self.selected_appointments(
+            lambda status: f"Appointment is {status}." if status in ['Cancelled', 'Completed'] else None)
+        if not picked: return
 
+        self.ver_ids = [aid for aid, _, _ in picked]
         self.win = tk.Toplevel(self)
-        self.win.title("Assign Staff")
+        self.win.title("Assign Staff" if len(picked) == 1 else f"Assign Staff ({len(picked)} appointments)")
         tk.Label(self.win, text="Select Staff:", font=("bold")).pack(pady=10)
 
-        avail_staff = database.get_available_staff(date, time)
-        self.staff_map = {f"{s['staffName']} ({s['staffRole']})": s['staffID'] for s in avail_staff}
-
-        self.cb_staff = ttk.Combobox(self.win, values=list(self.staff_map.keys()), width=30)
+        self.staff_map = {}
+        self.cb_staff = ttk.Combobox(self.win, values=["Loading..."], width=30)
         self.cb_staff.pack(pady=5)
         tk.Button(self.win, text="Confirm", bg="green", fg="white", command=self.confirm_verify).pack(pady=10)
 
+        def show_staff(avail_staff):
+            self.staff_map = {f"{s['staffName']} ({s['staffRole']})": s['staffID'] for s in avail_staff}
+            if len(picked) > 1:
+                self.staff_map = {AUTO_STAFF: None, **self.staff_map}
+            self.cb_staff['values'] = list(self.staff_map.keys())
+
+        starts_at = self.sched_starts.get(picked[0][0])
+        if len(picked) == 1 and starts_at is not None:
+            self.db.submit("get_available_staff", database.get_available_staff, starts_at,
+                           owner=self.win, on_done=show_staff)
+        else:
+            # Several slots (or one with no startsAt): offer everyone, clinic_service checks each slot
+            self.db.submit("get_staff", database.get_staff, owner=self.win, on_done=show_staff)
+
     def confirm_verify(self):
-        if not self.cb_staff.get(): return messagebox.showerror("Error", "Select Staff")
+        if self.cb_staff.get() not in self.staff_map: return messagebox.showerror("Error", "Select Staff")
         sid = self.staff_map[self.cb_staff.get()]
-        database.execute_query("UPDATE appointment SET appointmentStatus='Scheduled', staffID=%s WHERE id=%s",
-                               (sid, self.ver_id))
-        self.win.destroy()
-        self.refresh_schedule()
+        win = self.win
 
-    # --- CANCEL APPOINTMENT ---
-    def cancel_appointment(self):
-        aid = self.get_sel_id(self.tree_appt)
-        if not aid: return
+        if len(self.ver_ids) == 1:
+            def done(_):
+                win.destroy()
+                self.invalidate(self.tab_load)
+                self.refresh_schedule()
 
-        status = self.tree_appt.item(self.tree_appt.selection()[0])['values'][7]
-        if status in ['Cancelled', 'Completed']:
-            return messagebox.showerror("Error", f"Cannot cancel {status} visit.")
-
-        if messagebox.askyesno("Confirm", "Cancel this appointment?"):
-            rows = database.fetch_all("SELECT roomNumber FROM appointment WHERE id=%s", (aid,))
-            if rows and rows[0]['roomNumber']:
-                database.execute_query("UPDATE room SET roomStatus='Available' WHERE roomNumber=%s",
-                                       (rows[0]['roomNumber'],))
-            database.execute_query("UPDATE appointment SET appointmentStatus='Cancelled' WHERE id=%s", (aid,))
+            return self.db.submit("confirm_verify", clinic_service.verify_appointment, self.ver_ids[0], sid,
+                                  owner=win, on_done=done, on_error=lambda e: show_error(e, parent=win))
+
+        def done_batch(result):
+            assigned, skipped = result
+            win.destroy()
+            self.invalidate(self.tab_load)
             self.refresh_schedule()
+            self.report_skipped("Verify", len(assigned), skipped)
+
+        self.db.submit("confirm_verify_batch", clinic_service.verify_appointments, self.ver_ids, sid,
+                       owner=win, on_done=done_batch, on_error=lambda e: show_error(e, parent=win))
+
+    def release_appointment(self, action, aid, then=None):
+        """
+        Runs a clinic_service cancel/delete/reschedule (which frees the room in the same
+        statement) on a worker. Refreshes the schedule, then calls then(result).
+        aid is a list of ids for the batch variants.
+        """
+        def done(result):
+            self.invalidate(self.tab_finance, self.tab_rooms, self.tab_load)
+            self.refresh_schedule()
+            if then: then(result)
+
+        self.db.submit(action.__name__, action, aid, owner=self, on_done=done)
+
+    # --- CANCEL APPOINTMENT(S) ---
+    def cancel_appointment(self):
+        picked = self.selected_appointments(
+            lambda status: f"Cannot cancel {status} visit." if status in ['Cancelled', 'Completed'] else None)
+        if not picked: return
+
+        if len(picked) == 1:
+            if messagebox.askyesno("Confirm", "Cancel this appointment?"):
+                self.release_appointment(clinic_service.cancel_appointment, picked[0][0])
+        elif messagebox.askyesno("Confirm", f"Cancel these {len(picked)} appointments?"):
+            ids = [aid for aid, _, _ in picked]
+            self.release_appointment(clinic_service.cancel_appointments, ids,
+                                     lambda skipped: self.report_skipped("Cancel", len(ids) - len(skipped), skipped))
 
     # --- DELETE RECORD ---
     def delete_record(self):
@@ -450,37 +869,23 @@ class AdminScreen(tk.Frame):
             msg = "WARNING: Deleting a COMPLETED medical record. Continue?"
 
         if messagebox.askyesno("Confirm Delete", msg):
-            rows = database.fetch_all("SELECT roomNumber FROM appointment WHERE id=%s", (aid,))
-            if rows and rows[0]['roomNumber']:
-                database.execute_query("UPDATE room SET roomStatus='Available' WHERE roomNumber=%s",
-                                       (rows[0]['roomNumber'],))
-            database.execute_query("DELETE FROM appointment WHERE id=%s", (aid,))
-            self.refresh_schedule()
+            self.release_appointment(clinic_service.delete_appointment, aid)
 
     # --- RESCHEDULE LOGIC (Cancel + Rebook) ---
     def reschedule_appointment(self):
         aid = self.get_sel_id(self.tree_appt)
         if not aid: return
 
-        # Get item details
-        item = self.tree_appt.item(self.tree_appt.selection()[0])
-        status = item['values'][7]
-        old_date = item['values'][1]  # Column 1 is Date
-        old_time = item['values'][2]  # Column 2 is Time
-
+        status = self.tree_appt.item(self.tree_appt.selection()[0])['values'][7]
         if status != 'Scheduled':
             return messagebox.showerror("Error", "Only 'Scheduled' items can be rescheduled.")
 
         if messagebox.askyesno("Reschedule",
                                "To reschedule, we must CANCEL the current slot and create a NEW one.\n\nProceed?"):
-            # 1. Free room and Cancel
-            rows = database.fetch_all("SELECT roomNumber FROM appointment WHERE id=%s", (aid,))
-            if rows and rows[0]['roomNumber']:
-                database.execute_query("UPDATE room SET roomStatus='Available' WHERE roomNumber=%s",
-                                       (rows[0]['roomNumber'],))
-            database.execute_query("UPDATE appointment SET appointmentStatus='Cancelled' WHERE id=%s", (aid,))
-            self.refresh_schedule()
-
             # 2. Open new booking window (Passing old date/time to BLOCK them)
-            messagebox.showinfo("Step 2", "Original cancelled. Opening booking window.")
-            self.add_appointment_window(block_date=old_date, block_time=old_time)
\ No newline at end of file
+            def rebook(old_slot):
+                messagebox.showinfo("Step 2", "Original cancelled. Opening booking window.")
+                self.add_appointment_window(block_date=old_slot[0], block_time=old_slot[1])
+
+            # 1. Free room and Cancel
+            self.release_appointment(clinic_service.reschedule_appointment, aid, rebook)
\ No newline at end of file
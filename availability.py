@@ -0,0 +1,132 @@
+from datetime import date, datetime, time, timedelta
+import database
+
+# --- CLINIC SLOT GRID ---
+# The same six slots the booking screens offer (bit i of a day mask = SLOTS[i])
+SLOTS = [time(9), time(10), time(11), time(13), time(14), time(15)]
+_TIME_FORMATS = ("%I:%M %p", "%H:%M", "%H:%M:%S")
+
+
+def slot_label(slot_time):
+    """The one spelling of a time that is stored in appointmentTime: '09:00 AM'."""
+    return slot_time.strftime("%I:%M %p")
+
+
+SLOT_LABELS = [slot_label(s) for s in SLOTS]  # "09:00 AM" ... as PatientScreen shows them
+
+
+def parse_slot_time(value):
+    """
+    Normalizes a stored appointmentTime to a datetime.time.
+    Rows hold '09:00 AM' (patient screen), '09:00' (admin screen) or a TIME column (timedelta).
+    """
+    if isinstance(value, time):
+        return value
+    if isinstance(value, timedelta):
+        return (datetime.min + value).time()
+    text = str(value).strip().upper()
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+class AvailabilityGrid:
+    """Free/busy bitmap for one doctor or room: one int mask per day, one bit per slot."""
+
+    FULL = (1 << len(SLOTS)) - 1
+
+    def __init__(self, start, end):
+        self.start, self.end = start, end
+        self.days = {start + timedelta(days=i): 0 for i in range((end - start).days + 1)}
+
+    def mark_busy(self, day, slot_time):
+        if slot_time in SLOTS and day in self.days:
+            self.days[day] |= 1 << SLOTS.index(slot_time)
+
+    def is_free(self, day, slot_time):
+        day, slot_time = as_date(day), parse_slot_time(slot_time)
+        if slot_time not in SLOTS:
+            return True  # off-grid times are not tracked
+        return not self.days.get(day, 0) & (1 << SLOTS.index(slot_time))
+
+    def free_slots(self, day):
+        mask = self.days.get(as_date(day), 0)
+        return [s for i, s in enumerate(SLOTS) if not mask & (1 << i)]
+
+    def busy_slots(self, day):
+        mask = self.days.get(as_date(day), 0)
+        return [s for i, s in enumerate(SLOTS) if mask & (1 << i)]
+
+    def is_full(self, day):
+        return self.days.get(as_date(day), 0) == self.FULL
+
+
+# --- ENGINE: one range query for many resources ---
+_COLUMNS = {'doctor': 'doctorID', 'room': 'roomNumber'}
+
+
+def _grids(kind, ids, start, end, cursor=None):
+    """
+    Builds an AvailabilityGrid per resource from ONE query over [start, end].
+    ids=None means every resource that has a booking in the range.
+    """
+    col = _COLUMNS[kind]
+    start, end = as_date(start), as_date(end)
+
+    # A startsAt range (migration 008), so no stored time text is parsed per row
+    sql = f"""
+        SELECT {col} AS res, startsAt
+        FROM appointment
+        WHERE startsAt >= %s AND startsAt < %s
+        AND appointmentStatus != 'Cancelled'
+    """
+    params = [str(start), str(end + timedelta(days=1))]
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return {}
+        sql += f" AND {col} IN ({', '.join(['%s'] * len(ids))})"
+        params += ids
+
+    if cursor is None:
+        rows = database.fetch_all(sql, tuple(params))
+    else:
+        cursor.execute(sql, tuple(params))
+        rows = cursor.fetchall()
+
+    grids = {i: AvailabilityGrid(start, end) for i in (ids or [])}
+    for r in rows:
+        if r['res'] is None:
+            continue
+        grid = grids.get(r['res'])
+        if grid is None:
+            grid = grids[r['res']] = AvailabilityGrid(start, end)
+        grid.mark_busy(r['startsAt'].date(), r['startsAt'].time())
+    return grids
+
+
+def doctor_grids(doctor_ids, start, end, cursor=None):
+    return _grids('doctor', doctor_ids, start, end, cursor)
+
+
+def room_grids(room_numbers, start, end, cursor=None):
+    return _grids('room', room_numbers, start, end, cursor)
+
+
+def doctor_availability(doctor_id, start, end=None, cursor=None):
+    return doctor_grids([doctor_id], start, end or start, cursor)[doctor_id]
+
+
+def room_availability(room_number, start, end=None, cursor=None):
+    return room_grids([room_number], start, end or start, cursor)[room_number]
@@ -0,0 +1,65 @@
+"""
+Admin dashboard time-to-first-paint.
+
+"eager" reproduces the old AdminScreen.__init__ by opening every tab in
+turn before the first paint; "lazy" is the current behaviour, where only
+the visible Master Schedule tab is built and queried. Each run waits
+until the queries it started have come back and been rendered. Runs
+against the MySQL stand-in and needs a display (Xvfb on a headless box).
+
+    python benchmarks/bench_admin_paint.py
+"""
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from admin import AdminScreen
+from db_async import AsyncDB
+from standin import StandInServer
+
+
+def settle(root):
+    while root.db._pending:
+        root.update()
+        time.sleep(0.001)
+    root.update()
+
+
+def first_paint(root, server, eager):
+    server.reset()
+    start = time.perf_counter()
+    screen = AdminScreen(root, root)
+    screen.pack(fill="both", expand=True)
+    if eager:
+        for tab in screen.tabs.tabs():
+            screen.tabs.select(tab)
+            root.update()
+        screen.tabs.select(0)
+    settle(root)
+    elapsed = time.perf_counter() - start
+    screen.destroy()
+    return elapsed, server.queries
+
+
+def main():
+    server = StandInServer(round_trip_cost=0.02)  # a slow-ish MySQL makes the difference visible
+    database._pool = database.ConnectionPool(server.connect, **database.POOL_CONFIG)
+
+    root = tk.Tk()
+    root.geometry("1250x800")
+    root.db = AsyncDB(root)
+    root.current_user_id = None
+
+    for label, eager in (("eager (before)", True), ("lazy (after)", False)):
+        elapsed, queries = first_paint(root, server, eager)
+        print(f"{label:<16} first paint {elapsed * 1000:8.1f} ms   {queries} queries")
+    root.db.shutdown()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+AsyncDB delivery under failing callbacks.
+
+Submits --requests trivial jobs through db_async.AsyncDB, with every --fail-every'th
+on_done (and one on_error handler) raising. Each failure must be reported through
+root.report_callback_exception while every later result is still delivered;
+before, the first raising callback stopped the after() poll and every result after
+it was dropped. Drives AsyncDB with a minimal after() loop, so it needs no display.
+Exits 1 if any result was lost.
+
+    python benchmarks/bench_async_poll.py [--requests 2000] [--fail-every 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_async import AsyncDB
+
+
+class LoopRoot:
+    """Just the Tk root API AsyncDB uses: after() and report_callback_exception()."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.reported = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+    def report_callback_exception(self, exc, value, tb):
+        self.reported.append(value)
+
+    def run_until(self, done, timeout=30):
+        stop_at = time.monotonic() + timeout
+        while not done() and self.scheduled and time.monotonic() < stop_at:
+            pending, self.scheduled = self.scheduled, []
+            for fn in pending:
+                fn()
+            time.sleep(0.001)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--fail-every", type=int, default=50)
+    args = ap.parse_args()
+
+    root = LoopRoot()
+    db = AsyncDB(root, poll_ms=1)
+    delivered = []
+
+    def on_done(i):
+        delivered.append(i)
+        if i % args.fail_every == 0:
+            raise RuntimeError(f"render {i} failed")
+
+    def fail():
+        raise ValueError("query failed")
+
+    def on_error(error):
+        delivered.append(-1)
+        raise RuntimeError("error handler failed")
+
+    started = time.perf_counter()
+    for i in range(1, args.requests + 1):
+        db.submit("echo", lambda i=i: i, on_done=on_done)
+    db.submit("broken", fail, on_error=on_error)
+    expected = args.requests + 1
+    root.run_until(lambda: len(delivered) >= expected)
+    elapsed = time.perf_counter() - started
+    db.shutdown()
+
+    raised = args.requests // args.fail_every + 1
+    print(f"{len(delivered)}/{expected} results delivered in {elapsed * 1000:.1f} ms, "
+          f"{len(root.reported)}/{raised} callback errors reported")
+    sys.exit(0 if len(delivered) == expected and len(root.reported) == raised else 1)
+
+
+if __name__ == "__main__":
+    main()
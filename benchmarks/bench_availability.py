@@ -0,0 +1,64 @@
+"""
+Availability benchmark: one week x 50 doctors.
+
+Compares the old per-slot probe (database.is_slot_available once per
+doctor/day/slot) with availability.doctor_grids(), which answers the whole
+week for every doctor from one range query. Runs against the MySQL stand-in
+with a canned result set of busy slots.
+
+    python benchmarks/bench_availability.py [--doctors 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import availability
+import database
+from standin import StandInServer
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--doctors", type=int, default=50)
+    args = ap.parse_args()
+
+    monday = date(2025, 1, 6)
+    week = [monday + timedelta(days=i) for i in range(5)]
+    doctors = list(range(1, args.doctors + 1))
+
+    rng = random.Random(7)
+    busy = [{'res': d, 'startsAt': datetime.combine(day, rng.choice(availability.SLOTS))}
+            for d in doctors for day in week if rng.random() < 0.6]
+
+    server = StandInServer()
+    database._pool = database.ConnectionPool(server.connect, **database.POOL_CONFIG)
+
+    # Old: one probe per (doctor, day, slot)
+    server.rows = []
+    start = time.perf_counter()
+    for d in doctors:
+        for day in week:
+            for slot in availability.SLOTS:
+                database.is_slot_available(d, datetime.combine(day, slot))
+    old_elapsed, old_queries = time.perf_counter() - start, server.queries
+
+    # New: one range query for everybody
+    server.reset()
+    server.rows = busy
+    start = time.perf_counter()
+    grids = availability.doctor_grids(doctors, week[0], week[-1])
+    new_elapsed, new_queries = time.perf_counter() - start, server.queries
+
+    free = sum(len(g.free_slots(day)) for g in grids.values() for day in week)
+    print(f"per-slot probes : {old_queries:5d} queries  {old_elapsed * 1000:8.1f} ms")
+    print(f"range query     : {new_queries:5d} queries  {new_elapsed * 1000:8.1f} ms")
+    print(f"{len(grids)} doctors x {len(week)} days, {free} open slots")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Booking race stress test: many front-desk clients booking the same few room slots at once.
+
+"naive" replays the old check-then-insert (is_slot_available, then a separate INSERT)
+with no database constraint. "atomic" runs clinic_service.request_booking against a
+schema with the uq_active_room_slot rule from migrations/004. Both run against the
+SQLite stand-in. Exits 1 if the atomic run ends up with any double booking.
+
+    python benchmarks/bench_booking_race.py [--bookings 400] [--threads 16]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import availability
+import clinic_service
+import database
+from sqlite_standin import SQLiteServer
+
+ROOMS = 3
+DAYS = ["2030-01-07", "2030-01-08"]
+GAP = 0.002  # app <-> server latency between the naive check and its insert
+
+
+def setup(path, enforce):
+    server = SQLiteServer(path, enforce_slots=enforce)
+    conn = server.connect()
+    for r in range(1, ROOMS + 1):
+        conn.raw.execute("INSERT INTO room (roomNumber) VALUES (?)", (r,))
+        conn.raw.execute("INSERT INTO doctor VALUES (?, ?, 'General', ?)", (r, f"Doctor {r}", r))
+    conn.close()
+    database._pool = database.ConnectionPool(server.connect, **dict(database.POOL_CONFIG, max_size=8))
+    database.invalidate_reference()
+    return server
+
+
+def naive_book(patient, doctor, day, label):
+    room = database.get_doctor(doctor)['assignedRoom']
+    starts = datetime.combine(date.fromisoformat(day), availability.parse_slot_time(label))
+    if not database.is_slot_available(room, starts):
+        raise clinic_service.SlotUnavailable("busy")
+    time.sleep(GAP)
+    database.execute_query(
+        "INSERT INTO appointment (patientID, doctorID, roomNumber, appointmentDate, appointmentTime, startsAt, "
+        "appointmentStatus) VALUES (%s, %s, %s, %s, %s, %s, 'Pending')", (patient, doctor, room, day, label, starts))
+
+
+def run(book, bookings, threads):
+    outcomes = Counter()
+    lock = threading.Lock()
+    rng = random.Random(7)
+    jobs = [(p, rng.randint(1, ROOMS), rng.choice(DAYS), rng.choice(availability.SLOT_LABELS))
+            for p in range(1, bookings + 1)]
+
+    def one(job):
+        try:
+            book(*job)
+            result = "booked"
+        except clinic_service.SlotConflict:
+            result = "conflict (db key)"
+        except clinic_service.SlotUnavailable:
+            result = "refused (slot taken)"
+        except clinic_service.Busy:
+            result = "gave up after retries"
+        except Exception as e:
+            result = f"error: {type(e).__name__}"
+        with lock:
+            outcomes[result] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, jobs))
+    return outcomes, time.perf_counter() - start
+
+
+def double_bookings(server):
+    rows = server.query("""
+        SELECT roomNumber, startsAt, COUNT(*) AS n FROM appointment
+        WHERE appointmentStatus != 'Cancelled' GROUP BY roomNumber, startsAt HAVING n > 1
+    """)
+    return sum(r['n'] - 1 for r in rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bookings", type=int, default=400)
+    ap.add_argument("--threads", type=int, default=16)
+    args = ap.parse_args()
+
+    slots = ROOMS * len(DAYS) * len(availability.SLOTS)
+    print(f"{args.bookings} bookings, {args.threads} threads, {slots} distinct room slots")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, enforce, book in (("naive", False, naive_book), ("atomic", True, clinic_service.request_booking)):
+            server = setup(os.path.join(tmp, f"{label}.db"), enforce)
+            outcomes, seconds = run(book, args.bookings, args.threads)
+            doubles = double_bookings(server)
+            print(f"\n{label}: {args.bookings / seconds:7.0f} bookings/s, double bookings: {doubles}")
+            for outcome, n in sorted(outcomes.items()):
+                print(f"  {outcome:<24}{n:6}")
+            failed |= label == "atomic" and doubles > 0
+            database._pool.close_all()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
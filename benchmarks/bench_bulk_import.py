@@ -0,0 +1,60 @@
+"""
+Bulk patient import: bulk_io.import_csv vs one execute_query per row (the Add form).
+
+Generates a patient CSV, loads it through the MySQL stand-in and reports rows/s.
+The per-row path is timed on a sample and extrapolated to the full file.
+
+    python benchmarks/bench_bulk_import.py [--rows 100000] [--sample 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_io
+import database
+from standin import StandInServer
+
+SQL = "INSERT INTO patient (patientName, patientGender, patientBirthDate, patientPhoneNumber) VALUES (%s, %s, %s, %s)"
+
+
+def write_csv(path, n):
+    with open(path, "w", newline="") as f:
+        f.write("patientName,patientGender,patientBirthDate,patientPhoneNumber\n")
+        for i in range(n):
+            f.write(f"Patient {i},{('Male', 'Female')[i % 2]},19{50 + i % 50}-0{1 + i % 9}-1{i % 10},0812{i:07d}\n")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--sample", type=int, default=2000)
+    args = ap.parse_args()
+
+    server = StandInServer()
+    database._pool = database.ConnectionPool(server.connect, **database.POOL_CONFIG)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "patients.csv")
+        write_csv(path, args.rows)
+
+        server.reset()
+        start = time.perf_counter()
+        for i in range(args.sample):
+            database.execute_query(SQL, (f"Patient {i}", "Male", "1980-01-01", "0812"))
+        per_row = (time.perf_counter() - start) / args.sample
+        print(f"per-row execute_query: {1 / per_row:10.0f} rows/s -> {args.rows} rows in ~{per_row * args.rows:7.1f} s"
+              f"  ({server.round_trips / args.sample:.1f} round trips/row)")
+
+        server.reset()
+        result = bulk_io.import_csv("patient", path)
+        print(f"bulk_io.import_csv   : {result.imported / result.seconds:10.0f} rows/s -> {args.rows} rows in "
+              f"{result.seconds:9.1f} s  ({server.round_trips} round trips total)")
+        print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Landing page image benchmark: the 13 assets behind Home / About / Services / Doctors.
+
+Compares the old per-visit Image.open + LANCZOS resize with image_cache.ImageCache
+for a cold start (no thumbnails), a cold start with the background prefetcher,
+a warm start (thumbnails on disk) and repeat visits.
+Needs a display (run under Xvfb on a headless box).
+
+    python benchmarks/bench_images.py [--visits 20]
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+import tkinter as tk
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageTk
+import image_cache
+
+ASSETS = [("landingpic.jpg", (300, 250)), ("about.jpg", (420, 280))]
+ASSETS += [(f"service_{n}.jpg", (220, 140)) for n in ("checkup", "consult", "appointment", "lab", "vaccine", "emergency")]
+ASSETS += [(f"doc{i}.jpg", (120, 120)) for i in range(1, 6)]
+ASSETS = [(os.path.join(ROOT, "assets", name), size) for name, size in ASSETS]
+
+
+def old_load(path, size):
+    img = Image.open(path)
+    return ImageTk.PhotoImage(img.resize(size, Image.Resampling.LANCZOS))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for path, size in ASSETS:
+        fn(path, size)
+    return (time.perf_counter() - start) * 1000
+
+
+def prefetched_cold():
+    """Cold start where the prefetcher had the time Home is on screen to run."""
+    shutil.rmtree(os.path.join(ROOT, "assets", image_cache.THUMB_DIRNAME), ignore_errors=True)
+    cache = image_cache.ImageCache()
+    cache.prefetch(ASSETS)
+    while cache._inflight:
+        time.sleep(0.01)
+    return timed(cache.get)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--visits", type=int, default=20)
+    args = ap.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+
+    old = sum(timed(old_load) for _ in range(args.visits)) / args.visits
+    prefetched = prefetched_cold()
+    shutil.rmtree(os.path.join(ROOT, "assets", image_cache.THUMB_DIRNAME), ignore_errors=True)
+    cold = timed(image_cache.ImageCache().get)
+    warm_cache = image_cache.ImageCache()
+    warm = timed(warm_cache.get)
+    repeat = sum(timed(warm_cache.get) for _ in range(args.visits)) / args.visits
+
+    print(f"old load, every visit      : {old:8.1f} ms")
+    print(f"cache, cold (no thumbnails): {cold:8.1f} ms")
+    print(f"cache, cold + prefetch     : {prefetched:8.1f} ms  (UI thread only)")
+    print(f"cache, thumbnails on disk  : {warm:8.1f} ms")
+    print(f"cache, repeat visit        : {repeat:8.2f} ms")
+    print(warm_cache.report())
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Runs the loadtest.py client mix against the SQLite stand-in, seeded with a small clinic,
+so the harness itself can be exercised without a MySQL server. Latencies here say little
+about MySQL; use loadtest.py against a seeded database for real numbers.
+
+    python benchmarks/bench_loadtest.py [--duration 5] [--patients 20] [--think 0.01]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import availability
+import daily_load
+import database
+import loadtest
+import query_stats
+from sqlite_standin import SQLiteServer
+
+
+def seed(server, patients=500, doctors=6, staff=4):
+    conn = server.connect()
+    rng = random.Random(3)
+    cur = conn.raw
+    cur.executemany("INSERT INTO room (roomNumber) VALUES (?)", [(r,) for r in range(1, doctors + 1)])
+    cur.executemany("INSERT INTO doctor VALUES (?, ?, 'General', ?)",
+                    [(d, f"Doctor {d}", d) for d in range(1, doctors + 1)])
+    cur.executemany("INSERT INTO staff VALUES (?, ?, 'Nurse')", [(s, f"Staff {s}") for s in range(1, staff + 1)])
+    cur.executemany("INSERT INTO treatment VALUES (?, ?, ?)", [(1, "Checkup", 50), (2, "X-Ray", 120)])
+    cur.executemany("INSERT INTO patient VALUES (?, ?, ?, '1990-01-01', '555')",
+                    [(p, f"Patient {p}", rng.choice("MF")) for p in range(1, patients + 1)])
+
+    # Four weeks of verified visits, so doctors have something to complete from the start
+    for day in (date.today() + timedelta(days=i) for i in range(1, 29)):
+        for slot, label in zip(availability.SLOTS, availability.SLOT_LABELS):
+            free_staff = list(range(1, staff + 1))
+            for d in range(1, doctors + 1):
+                if not free_staff or rng.random() > 0.6:
+                    continue
+                pay_id = cur.execute("INSERT INTO payment (paymentAmount, paymentStatus) VALUES (0, 'Pending')").lastrowid
+                cur.execute("INSERT INTO appointment (appointmentDate, appointmentTime, startsAt, appointmentStatus, "
+                            "patientID, doctorID, roomNumber, paymentID, staffID) VALUES (?, ?, ?, 'Scheduled', ?, ?, ?, ?, ?)",
+                            (str(day), label, datetime.combine(day, slot), rng.randint(1, patients), d, d,
+                             pay_id, free_staff.pop(rng.randrange(len(free_staff)))))
+    conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", type=float, default=5)
+    ap.add_argument("--patients", type=int, default=20)
+    ap.add_argument("--doctors", type=int, default=4)
+    ap.add_argument("--frontdesk", type=int, default=2)
+    ap.add_argument("--think", type=float, default=0.01)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = SQLiteServer(os.path.join(tmp, "clinic.db"))
+        seed(server)
+        database.configure_pool(server.connect, max_size=8)
+        database.invalidate_reference()
+        daily_load.rebuild()
+        mix = {'patient': args.patients, 'doctor': args.doctors, 'frontdesk': args.frontdesk}
+        rec, wall = loadtest.run(mix, args.duration, args.think)
+        print(rec.report(wall))
+        print("pool:", database.pool_stats())
+        problems = daily_load.check()  # counters kept by clinic_service vs a recount
+        print("daily load tables:", "match appointment" if not problems
+              else {table: len(rows) for table, rows in problems.items()})
+        print()
+        print(query_stats.stats.report(top=12))
+        database._pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
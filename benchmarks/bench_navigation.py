@@ -0,0 +1,67 @@
+"""
+Screen-switch latency with and without the ClinicApp view cache.
+
+Walks Landing -> Login -> Admin -> Login -> Landing a few times and times each
+show_view() until the screen has painted and its queries have been rendered.
+Runs against the MySQL stand-in and needs a display (Xvfb on a headless box).
+
+    python benchmarks/bench_navigation.py [--rounds 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # the landing page loads assets/ by relative path
+
+import database
+from admin import AdminScreen
+from landing_page import ClinicLandingPage
+from login_view import LoginScreen
+from main import ClinicApp
+from standin import StandInServer
+
+ROUTE = [LoginScreen, AdminScreen, LoginScreen, ClinicLandingPage]
+
+
+def settle(app):
+    while app.db._pending:
+        app.update()
+        time.sleep(0.001)
+    app.update()
+
+
+def walk(view_cache, rounds):
+    app = ClinicApp(view_cache=view_cache)
+    settle(app)
+    times = []
+    for _ in range(rounds):
+        for view_class in ROUTE:
+            start = time.perf_counter()
+            app.show_view(view_class)
+            settle(app)
+            times.append(time.perf_counter() - start)
+    app.on_close()
+    times.sort()
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=10)
+    args = ap.parse_args()
+
+    server = StandInServer(round_trip_cost=0.005)
+    database._pool = database.ConnectionPool(server.connect, **database.POOL_CONFIG)
+
+    for label, size in (("no cache (before)", 0), ("view cache (after)", 4)):
+        times = walk(size, args.rounds)
+        mean = sum(times) / len(times)
+        print(f"{label:<20} mean {mean * 1000:7.1f} ms   p95 {times[int(len(times) * 0.95)] * 1000:7.1f} ms"
+              f"   ({len(times)} switches)")
+
+
+if __name__ == "__main__":
+    main()
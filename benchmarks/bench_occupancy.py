@@ -0,0 +1,93 @@
+"""
+Room occupancy benchmark: the Manage Rooms tab plus patients picking open slots.
+
+Compares a per-room scan of the day's appointments (what anything had to do once
+room.roomStatus could not be trusted) with occupancy.py, which fills a (room, day)
+cache from one range query and only re-reads the keys a booking invalidates.
+Runs against the SQLite stand-in with a seeded week.
+
+    python benchmarks/bench_occupancy.py [--rooms 40] [--refreshes 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import availability
+import database
+import occupancy
+import query_stats
+from sqlite_standin import SQLiteServer
+
+
+def seed(server, rooms, days):
+    conn = server.connect()
+    rng = random.Random(5)
+    cur = conn.raw
+    cur.executemany("INSERT INTO room (roomNumber) VALUES (?)", [(r,) for r in range(1, rooms + 1)])
+    cur.executemany(
+        "INSERT INTO appointment (appointmentDate, appointmentTime, startsAt, appointmentStatus, patientID, doctorID, "
+        "roomNumber) VALUES (?, ?, ?, ?, 1, ?, ?)",
+        [(str(day), label, datetime.combine(day, slot), rng.choice(['Pending', 'Scheduled', 'Cancelled']), r, r)
+         for r in range(1, rooms + 1) for day in days
+         for slot, label in zip(availability.SLOTS, availability.SLOT_LABELS) if rng.random() < 0.5])
+    conn.close()
+
+
+def scan_states(at):
+    """The old way: every room's appointments for the day, one query per room."""
+    states = []
+    for r in database.fetch_all("SELECT roomNumber, roomStatus FROM room"):
+        rows = database.fetch_all("SELECT appointmentTime FROM appointment WHERE roomNumber=%s AND appointmentDate=%s "
+                                  "AND appointmentStatus != 'Cancelled'", (r['roomNumber'], str(at.date())))
+        starts = [datetime.combine(at.date(), availability.parse_slot_time(x['appointmentTime'])) for x in rows]
+        states.append(any(s <= at < s + occupancy.SLOT_LENGTH for s in starts))
+    return states
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rooms", type=int, default=40)
+    ap.add_argument("--refreshes", type=int, default=200, help="Manage Rooms refreshes / open-slot lookups")
+    args = ap.parse_args()
+
+    today = date.today()
+    days = [today + timedelta(days=i) for i in range(7)]
+    at = datetime.combine(today, availability.SLOTS[1]) + timedelta(minutes=20)
+    rng = random.Random(9)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = SQLiteServer(os.path.join(tmp, "clinic.db"))
+        seed(server, args.rooms, days)
+        database.configure_pool(server.connect, max_size=4)
+        lookups = [(rng.randint(1, args.rooms), rng.choice(days)) for _ in range(args.refreshes)]
+
+        for name, run in (("per-room scan", lambda: scan_states(at)),
+                          ("occupancy cache", lambda: occupancy.room_states(at))):
+            occupancy.invalidate()
+            query_stats.stats.reset()
+            started = time.perf_counter()
+            for i, (room, day) in enumerate(lookups):
+                run()
+                if name == "per-room scan":
+                    database.fetch_all("SELECT appointmentTime FROM appointment WHERE roomNumber=%s AND appointmentDate=%s "
+                                       "AND appointmentStatus != 'Cancelled'", (room, str(day)))
+                else:
+                    occupancy.free_slots(room, day)
+                    if i % 10 == 0:
+                        occupancy.invalidate(room, day)  # a booking in that room
+            elapsed = time.perf_counter() - started
+            queries = sum(q['calls'] for q in query_stats.stats.query_rows())
+            print(f"{name:<16}: {queries:6d} queries  {elapsed * 1000:8.1f} ms  "
+                  f"({elapsed / args.refreshes * 1000:.2f} ms per refresh + lookup)")
+        print("cache:", occupancy.cache_stats())
+        database._pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
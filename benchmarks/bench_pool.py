@@ -0,0 +1,81 @@
+"""
+Connection pool benchmark.
+
+Replays the statement pattern of one PatientScreen.book() click against the
+MySQL stand-in, first with a fresh connection per statement (the old
+database.py behaviour) and then through database.ConnectionPool.
+
+    python benchmarks/bench_pool.py [--clicks 200] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from standin import StandInServer
+
+STATEMENTS_PER_CLICK = 5  # PatientScreen.book(): history, room, slot, payment, appointment
+
+
+def unpooled_op(server):
+    conn = server.connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def pooled_op(pool):
+    conn = pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+    finally:
+        pool.release(conn)
+
+
+def run(op, clicks, threads):
+    per_thread = clicks // threads
+
+    def worker():
+        for _ in range(per_thread * STATEMENTS_PER_CLICK):
+            op()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool: t.start()
+    for t in pool: t.join()
+    return time.perf_counter() - start, per_thread * threads * STATEMENTS_PER_CLICK
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clicks", type=int, default=200)
+    ap.add_argument("--threads", type=int, default=4)
+    args = ap.parse_args()
+
+    server = StandInServer()
+    elapsed, ops = run(lambda: unpooled_op(server), args.clicks, args.threads)
+    print(f"{'unpooled':<10} {ops:>6} ops  {elapsed:7.3f}s  "
+          f"{ops / elapsed:8.0f} ops/s  {server.connects / ops:.3f} connects/op")
+
+    server.reset()
+    pool = database.ConnectionPool(server.connect, **database.POOL_CONFIG)
+    elapsed, ops = run(lambda: pooled_op(pool), args.clicks, args.threads)
+    stats = pool.snapshot()
+    print(f"{'pooled':<10} {ops:>6} ops  {elapsed:7.3f}s  "
+          f"{ops / elapsed:8.0f} ops/s  {server.connects / ops:.3f} connects/op")
+    print(f"pool: size={stats['size']} peak={stats['peak_size']} reused={stats['reused']} "
+          f"waits={stats['waits']} avg_wait={stats['wait_time'] / stats['checkouts'] * 1000:.3f}ms")
+    pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup import-time check, based on `python -X importtime`.
+
+Imports what the app needs to put the landing page up (main + landing_page) in
+a fresh interpreter, takes the best of several runs, and fails (exit 1) when:
+  - a module that should load on first use (PIL, pymysql, database, the
+    login/patient/doctor/admin screens) is imported at startup, or
+  - the cumulative import time regresses more than --tolerance past the
+    recorded baseline (benchmarks/startup_baseline.json).
+
+    python benchmarks/bench_startup.py            # check
+    python benchmarks/bench_startup.py --save     # record a new baseline
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+STARTUP_MODULES = ("main", "landing_page")
+STARTUP = "import " + ", ".join(STARTUP_MODULES)
+DEFERRED = ("PIL", "pymysql", "database", "login_view", "patient_view", "doctor_view", "admin")
+
+
+def import_profile():
+    """
+    Returns ({top-level package: cumulative µs}, µs spent importing STARTUP_MODULES)
+    for one cold interpreter. Interpreter boot (site, encodings) is not counted.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    modules, total = {}, 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue  # header row
+        depth = len(name) - len(name.lstrip()) - 1  # one space after the bar, then 2 per level
+        name = name.strip()
+        modules[name.split(".")[0]] = max(modules.get(name.split(".")[0], 0), int(cumulative))
+        if depth == 0 and name in STARTUP_MODULES:
+            total += int(cumulative)
+    return modules, total
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--save", action="store_true", help="record the current time as the baseline")
+    args = ap.parse_args()
+
+    runs = [import_profile() for _ in range(args.runs)]
+    modules, best = min(runs, key=lambda run: run[1])
+    print(f"startup imports: {best / 1000:.1f} ms (best of {args.runs})")
+    for name, us in sorted(modules.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"  {name:<20}{us / 1000:8.1f} ms")
+
+    failures = [f"{name} is imported at startup" for name in DEFERRED if name in modules]
+
+    if args.save:
+        with open(BASELINE, "w") as f:
+            json.dump({"import_us": best}, f)
+        print(f"baseline saved: {best / 1000:.1f} ms")
+    elif os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)["import_us"]
+        limit = baseline * (1 + args.tolerance)
+        print(f"baseline {baseline / 1000:.1f} ms, limit {limit / 1000:.1f} ms")
+        if best > limit:
+            failures.append(f"import time {best / 1000:.1f} ms exceeds {limit / 1000:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
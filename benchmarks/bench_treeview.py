@@ -0,0 +1,68 @@
+"""
+Treeview refresh benchmark: 10k rows, one row changed.
+
+Compares the old delete-all/insert-all refresh with tree_sync.KeyedTree.sync().
+Needs a display (run under Xvfb on a headless box).
+
+    python benchmarks/bench_treeview.py [--rows 10000]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tree_sync import KeyedTree
+
+COLS = ("ID", "Date", "Time", "Patient", "Doctor", "Status")
+
+
+def make_rows(n, changed=None):
+    rows = []
+    for i in range(n):
+        status = "Completed" if i == changed else "Scheduled"
+        rows.append((i, (i, "2025-01-06", "09:00 AM", f"Patient {i}", f"Doctor {i % 50}", status)))
+    return rows
+
+
+def rebuild(tree, rows):
+    for i in tree.get_children(): tree.delete(i)
+    for _, values in rows:
+        tree.insert("", "end", values=values)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10000)
+    args = ap.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    before, after = make_rows(args.rows), make_rows(args.rows, changed=args.rows // 2)
+
+    tree = ttk.Treeview(root, columns=COLS, show="headings")
+    rebuild(tree, before)
+    start = time.perf_counter()
+    rebuild(tree, after)
+    root.update_idletasks()
+    old = time.perf_counter() - start
+
+    tree = ttk.Treeview(root, columns=COLS, show="headings")
+    view = KeyedTree(tree)
+    view.sync(before)
+    tree.selection_set(str(args.rows - 1))
+    start = time.perf_counter()
+    view.sync(after)
+    root.update_idletasks()
+    new = time.perf_counter() - start
+
+    print(f"delete-all/insert-all : {old * 1000:8.1f} ms")
+    print(f"KeyedTree.sync        : {new * 1000:8.1f} ms  (selection kept: {tree.selection() == (str(args.rows - 1),)})")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+SQLite stand-in for MySQL, for benchmarks that need real SQL and real locking
+(unlike standin.py, which only charges round-trip costs).
+
+It speaks just enough of the pymysql connection/cursor API for database.py:
+%s placeholders, dict rows, lastrowid, begin/commit/rollback, ping. SQLite has
+no row locks, so FOR UPDATE is dropped; its database-wide write lock is
+stricter anyway. MySQL's multi-table UPDATE ... JOIN is emulated by picking the
+rows first, then updating each table; ON DUPLICATE KEY UPDATE becomes an upsert.
+For reports.py, DATE_FORMAT, WEEKDAY and CONCAT are registered as functions,
+DATE_SUB(d, INTERVAL n DAY) becomes date(), and a one-column GROUP BY ... WITH
+ROLLUP runs as the grouped query plus an ungrouped one for the total row.
+Errors are translated to the pymysql ones the app handles:
+a UNIQUE violation -> IntegrityError 1062 naming the MySQL key, "database is
+locked" -> OperationalError 1213 (deadlock, retryable).
+"""
+import re
+import sqlite3
+from datetime import datetime
+
+import pymysql
+
+SCHEMA = """
+CREATE TABLE doctor (doctorID INTEGER PRIMARY KEY, doctorName TEXT, doctorSpecialty TEXT, assignedRoom INTEGER);
+CREATE TABLE room (roomNumber INTEGER PRIMARY KEY, roomStatus TEXT DEFAULT 'Available');
+CREATE TABLE staff (staffID INTEGER PRIMARY KEY, staffName TEXT, staffRole TEXT);
+CREATE TABLE treatment (treatmentID INTEGER PRIMARY KEY, treatment TEXT, treatmentCost NUMERIC);
+CREATE TABLE patient (patientID INTEGER PRIMARY KEY, patientName TEXT, patientGender TEXT,
+                      patientBirthDate TEXT, patientPhoneNumber TEXT);
+CREATE TABLE payment (paymentID INTEGER PRIMARY KEY AUTOINCREMENT, paymentAmount NUMERIC, paymentDate TEXT,
+                      paymentStatus TEXT DEFAULT 'Pending', appointmentID INTEGER);
+CREATE TABLE appointment (id INTEGER PRIMARY KEY AUTOINCREMENT, appointmentDate TEXT, appointmentTime TEXT,
+                          startsAt TIMESTAMP, appointmentStatus TEXT DEFAULT 'Pending', patientID INTEGER, doctorID INTEGER,
+                          roomNumber INTEGER, treatmentID INTEGER, paymentID INTEGER, staffID INTEGER,
+                          doctorNotes TEXT);
+""" + "".join(f"""
+CREATE TABLE {table} (day TEXT NOT NULL, {column} INTEGER NOT NULL, pending INTEGER NOT NULL DEFAULT 0,
+                      scheduled INTEGER NOT NULL DEFAULT 0, completed INTEGER NOT NULL DEFAULT 0,
+                      cancelled INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (day, {column}));""" for table, column in (
+    ('daily_doctor_load', 'doctorID'), ('daily_room_load', 'roomNumber'), ('daily_staff_load', 'staffID')))
+
+# Same rule as migrations/004 + 008 (a partial index instead of a generated column)
+ACTIVE_SLOT_INDEX = """
+CREATE UNIQUE INDEX uq_active_room_slot ON appointment (roomNumber, startsAt)
+WHERE appointmentStatus != 'Cancelled' AND roomNumber IS NOT NULL;
+"""
+
+_REWRITES = [
+    (re.compile(r"\s+FOR UPDATE\b", re.I), ""),
+    (re.compile(r"\bCURDATE\(\)", re.I), "DATE('now')"),
+    (re.compile(r"\bON DUPLICATE KEY UPDATE\b", re.I), "ON CONFLICT DO UPDATE SET"),  # daily_load upserts
+    (re.compile(r"\bVALUES\((\w+)\)", re.I), r"excluded.\1"),
+    (re.compile(r"\bDATE_SUB\((.+?),\s*INTERVAL\s+(.+?)\s+DAY\)", re.I), r"DATE(\1, '-' || (\2) || ' days')"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"%%"), "%"),  # pymysql's escaped percent, e.g. DATE_FORMAT(d, '%%Y-%%m')
+]
+
+# Grouped expression last in GROUP BY, selected as the first column (reports.revenue)
+_ROLLUP = re.compile(r"(\s+GROUP BY\s+.+?)\s+WITH ROLLUP\b", re.I | re.S)
+
+# MySQL DATE_FORMAT specifiers that differ from strftime
+_DATE_FORMAT = {'i': 'M', 's': 'S', 'M': 'B', 'W': 'A'}
+
+
+def _date_format(value, fmt):
+    if value is None:
+        return None
+    day = datetime.fromisoformat(str(value))
+    return day.strftime(re.sub(r"%(.)", lambda m: "%" + _DATE_FORMAT.get(m.group(1), m.group(1)), fmt))
+
+
+def _weekday(value):
+    return None if value is None else datetime.fromisoformat(str(value)).weekday()
+
+
+def _concat(*parts):
+    return None if None in parts else "".join(str(p) for p in parts)
+
+# UPDATE base alias [LEFT] JOIN t alias ON ... SET alias.col = expr, ... WHERE ...
+_MULTI_UPDATE = re.compile(r"^\s*UPDATE\s+(\w+)\s+(\w+)\s+((?:(?:LEFT\s+)?JOIN\s+\w+\s+\w+\s+ON\s.+?)+)"
+                           r"\bSET\s+(.+?)\s+WHERE\s+(.+)$", re.I | re.S)
+_JOINED = re.compile(r"JOIN\s+(\w+)\s+(\w+)\s+ON", re.I)
+
+
+class SQLiteServer:
+    def __init__(self, path, enforce_slots=True, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA + (ACTIVE_SLOT_INDEX if enforce_slots else ""))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+    def connect(self, **_ignored):
+        # TIMESTAMP columns (startsAt) come back as datetime, like pymysql's DATETIME
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False,
+                              detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.row_factory = sqlite3.Row
+        raw.create_function("DATE_FORMAT", 2, _date_format, deterministic=True)
+        raw.create_function("WEEKDAY", 1, _weekday, deterministic=True)
+        raw.create_function("CONCAT", -1, _concat, deterministic=True)
+        return SQLiteConnection(raw)
+
+    def query(self, sql, params=()):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+        finally:
+            conn.close()
+
+
+def _translate(error):
+    text = str(error)
+    if isinstance(error, sqlite3.IntegrityError) and "UNIQUE" in text and "appointment.roomNumber" in text:
+        return pymysql.err.IntegrityError(1062, f"Duplicate entry for key 'uq_active_room_slot' ({text})")
+    if isinstance(error, sqlite3.IntegrityError):
+        return pymysql.err.IntegrityError(1062, text)
+    if "locked" in text or "busy" in text:
+        return pymysql.err.OperationalError(1213, f"Deadlock found when trying to get lock ({text})")
+    return pymysql.err.OperationalError(2013, text)
+
+
+class SQLiteConnection:
+    def __init__(self, raw):
+        self.raw = raw
+        self.in_tx = False
+
+    def cursor(self, *_ignored):
+        return SQLiteCursor(self)
+
+    def ping(self, reconnect=False):
+        self.raw.execute("SELECT 1")
+
+    def begin(self):
+        self.raw.execute("BEGIN")
+        self.in_tx = True
+
+    def commit(self):
+        if self.in_tx:
+            self.in_tx = False
+            try:
+                self.raw.execute("COMMIT")
+            except sqlite3.Error as e:
+                raise _translate(e)
+
+    def rollback(self):
+        if self.in_tx:
+            self.in_tx = False
+            self.raw.execute("ROLLBACK")
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._cur = conn.raw.cursor()
+        self.lastrowid = None
+        self.rowcount = 0
+        self._rows = None  # buffered result of an emulated statement (WITH ROLLUP)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+        return False
+
+    def _sql(self, sql):
+        for pattern, repl in _REWRITES:
+            sql = pattern.sub(repl, sql)
+        return sql
+
+    def execute(self, sql, params=()):
+        multi = _MULTI_UPDATE.match(sql)
+        rollup = _ROLLUP.search(sql)
+        self._rows = None
+        try:
+            if multi:
+                self.rowcount = self._multi_update(multi, list(params))
+                return self.rowcount
+            if rollup:
+                self._rows = self._rollup(sql, rollup, tuple(params))
+                self.rowcount = len(self._rows)
+                return self.rowcount
+            self._cur.execute(self._sql(sql), tuple(params))
+        except sqlite3.Error as e:
+            raise _translate(e)
+        self.lastrowid, self.rowcount = self._cur.lastrowid, self._cur.rowcount
+        return self.rowcount
+
+    def _multi_update(self, match, params):
+        base, alias, joins, sets, where = match.groups()
+        tables = {alias: base, **{a: t for t, a in _JOINED.findall(joins)}}
+        targets = {}  # alias -> [(column, expression, its params)]
+        for assignment in sets.split(","):
+            column, expr = assignment.split("=", 1)
+            target, column = column.strip().split(".")
+            n = expr.count("%s")
+            targets.setdefault(target, []).append((column, expr.strip(), params[:n]))
+            params = params[n:]
+
+        # Pick the rows before changing any: the WHERE may test columns being set
+        picked = ", ".join(f"{a}.rowid AS {a}" for a in targets)
+        self._cur.execute(self._sql(f"SELECT {picked} FROM {base} {alias} {joins} WHERE {where}"), tuple(params))
+        found = self._cur.fetchall()
+        changed = 0
+        for target, assignments in targets.items():
+            rowids = sorted({r[target] for r in found if r[target] is not None})
+            if not rowids:
+                continue
+            set_sql = ", ".join(f"{column} = {expr}" for column, expr, _ in assignments)
+            values = [v for _, _, vs in assignments for v in vs] + rowids
+            self._cur.execute(self._sql(f"UPDATE {tables[target]} SET {set_sql} "
+                                        f"WHERE rowid IN ({', '.join(['%s'] * len(rowids))})"), tuple(values))
+            changed += self._cur.rowcount
+        return changed
+
+    def _rollup(self, sql, match, params):
+        self._cur.execute(self._sql(sql[:match.start()] + match.group(1) + sql[match.end():]), params)
+        rows = [dict(r) for r in self._cur.fetchall()]
+        if rows:  # MySQL adds no total row to an empty result
+            self._cur.execute(self._sql(sql[:match.start()] + sql[match.end():]), params)
+            total = dict(self._cur.fetchone())
+            total[next(iter(total))] = None
+            rows.append(total)
+        return rows
+
+    def executemany(self, sql, seq):
+        try:
+            self._cur.executemany(self._sql(sql), [tuple(p) for p in seq])
+        except sqlite3.Error as e:
+            raise _translate(e)
+        self.rowcount = self._cur.rowcount
+        return self.rowcount
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return [dict(r) for r in self._cur.fetchall()]
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._rows.pop(0) if self._rows else None
+        row = self._cur.fetchone()
+        return dict(row) if row else None
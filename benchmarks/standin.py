@@ -0,0 +1,98 @@
+"""
+Local stand-in for the MySQL server used by the benchmarks.
+
+It does not run real SQL. It only charges realistic costs for the things we
+want to measure: the TCP handshake + auth on connect, and one round trip
+per statement.
+"""
+import threading
+import time
+
+CONNECT_COST = 0.004     # seconds - handshake + auth on a LAN MySQL
+ROUND_TRIP_COST = 0.0003  # seconds - one query round trip
+
+
+class StandInServer:
+    def __init__(self, connect_cost=CONNECT_COST, round_trip_cost=ROUND_TRIP_COST):
+        self.connect_cost = connect_cost
+        self.round_trip_cost = round_trip_cost
+        self.connects = 0
+        self.round_trips = 0
+        self.queries = 0
+        self.rows = []  # canned result set returned by every fetchall()
+        self._lock = threading.Lock()
+
+    def connect(self, **_ignored):
+        time.sleep(self.connect_cost)
+        with self._lock:
+            self.connects += 1
+        return StandInConnection(self)
+
+    def _round_trip(self, query=False):
+        time.sleep(self.round_trip_cost)
+        with self._lock:
+            self.round_trips += 1
+            self.queries += query
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.round_trips = 0
+            self.queries = 0
+
+
+class StandInConnection:
+    def __init__(self, server):
+        self.server = server
+        self.open = True
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def ping(self, reconnect=False):
+        if not self.open:
+            raise ConnectionError("connection closed")
+        self.server._round_trip()
+
+    def begin(self):
+        self.server._round_trip()
+
+    def commit(self):
+        self.server._round_trip()
+
+    def rollback(self):
+        self.server._round_trip()
+
+    def close(self):
+        self.open = False
+
+
+class StandInCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = 0
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.conn.server._round_trip(query=True)
+        self.lastrowid += 1
+        self.rowcount = 1
+        return 1
+
+    def executemany(self, sql, seq):
+        self.conn.server._round_trip(query=True)
+        self.rowcount = len(list(seq))
+        return self.rowcount
+
+    def fetchall(self):
+        return list(self.conn.server.rows)
+
+    def fetchone(self):
+        rows = self.conn.server.rows
+        return rows[0] if rows else None
@@ -0,0 +1,253 @@
+import csv
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import pymysql
+import database
+
+BATCH_SIZE = 1000  # rows per executemany (pymysql turns it into one multi-row INSERT)
+
+
+# --- COLUMN CONVERTERS ---
+# Each takes the raw CSV text and returns the value to insert, or raises ValueError.
+def _text(limit):
+    def convert(value):
+        if len(value) > limit:
+            raise ValueError(f"longer than {limit} characters")
+        return value
+    return convert
+
+
+def _choice(*allowed):
+    def convert(value):
+        for option in allowed:
+            if value.lower() == option.lower():
+                return option
+        raise ValueError(f"must be one of {', '.join(allowed)}")
+    return convert
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _int(value):
+    return int(value)
+
+
+def _money(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"'{value}' is not a number")
+
+
+# --- TABLE LAYOUTS ---
+# table -> key column, [(column, converter, required)]. A CSV may include the key
+# column (e.g. a previous export); when it is blank or missing the database assigns it.
+TABLES = {
+    'patient': ('patientID', [
+        ('patientName', _text(100), True),
+        ('patientGender', _choice('Male', 'Female', 'Other'), True),
+        ('patientBirthDate', _date, False),
+        ('patientPhoneNumber', _text(15), False),
+    ]),
+    'doctor': ('doctorID', [
+        ('doctorName', _text(100), True),
+        ('doctorSpecialty', _text(100), False),
+        ('assignedRoom', _int, False),
+    ]),
+    'staff': ('staffID', [
+        ('staffName', _text(100), True),
+        ('staffRole', _text(50), False),
+    ]),
+    'room': ('roomNumber', [
+        # Occupancy comes from appointments (occupancy.py); roomStatus only flags Maintenance
+        ('roomStatus', _choice('Available', 'Maintenance'), False),
+    ]),
+    'treatment': ('treatmentID', [
+        ('treatment', _text(100), True),
+        ('treatmentCost', _money, False),
+    ]),
+}
+BLANKS = {'roomStatus': 'Available'}  # column -> value for a blank cell (the column default, not NULL)
+
+
+class ImportResult:
+    def __init__(self, table):
+        self.table = table
+        self.read = 0
+        self.imported = 0
+        self.errors = []  # (CSV line number, message)
+        self.seconds = 0.0
+
+    def summary(self):
+        rate = self.imported / self.seconds if self.seconds else 0
+        return (f"{self.table}: {self.imported} of {self.read} rows imported in {self.seconds:.1f}s "
+                f"({rate:.0f} rows/s), {len(self.errors)} rejected")
+
+
+def _layout(table):
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}'. Choose from: {', '.join(TABLES)}")
+    return TABLES[table]
+
+
+def parse_rows(table, lines):
+    """
+    Reads the header from CSV text lines and returns (columns, rows), where rows
+    lazily yields (line number, values tuple, error) - values is None when the
+    row is invalid, error is None when it is fine.
+    """
+    key, fields = _layout(table)
+    reader = csv.reader(lines)
+    header = [h.strip() for h in next(reader, [])]
+    missing = [name for name, _, required in fields if required and name not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing required column(s): {', '.join(missing)}")
+
+    columns = [key] if key in header else []
+    columns += [name for name, _, _ in fields if name in header]
+    converters = {name: (convert, required) for name, convert, required in fields}
+    positions = [header.index(name) for name in columns]
+
+    def rows():
+        for row in reader:
+            line = reader.line_num
+            if not any(cell.strip() for cell in row):
+                continue
+            values, error = [], None
+            for name, pos in zip(columns, positions):
+                raw = row[pos].strip() if pos < len(row) else ""
+                convert, required = converters.get(name, (_int, False))
+                if not raw:
+                    if required:
+                        error = f"{name}: required"
+                        break
+                    values.append(BLANKS.get(name))
+                    continue
+                try:
+                    values.append(convert(raw))
+                except ValueError as e:
+                    error = f"{name}: {e}"
+                    break
+            yield line, (None if error else tuple(values)), error
+
+    return columns, rows()
+
+
+def import_csv(table, path, batch_size=BATCH_SIZE, progress=None, strict=False):
+    """
+    Bulk-loads a CSV file into table inside ONE transaction.
+
+    Rows are parsed as a stream and inserted with executemany in batches. A row
+    that fails validation, or that the database rejects (duplicate key, bad
+    foreign key...), is recorded in result.errors and skipped; the rest commit.
+    With strict=True any rejected row rolls the whole import back.
+    progress(rows_read, rows_imported) is called after every batch.
+    """
+    result = ImportResult(table)
+    started = time.perf_counter()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        columns, rows = parse_rows(table, f)
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+
+        with database.transaction() as cursor:
+            batch = []
+            for line, values, error in rows:
+                result.read += 1
+                if error:
+                    result.errors.append((line, error))
+                else:
+                    batch.append((line, values))
+                if len(batch) >= batch_size:
+                    _insert_batch(cursor, sql, batch, result)
+                    batch = []
+                    if progress: progress(result.read, result.imported)
+            if batch:
+                _insert_batch(cursor, sql, batch, result)
+            if progress: progress(result.read, result.imported)
+            if strict and result.errors:
+                line, error = result.errors[0]
+                raise ValueError(f"Import rolled back: {len(result.errors)} bad row(s), first at line {line}: {error}")
+
+    database.invalidate_reference(table)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _insert_batch(cursor, sql, batch, result):
+    # Fast path: the whole batch in one statement. If the database rejects it,
+    # roll back to the savepoint and retry row by row to find the culprits.
+    cursor.execute("SAVEPOINT bulk_batch")
+    try:
+        cursor.executemany(sql, [values for _, values in batch])
+        result.imported += len(batch)
+        return
+    except pymysql.MySQLError:
+        cursor.execute("ROLLBACK TO SAVEPOINT bulk_batch")
+
+    for line, values in batch:
+        cursor.execute("SAVEPOINT bulk_row")
+        try:
+            cursor.execute(sql, values)
+            result.imported += 1
+        except pymysql.MySQLError as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+            result.errors.append((line, e.args[-1] if e.args else str(e)))
+
+
+def export_csv(table, path, progress=None, every=BATCH_SIZE):
+    """
+    Streams table to a CSV file (header row first) with an unbuffered cursor,
+    so memory stays flat however big the table is. Returns the row count.
+    """
+    key, fields = _layout(table)
+    columns = [key] + [name for name, _, _ in fields]
+    conn = database.get_conn()
+    count = 0
+    try:
+        with conn.cursor(pymysql.cursors.SSCursor) as cursor, open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {key}")
+            for row in cursor:
+                writer.writerow(["" if v is None else v for v in row])
+                count += 1
+                if progress and count % every == 0:
+                    progress(count)
+    finally:
+        database.release_conn(conn)
+    if progress: progress(count)
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Bulk CSV import/export for clinic reference tables.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="load a CSV file into a table")
+    imp.add_argument("table", choices=sorted(TABLES))
+    imp.add_argument("path")
+    imp.add_argument("--batch", type=int, default=BATCH_SIZE)
+    imp.add_argument("--strict", action="store_true", help="roll everything back if any row is rejected")
+    exp = sub.add_parser("export", help="write a table to a CSV file")
+    exp.add_argument("table", choices=sorted(TABLES))
+    exp.add_argument("path")
+    args = ap.parse_args()
+
+    if args.command == "import":
+        res = import_csv(args.table, args.path, batch_size=args.batch, strict=args.strict,
+                         progress=lambda read, done: print(f"\r{read} read, {done} imported", end="", flush=True))
+        print()
+        for line, error in res.errors[:50]:
+            print(f"  line {line}: {error}")
+        if len(res.errors) > 50:
+            print(f"  ... {len(res.errors) - 50} more")
+        print(res.summary())
+    else:
+        n = export_csv(args.table, args.path, progress=lambda n: print(f"\r{n} rows", end="", flush=True))
+        print(f"\n{n} rows written to {args.path}")
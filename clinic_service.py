@@ -0,0 +1,455 @@
+import random
+import time
+from datetime import date as date_cls, datetime
+
+import pymysql
+import availability
+import daily_load
+import database
+import occupancy
+
+BOOKING_ATTEMPTS = 3  # tries for a booking that hits a deadlock / lock wait timeout
+
+_RETRYABLE = {1205, 1213}  # lock wait timeout, deadlock: the transaction was rolled back, safe to rerun
+_DUPLICATE_ENTRY = 1062
+
+# --- ERRORS ---
+# Every refusal is a ServiceError: str(e) is the message for the user, e.title a short heading.
+# Anything else (e.g. pymysql errors) is an infrastructure failure.
+class ServiceError(Exception):
+    title = "Error"
+
+
+class ValidationError(ServiceError):
+    """Bad or missing input."""
+
+
+class NotFound(ServiceError):
+    title = "Not Found"
+
+
+class InvalidState(ServiceError):
+    """The appointment's status does not allow the operation."""
+
+
+class SequenceError(ServiceError):
+    title = "Sequence Error"
+
+
+class SlotUnavailable(ServiceError):
+    title = "Unavailable"
+
+
+class SlotConflict(SlotUnavailable):
+    """Another booking took the slot between our check and our insert."""
+    title = "Slot Taken"
+
+
+class Busy(ServiceError):
+    """Still deadlocking / waiting on locks after BOOKING_ATTEMPTS tries."""
+    title = "Busy"
+
+
+def _parse_date(value):
+    if isinstance(value, date_cls):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError("Date must be YYYY-MM-DD")
+
+
+def _parse_time(value):
+    slot = availability.parse_slot_time(value)
+    if slot is None:
+        raise ValidationError(f"'{value}' is not a valid time.")
+    return slot
+
+
+# --- BOOKING ---
+def request_booking(patient_id, doctor_id, date, time):
+    """
+    Patient self-service booking (PatientScreen). Creates a Pending appointment in the
+    doctor's room plus its payment record and returns the new appointment id.
+    time is a slot label such as '09:00 AM'; any spelling parse_slot_time accepts is
+    stored as the canonical label, so '09:00' and '9:00 am' are the same slot.
+    """
+    day, slot = _parse_date(date), _parse_time(time)
+    time = availability.slot_label(slot)
+    wanted = datetime.combine(day, slot)
+
+    # "The next appointment cannot be before the one already set." Any live appointment at
+    # or after the wanted slot breaks the sequence; idx_appt_patient_starts finds the latest.
+    last = database.fetch_all("""
+        SELECT appointmentDate, appointmentTime
+        FROM appointment
+        WHERE patientID=%s AND startsAt >= %s AND appointmentStatus != 'Cancelled'
+        ORDER BY startsAt DESC
+        LIMIT 1
+    """, (patient_id, wanted))
+    if last:
+        last_date, last_time = last[0]['appointmentDate'], last[0]['appointmentTime']
+        raise SequenceError(
+            f"Impossible Sequence.\n\nYou already have an appointment scheduled for:\n{last_date} at {last_time}\n\nYour next appointment must be AFTER this date.")
+
+    doctor = database.get_doctor(doctor_id)  # reference cache, no round trip
+    if doctor is None:
+        raise SlotUnavailable("This doctor is no longer available.")
+    room = doctor['assignedRoom']
+
+    def reserve():
+        # One connection, one commit: nothing is half-written if a step fails
+        with database.transaction() as cur:
+            # Bookings for the same room queue up on its row lock, so the check below
+            # cannot go stale before our insert; uq_active_room_slot is the backstop.
+            cur.execute("SELECT roomNumber FROM room WHERE roomNumber=%s FOR UPDATE", (room,))
+            if not database.is_slot_available(room, wanted, cur):
+                raise SlotUnavailable("Doctor/Room is busy at this time!")
+            cur.execute("INSERT INTO payment (paymentAmount, paymentStatus) VALUES (0, 'Pending')")
+            pay_id = cur.lastrowid
+            cur.execute(
+                "INSERT INTO appointment (patientID, doctorID, roomNumber, paymentID, appointmentDate, appointmentTime, startsAt, appointmentStatus) VALUES (%s, %s, %s, %s, %s, %s, %s, 'Pending')",
+                (patient_id, doctor_id, room, pay_id, str(day), time, wanted))
+            appt_id = cur.lastrowid
+            daily_load.record(cur, [], [{'appointmentDate': day, 'appointmentStatus': 'Pending',
+                                         'doctorID': doctor['doctorID'], 'roomNumber': room, 'staffID': None}])
+        return appt_id
+
+    try:
+        return with_retry(reserve)
+    finally:
+        occupancy.invalidate(room, day)  # now booked, or refused because the cached slots were stale
+
+
+def with_retry(work, attempts=BOOKING_ATTEMPTS):
+    """
+    Runs a transactional work() again (with jittered backoff) when MySQL aborted it
+    with a deadlock or lock wait timeout, and raises Busy once the attempts run out.
+    A duplicate entry on uq_active_room_slot (migration 004) means someone else
+    holds the slot and becomes SlotConflict.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return work()
+        except pymysql.err.IntegrityError as e:
+            if e.args and e.args[0] == _DUPLICATE_ENTRY and 'uq_active_room_slot' in str(e):
+                raise SlotConflict("Someone else just booked this slot. Please pick another time.")
+            raise
+        except pymysql.err.OperationalError as e:
+            if not e.args or e.args[0] not in _RETRYABLE:
+                raise
+            if attempt == attempts:
+                raise Busy("The clinic is handling many bookings right now. Please try again.")
+            time.sleep(random.uniform(0, 0.02 * 2 ** attempt))
+
+
+def create_booking(patient_id, doctor_id, date, time, blocked_slot=None):
+    """
+    Front-desk booking (AdminScreen). Creates a Pending appointment with a dated payment
+    record and returns its id; the room is assigned when it is verified.
+    blocked_slot: (date, time) the patient is being moved away from by a reschedule.
+    """
+    if not (patient_id and doctor_id and date and time):
+        raise ValidationError("All fields are required!")
+    day, slot = _parse_date(date), _parse_time(time)
+    time, starts_at = availability.slot_label(slot), datetime.combine(day, slot)
+    if day < date_cls.today():
+        raise ValidationError("Cannot book an appointment in the past!")
+    if blocked_slot and str(day) == str(blocked_slot[0]) and slot == availability.parse_slot_time(blocked_slot[1]):
+        raise ValidationError(
+            f"You cannot reschedule to the same slot ({day} at {time}).\nPlease pick a different time.")
+
+    with database.transaction() as cur:
+        cur.execute("""
+            INSERT INTO appointment (appointmentDate, appointmentTime, startsAt, appointmentStatus,
+                                     patientID, doctorID, paymentID, staffID)
+            VALUES (%s, %s, %s, 'Pending', %s, %s, NULL, NULL)
+        """, (str(day), time, starts_at, patient_id, doctor_id))
+        appt_id = cur.lastrowid
+        cur.execute("""
+            INSERT INTO payment (paymentAmount, paymentStatus, paymentDate, appointmentID)
+            VALUES (0, 'Pending', CURDATE(), %s)
+        """, (appt_id,))
+        cur.execute("UPDATE appointment SET paymentID=%s WHERE id=%s", (cur.lastrowid, appt_id))
+        daily_load.record(cur, [], [{'appointmentDate': day, 'appointmentStatus': 'Pending',
+                                     'doctorID': doctor_id, 'roomNumber': None, 'staffID': None}])
+    return appt_id
+
+
+# --- APPOINTMENT LIFECYCLE ---
+# Each step is set-based: one locking read of every id's status, then one guarded statement
+# that changes the appointments (with their payments, UPDATE ... JOIN) and the daily load
+# counters (daily_load.py) in the same transaction. Room occupancy is derived from the
+# appointments (occupancy.py), so only its cache needs telling. Batch variants
+# return {id: ServiceError} for the ids they skipped; the single-appointment functions
+# raise that error instead.
+_CANCEL_SQL = """
+    UPDATE appointment SET appointmentStatus = 'Cancelled'
+    WHERE id IN ({ids}) AND appointmentStatus {guard}
+"""
+
+_COMPLETE_SQL = """
+    UPDATE appointment a
+    LEFT JOIN payment p ON p.paymentID = a.paymentID
+    SET a.appointmentStatus = 'Completed', a.doctorNotes = %s, a.treatmentID = %s,
+        p.paymentAmount = %s, p.paymentStatus = 'Paid'
+    WHERE a.id IN ({ids}) AND a.appointmentStatus != 'Cancelled'
+"""
+
+
+def _marks(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def _appointments(ids, cur=None, lock=False):
+    """{id: row} with the status, slot and owners of each appointment that exists, in one query."""
+    sql = (f"SELECT id, appointmentTime, startsAt, {daily_load.COLUMNS} FROM appointment "
+           f"WHERE id IN ({_marks(ids)})" + (" FOR UPDATE" if lock else ""))
+    if cur is None:
+        rows = database.fetch_all(sql, ids)
+    else:
+        cur.execute(sql, ids)
+        rows = cur.fetchall()
+    return {r['id']: r for r in rows}
+
+
+def _id_list(appointment_ids):
+    ids = []
+    for aid in appointment_ids:
+        if int(aid) not in ids:
+            ids.append(int(aid))
+    return ids
+
+
+def _skipped(ids, rows, refuse):
+    """{id: ServiceError} for missing ids and those refuse(status) objects to."""
+    skipped = {}
+    for aid in ids:
+        if aid not in rows:
+            skipped[aid] = NotFound(f"Appointment {aid} does not exist.")
+        else:
+            error = refuse(rows[aid]['appointmentStatus'])
+            if error:
+                skipped[aid] = error
+    return skipped
+
+
+def _raise_skipped(appointment_id, skipped):
+    if skipped:
+        raise skipped[int(appointment_id)]
+
+
+def _transition(ids, refuse, status, apply):
+    """
+    One lifecycle step in a transaction: locks the appointments, skips those refuse(status)
+    objects to, runs apply(cur, todo) on the rest and books the change into the daily load
+    tables; then drops their rooms' days from the occupancy cache.
+    status: their new status, None when apply deletes them. Returns (rows, skipped).
+    """
+    def step():
+        with database.transaction() as cur:
+            rows = _appointments(ids, cur, lock=True)
+            skipped = _skipped(ids, rows, refuse)
+            before = [rows[aid] for aid in ids if aid not in skipped]
+            if before:
+                apply(cur, [r['id'] for r in before])
+                daily_load.record(cur, before, [dict(r, appointmentStatus=status) for r in before] if status else [])
+        return rows, skipped
+
+    rows, skipped = with_retry(step)
+    for aid, r in rows.items():
+        if aid not in skipped and r['roomNumber'] is not None:
+            occupancy.invalidate(r['roomNumber'], r['appointmentDate'])
+    return rows, skipped
+
+
+def verify_appointments(appointment_ids, staff_id=None):
+    """
+    Moves appointments to Scheduled. With staff_id, that staff member is assigned to
+    each of them (an appointment whose slot they are already busy in is skipped);
+    without, each gets the first staff member free in its slot.
+    Returns ({id: staff_id assigned}, {id: ServiceError skipped}).
+    """
+    ids = _id_list(appointment_ids)
+    if not ids:
+        return {}, {}
+    def assign():
+        with database.transaction() as cur:
+            # Row locks: another desk may be cancelling these or verifying the same slots
+            rows = _appointments(ids, cur, lock=True)
+            skipped = _skipped(ids, rows, lambda status: InvalidState(f"Appointment is {status}.")
+                               if status in ['Cancelled', 'Completed'] else None)
+            for aid in ids:
+                if aid not in skipped and rows[aid]['startsAt'] is None:  # time text the 008 backfill could not read
+                    skipped[aid] = ValidationError(
+                        f"Appointment {aid} has no valid start time ('{rows[aid]['appointmentTime']}'). Fix its time first.")
+            todo = [rows[aid] for aid in ids if aid not in skipped]
+            if not todo:
+                return {}, skipped
+
+            # Which of the candidates are already busy at any of these instants, in one query
+            # (idx_appt_staff_starts); slots are compared on startsAt, not the time text
+            staff = [int(staff_id)] if staff_id else [s['staffID'] for s in database.get_staff()]
+            instants = sorted({r['startsAt'] for r in todo})
+            busy = {}
+            if staff:
+                cur.execute(f"""
+                    SELECT startsAt, staffID FROM appointment
+                    WHERE staffID IN ({_marks(staff)}) AND startsAt IN ({_marks(instants)}) AND appointmentStatus != 'Cancelled'
+                """, staff + instants)
+                for r in cur.fetchall():
+                    busy.setdefault(r['startsAt'], set()).add(r['staffID'])
+
+            assigned = {}
+            for r in todo:
+                taken = busy.setdefault(r['startsAt'], set())
+                sid = next((s for s in staff if s not in taken), None)
+                if sid is None:
+                    skipped[r['id']] = SlotUnavailable("Staff member was just booked for this slot." if staff_id
+                                                       else "No staff member is free in this slot.")
+                    continue
+                taken.add(sid)
+                assigned[r['id']] = sid
+
+            if assigned:
+                cases = " ".join(["WHEN %s THEN %s"] * len(assigned))
+                cur.execute(f"UPDATE appointment SET appointmentStatus='Scheduled', staffID = CASE id {cases} END "
+                            f"WHERE id IN ({_marks(assigned)})",
+                            [v for pair in assigned.items() for v in pair] + list(assigned))
+                daily_load.record(cur, [rows[aid] for aid in assigned],
+                                  [dict(rows[aid], appointmentStatus='Scheduled', staffID=sid) for aid, sid in assigned.items()])
+        return assigned, skipped
+
+    return with_retry(assign)
+
+
+def verify_appointment(appointment_id, staff_id):
+    """Assigns a free staff member and moves the appointment to Scheduled."""
+    _, skipped = verify_appointments([appointment_id], staff_id)
+    _raise_skipped(appointment_id, skipped)
+
+
+def cancel_appointments(appointment_ids):
+    """Cancels many appointments in one statement, freeing their room slots. Returns the skipped ones."""
+    ids = _id_list(appointment_ids)
+    if not ids:
+        return {}
+    _, skipped = _transition(
+        ids, lambda status: InvalidState(f"Cannot cancel {status} visit.") if status in ['Cancelled', 'Completed'] else None,
+        'Cancelled',
+        lambda cur, todo: cur.execute(_CANCEL_SQL.format(ids=_marks(todo), guard="IN ('Pending', 'Scheduled')"), todo))
+    return skipped
+
+
+def cancel_appointment(appointment_id):
+    """Cancels the appointment, freeing its room slot."""
+    _raise_skipped(appointment_id, cancel_appointments([appointment_id]))
+
+
+def delete_appointment(appointment_id):
+    """Deletes the record for good. Scheduled appointments must be cancelled first."""
+    aid = int(appointment_id)
+    _, skipped = _transition([aid], lambda status: InvalidState(
+        "Cannot delete 'Scheduled' appointment.\nPlease CANCEL it first.") if status == 'Scheduled' else None,
+                             None, lambda cur, todo: cur.execute("DELETE FROM appointment WHERE id=%s", todo))
+    _raise_skipped(aid, skipped)
+
+
+def reschedule_appointment(appointment_id):
+    """
+    First half of a reschedule: cancels a Scheduled appointment and returns the
+    (date, time) it held, to be passed to create_booking() as blocked_slot.
+    """
+    aid = int(appointment_id)
+    rows, skipped = _transition(
+        [aid], lambda status: None if status == 'Scheduled' else InvalidState("Only 'Scheduled' items can be rescheduled."),
+        'Cancelled', lambda cur, todo: cur.execute(_CANCEL_SQL.format(ids="%s", guard="= 'Scheduled'"), todo))
+    _raise_skipped(aid, skipped)
+    return rows[aid]['appointmentDate'], rows[aid]['appointmentTime']
+
+
+def complete_appointments(appointment_ids, treatment_id, notes=""):
+    """
+    Closes many visits with one treatment and note: one statement records them and bills
+    their payments. Returns the skipped (Cancelled or missing) ones.
+    """
+    treatment = next((t for t in database.get_treatments() if str(t['treatmentID']) == str(treatment_id)), None)
+    if treatment is None:
+        raise NotFound(f"Treatment {treatment_id} does not exist.")
+    ids = _id_list(appointment_ids)
+    if not ids:
+        return {}
+    _, skipped = _transition(
+        ids, lambda status: InvalidState("Appointment is Cancelled.") if status == 'Cancelled' else None,
+        'Completed', lambda cur, todo: cur.execute(_COMPLETE_SQL.format(ids=_marks(todo)),
+                                                   [notes, treatment['treatmentID'], treatment['treatmentCost']] + todo))
+    return skipped
+
+
+def complete_appointment(appointment_id, treatment_id, notes=""):
+    """Doctor closes the visit: records notes and treatment and bills it."""
+    _raise_skipped(appointment_id, complete_appointments([appointment_id], treatment_id, notes))
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    ap = argparse.ArgumentParser(description="Clinic scheduling operations without the Tk UI.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("request", help="patient booking (assigns the doctor's room)")
+    p.add_argument("patient"); p.add_argument("doctor"); p.add_argument("date"); p.add_argument("time")
+    p = sub.add_parser("book", help="front-desk booking (verify it afterwards)")
+    p.add_argument("patient"); p.add_argument("doctor"); p.add_argument("date"); p.add_argument("time")
+    p = sub.add_parser("verify", help="assign staff and schedule")
+    p.add_argument("appointment"); p.add_argument("staff")
+    for name in ("cancel", "delete", "reschedule"):
+        sub.add_parser(name).add_argument("appointment")
+    p = sub.add_parser("complete", help="close a visit")
+    p.add_argument("appointment"); p.add_argument("treatment"); p.add_argument("--notes", default="")
+    p = sub.add_parser("verify-batch", help="schedule many (auto-assigns free staff unless --staff)")
+    p.add_argument("appointments", nargs="+"); p.add_argument("--staff")
+    sub.add_parser("cancel-batch", help="cancel many").add_argument("appointments", nargs="+")
+    p = sub.add_parser("complete-batch", help="close many visits with one treatment")
+    p.add_argument("treatment"); p.add_argument("appointments", nargs="+"); p.add_argument("--notes", default="")
+    args = ap.parse_args()
+
+    def report_skipped(skipped):
+        for aid, error in skipped.items():
+            print(f"  skipped {aid}: {error}", file=sys.stderr)
+
+    try:
+        if args.command == "request":
+            print(f"Appointment {request_booking(args.patient, args.doctor, args.date, args.time)} requested.")
+        elif args.command == "book":
+            print(f"Appointment {create_booking(args.patient, args.doctor, args.date, args.time)} created.")
+        elif args.command == "verify":
+            verify_appointment(args.appointment, args.staff)
+            print(f"Appointment {args.appointment} scheduled.")
+        elif args.command == "cancel":
+            cancel_appointment(args.appointment)
+            print(f"Appointment {args.appointment} cancelled.")
+        elif args.command == "delete":
+            delete_appointment(args.appointment)
+            print(f"Appointment {args.appointment} deleted.")
+        elif args.command == "reschedule":
+            old_date, old_time = reschedule_appointment(args.appointment)
+            print(f"Appointment {args.appointment} cancelled; book a slot other than {old_date} {old_time}.")
+        elif args.command == "complete":
+            complete_appointment(args.appointment, args.treatment, args.notes)
+            print(f"Appointment {args.appointment} completed.")
+        elif args.command == "verify-batch":
+            assigned, skipped = verify_appointments(args.appointments, args.staff)
+            print(f"{len(assigned)} scheduled: " + ", ".join(f"{a} -> staff {s}" for a, s in assigned.items()))
+            report_skipped(skipped)
+        elif args.command == "cancel-batch":
+            skipped = cancel_appointments(args.appointments)
+            print(f"{len(set(args.appointments)) - len(skipped)} cancelled.")
+            report_skipped(skipped)
+        elif args.command == "complete-batch":
+            skipped = complete_appointments(args.appointments, args.treatment, args.notes)
+            print(f"{len(set(args.appointments)) - len(skipped)} completed.")
+            report_skipped(skipped)
+    except ServiceError as e:
+        print(f"{e.title}: {e}", file=sys.stderr)
+        sys.exit(1)
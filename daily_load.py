@@ -0,0 +1,168 @@
+import argparse
+from collections import Counter
+from datetime import date
+
+import availability
+import database
+
+# appointmentStatus -> counter column in every summary table
+STATUSES = {'Pending': 'pending', 'Scheduled': 'scheduled', 'Completed': 'completed', 'Cancelled': 'cancelled'}
+COUNTERS = list(STATUSES.values())
+
+# summary table -> the appointment column it counts by, per day (see migrations/006)
+TABLES = {
+    'daily_doctor_load': 'doctorID',
+    'daily_room_load': 'roomNumber',
+    'daily_staff_load': 'staffID',
+}
+VIEWS = {'doctor': 'daily_doctor_load', 'room': 'daily_room_load', 'staff': 'daily_staff_load'}
+
+# Appointment columns record() needs from each row
+COLUMNS = "appointmentDate, appointmentStatus, doctorID, roomNumber, staffID"
+
+# Owner table -> (its appointment column, ON DELETE action of that foreign key)
+OWNERS = {
+    'patient': ('patientID', 'CASCADE'),
+    'doctor': ('doctorID', 'CASCADE'),
+    'room': ('roomNumber', 'SET NULL'),
+    'staff': ('staffID', 'SET NULL'),
+}
+
+
+# --- INCREMENTAL UPDATES ---
+def record(cur, before, after):
+    """
+    Books a change to some appointments into the summary tables, inside the caller's
+    transaction. before/after: the rows (dicts with COLUMNS) as they were and as they
+    are now; [] for an insert or a delete. One upsert per table whose counts move.
+    """
+    deltas = Counter()  # (table, day, key, counter) -> change
+    for rows, sign in ((before, -1), (after, 1)):
+        for r in rows:
+            counter = STATUSES.get(r['appointmentStatus'])
+            if counter is None:
+                continue
+            for table, column in TABLES.items():
+                if r[column] is not None:
+                    deltas[(table, str(r['appointmentDate']), r[column], counter)] += sign
+
+    changes = {}  # table -> {(day, key): {counter: change}}
+    for (table, day, key, counter), n in deltas.items():
+        if n:
+            changes.setdefault(table, {}).setdefault((day, key), dict.fromkeys(COUNTERS, 0))[counter] += n
+    for table, rows in changes.items():
+        cur.executemany(f"""
+            INSERT INTO {table} (day, {TABLES[table]}, {', '.join(COUNTERS)})
+            VALUES (%s, %s, {', '.join(['%s'] * len(COUNTERS))})
+            ON DUPLICATE KEY UPDATE {', '.join(f'{c} = {c} + VALUES({c})' for c in COUNTERS)}
+        """, [(day, key, *(counts[c] for c in COUNTERS)) for (day, key), counts in rows.items()])
+
+
+def delete_owner(table, key):
+    """
+    Deletes a patient, doctor, room or staff row. The foreign keys then delete its
+    appointments or blank their column (see OWNERS), which no code path sees, so the
+    summary tables are corrected in the same transaction.
+    """
+    column, action = OWNERS[table]
+    with database.transaction() as cur:
+        cur.execute(f"SELECT {COLUMNS} FROM appointment WHERE {column}=%s FOR UPDATE", (key,))
+        before = cur.fetchall()
+        after = [] if action == 'CASCADE' else [dict(r, **{column: None}) for r in before]
+        record(cur, before, after)
+        cur.execute(f"DELETE FROM {table} WHERE {column}=%s", (key,))
+
+
+# --- READS (O(days x keys), never touch appointment) ---
+def load(view, date_from, date_to):
+    """
+    Counts per doctor, room or staff member over a day range, with utilisation: booked
+    (non-cancelled) slots out of the clinic's slots in those days.
+    """
+    table = VIEWS[view]
+    column = TABLES[table]
+    owner, name = {
+        'doctor': ("doctor", "o.doctorName"),
+        'room': ("room", "CONCAT('Room ', o.roomNumber)"),
+        'staff': ("staff", "o.staffName"),
+    }[view]
+    rows = database.fetch_all(f"""
+        SELECT s.{column} AS id, {name} AS name,
+               {', '.join(f'SUM(s.{c}) AS {c}' for c in COUNTERS)}
+        FROM {table} s JOIN {owner} o ON o.{column} = s.{column}
+        WHERE s.day BETWEEN %s AND %s
+        GROUP BY s.{column}
+        ORDER BY s.{column}
+    """, (str(date_from), str(date_to)))
+    days = (date.fromisoformat(str(date_to)) - date.fromisoformat(str(date_from))).days + 1
+    capacity = max(1, days) * len(availability.SLOTS)
+    for r in rows:
+        for c in COUNTERS:
+            r[c] = int(r[c] or 0)
+        r['utilisation'] = (r['pending'] + r['scheduled'] + r['completed']) / capacity
+    return rows
+
+
+# --- REBUILD / CHECK ---
+def _actual(column, cur=None):
+    sql = f"""
+        SELECT appointmentDate AS day, {column} AS id,
+               {', '.join(f"SUM(appointmentStatus = '{s}') AS {c}" for s, c in STATUSES.items())}
+        FROM appointment WHERE {column} IS NOT NULL
+        GROUP BY appointmentDate, {column}
+    """
+    if cur is None:
+        return database.fetch_all(sql)
+    cur.execute(sql)
+    return cur.fetchall()
+
+
+def check():
+    """Differences between the summary tables and appointment: {table: [(day, id, counter, stored, actual)]}."""
+    problems = {}
+    for table, column in TABLES.items():
+        actual = {(str(r['day']), r['id']): r for r in _actual(column)}
+        stored = {(str(r['day']), r['id']): r for r in database.fetch_all(
+            f"SELECT day, {column} AS id, {', '.join(COUNTERS)} FROM {table}")}
+        for key in actual.keys() | stored.keys():
+            for c in COUNTERS:
+                have = int((stored.get(key) or {}).get(c) or 0)
+                want = int((actual.get(key) or {}).get(c) or 0)
+                if have != want:
+                    problems.setdefault(table, []).append((key[0], key[1], c, have, want))
+    return problems
+
+
+def rebuild():
+    """Recomputes every summary table from appointment in one transaction. Returns {table: rows}."""
+    counts = {}
+    with database.transaction() as cur:
+        for table, column in TABLES.items():
+            cur.execute(f"DELETE FROM {table}")
+            cur.execute(f"""
+                INSERT INTO {table} (day, {column}, {', '.join(COUNTERS)})
+                SELECT appointmentDate, {column},
+                       {', '.join(f"SUM(appointmentStatus = '{s}')" for s in STATUSES)}
+                FROM appointment WHERE {column} IS NOT NULL
+                GROUP BY appointmentDate, {column}
+            """)
+            counts[table] = cur.rowcount
+    return counts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Daily doctor / room / staff load summary tables.")
+    ap.add_argument("command", choices=["check", "rebuild"])
+    args = ap.parse_args()
+
+    if args.command == "rebuild":
+        print(rebuild())
+    else:
+        problems = check()
+        for table, rows in problems.items():
+            print(f"{table}: {len(rows)} counter(s) out of step")
+            for day, key, counter, have, want in rows[:20]:
+                print(f"  {day} #{key} {counter}: stored {have}, actual {want}")
+        if problems:
+            raise SystemExit("Run 'python daily_load.py rebuild' to recompute them.")
+        print("Summary tables match appointment.")
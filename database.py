@@ -1,5 +1,12 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
-from tkinter import messagebox
+
+import query_stats
 
 # --- CONFIGURATION ---
 DB_CONFIG = {
@@ -11,57 +18,494 @@ DB_CONFIG = {
     'autocommit': True
 }
 
+REF_CACHE_TTL = 300  # seconds reference data (doctors, treatments, rooms, staff) is reused
+
+POOL_CONFIG = {
+    'max_size': 5,      # most connections open at once
+    'max_idle': 300,    # seconds a parked connection may sit before it is recycled
+    'timeout': 10,      # seconds to wait for a free connection before giving up
+}
+
+
+# --- CONNECTION POOL ---
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB connections.
+    Connections are pinged on checkout and recycled after sitting idle too long.
+    """
+
+    def __init__(self, factory, max_size=5, max_idle=300, timeout=10):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        self._idle = deque()  # (conn, parked_at) - newest on the right
+        self._size = 0        # open connections, idle + checked out
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0, 'created': 0, 'reused': 0,
+            'recycled': 0, 'broken': 0, 'waits': 0,
+            'wait_time': 0.0, 'peak_size': 0,
+        }
+
+    def acquire(self):
+        started = time.perf_counter()
+        while True:
+            conn = self._reserve(started)
+            if conn is None:
+                # We hold a free slot, open a brand new connection for it
+                try:
+                    conn = self.factory()
+                except Exception:
+                    self._drop(None)
+                    raise
+                self._count('created')
+                break
+            if self._healthy(conn):
+                self._count('reused')
+                break
+            self._count('broken')
+            self._drop(conn)
+
+        with self._cond:
+            self.stats['checkouts'] += 1
+            self.stats['wait_time'] += time.perf_counter() - started
+        return conn
+
+    def release(self, conn):
+        if not getattr(conn, 'open', True):
+            self._count('broken')
+            return self._drop(conn)
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def snapshot(self):
+        with self._cond:
+            data = dict(self.stats)
+            data['size'] = self._size
+            data['idle'] = len(self._idle)
+            data['in_use'] = self._size - len(self._idle)
+        return data
+
+    # --- internals ---
+    def _reserve(self, started):
+        """Returns an idle connection, or None once a slot for a new one is reserved."""
+        deadline = started + self.timeout
+        stale = []
+        try:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        conn, parked_at = self._idle.pop()
+                        if now - parked_at <= self.max_idle:
+                            return conn
+                        stale.append(conn)
+                        self._size -= 1
+                        self.stats['recycled'] += 1
+
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self.stats['peak_size'] = max(self.stats['peak_size'], self._size)
+                        return None
+
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No free DB connection after {self.timeout}s "
+                                          f"({self.max_size} in use)")
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+        finally:
+            for conn in stale:
+                self._close(conn)
+
+    def _healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _drop(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if conn is not None:
+            self._close(conn)
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+
+
+_pool = ConnectionPool(lambda: pymysql.connect(**DB_CONFIG), **POOL_CONFIG)
+
+
+def pool_stats():
+    return _pool.snapshot()
+
+
+def configure_pool(factory=None, **overrides):
+    """
+    Replaces the connection pool, e.g. configure_pool(max_size=20) for a load test.
+    factory defaults to pymysql.connect(**DB_CONFIG); overrides patch POOL_CONFIG.
+    """
+    global _pool
+    old = _pool
+    _pool = ConnectionPool(factory or (lambda: pymysql.connect(**DB_CONFIG)), **dict(POOL_CONFIG, **overrides))
+    old.close_all()
+
+
+# No UI in here: errors propagate to the caller. The screens run queries through
+# db_async.AsyncDB, which shows them in a message box on the Tk thread.
 def get_conn():
-    try:
-        return pymysql.connect(**DB_CONFIG)
-    except Exception as e:
-        messagebox.showerror("DB Connection Error", str(e))
-        return None
+    """Checks a connection out of the pool. Hand it back with release_conn()."""
+    return _pool.acquire()
+
+
+def release_conn(conn):
+    _pool.release(conn)
+
 
+# Every round trip is timed into query_stats.stats (see query_stats.py)
 def fetch_all(sql, params=()):
+    started = time.perf_counter()
     conn = get_conn()
-    if not conn: return []
+    acquired = time.perf_counter()
+    rows = None
     try:
         with conn.cursor() as cursor:
             cursor.execute(sql, params)
-            return cursor.fetchall()
+            rows = cursor.fetchall()
+            return rows
     finally:
-        conn.close()
+        release_conn(conn)
+        query_stats.stats.record(sql, time.perf_counter() - acquired, None if rows is None else len(rows),
+                                 acquired - started)
 
 def execute_query(sql, params=()):
+    """Runs one autocommitted statement. Returns lastrowid for an INSERT, else True."""
+    lastrowid, _ = _autocommit(sql, params)
+    return lastrowid if sql.strip().upper().startswith("INSERT") else True
+
+def execute_update(sql, params=()):
+    """Runs one autocommitted UPDATE/DELETE and returns how many rows it changed."""
+    _, rowcount = _autocommit(sql, params)
+    return rowcount
+
+def _autocommit(sql, params):
+    started = time.perf_counter()
     conn = get_conn()
-    if not conn: return False
+    acquired = time.perf_counter()
+    rows = None
     try:
         with conn.cursor() as cursor:
             cursor.execute(sql, params)
-            return cursor.lastrowid if sql.strip().upper().startswith("INSERT") else True
-    except Exception as e:
-        messagebox.showerror("Database Error", str(e))
-        return False
+            rows = cursor.rowcount
+            return cursor.lastrowid, rows
+    finally:
+        release_conn(conn)
+        query_stats.stats.record(sql, time.perf_counter() - acquired, rows, acquired - started)
+
+@contextmanager
+def transaction():
+    """
+    Runs a multi-statement workflow on ONE pooled connection with ONE commit.
+    Yields a DictCursor (timed per statement); use cursor.lastrowid instead of re-querying MAX(id).
+    Any exception rolls everything back and is re-raised to the caller.
+    """
+    started = time.perf_counter()
+    conn = _pool.acquire()
+    acquired = time.perf_counter()
+    try:
+        conn.begin()
+        query_stats.stats.record("BEGIN", time.perf_counter() - acquired, 0, acquired - started)
+        with conn.cursor() as cursor:
+            yield query_stats.TimedCursor(cursor, query_stats.stats)
+        committing = time.perf_counter()
+        conn.commit()
+        query_stats.stats.record("COMMIT", time.perf_counter() - committing, 0)
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
     finally:
-        conn.close()
+        release_conn(conn)
+
+def _fetch(cursor, sql, params):
+    # Helpers below work standalone or as one step inside a transaction()
+    if cursor is None:
+        return fetch_all(sql, params)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
 
 # --- SMART LOGIC: Get Only Free Staff ---
-def get_available_staff(date, time):
+# Slots are compared on startsAt (migration 008): appointmentTime text comes in several spellings.
+def get_available_staff(starts_at, cursor=None):
     """
-    Returns a list of staff members who are NOT booked at the given date/time.
+    Returns a list of staff members who are NOT booked at the given instant (a datetime).
     """
     sql = """
         SELECT * FROM staff 
         WHERE staffID NOT IN (
             SELECT staffID FROM appointment 
-            WHERE appointmentDate = %s 
-            AND appointmentTime = %s 
+            WHERE startsAt = %s 
             AND appointmentStatus != 'Cancelled'
             AND staffID IS NOT NULL
         )
     """
-    return fetch_all(sql, (date, time))
+    return _fetch(cursor, sql, (starts_at,))
 
-def is_slot_available(room_id, date, time):
-    sql = "SELECT * FROM appointment WHERE roomNumber=%s AND appointmentDate=%s AND appointmentTime=%s AND appointmentStatus!='Cancelled'"
-    if len(fetch_all(sql, (room_id, date, time))) > 0: return False
+def is_slot_available(room_id, starts_at, cursor=None):
+    sql = "SELECT * FROM appointment WHERE roomNumber=%s AND startsAt=%s AND appointmentStatus!='Cancelled'"
+    if len(_fetch(cursor, sql, (room_id, starts_at))) > 0: return False
     return True
 
-def set_room_status(room_id, status):
-    execute_query("UPDATE room SET roomStatus=%s WHERE roomNumber=%s", (status, room_id))
\ No newline at end of file
+# --- REFERENCE DATA CACHE ---
+class RefCache:
+    """
+    In-process TTL cache for tables that barely change.
+    Entries are keyed by table; admin writes call invalidate() with the tables they touch.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}  # table -> (expires_at, rows)
+        self.stats = {}  # table -> {'hits': n, 'misses': n, 'invalidations': n}
+
+    def get(self, table, loader):
+        now = time.monotonic()
+        with self._lock:
+            counters = self.stats.setdefault(table, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            entry = self._data.get(table)
+            if entry and entry[0] > now:
+                counters['hits'] += 1
+                return entry[1]
+            counters['misses'] += 1
+        rows = loader()  # outside the lock; a failed load raises and caches nothing
+        with self._lock:
+            self._data[table] = (now + self.ttl, rows)
+        return rows
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables or list(self._data):
+                if self._data.pop(table, None) is not None:
+                    self.stats.setdefault(table, {'hits': 0, 'misses': 0, 'invalidations': 0})['invalidations'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {table: dict(c) for table, c in self.stats.items()}
+
+
+_ref_cache = RefCache(REF_CACHE_TTL)
+
+_REF_QUERIES = {
+    'doctor': "SELECT doctorID, doctorName, doctorSpecialty, assignedRoom FROM doctor",
+    'treatment': "SELECT treatmentID, treatment, treatmentCost FROM treatment",
+    'room': "SELECT roomNumber FROM room",  # numbers only: room state comes from occupancy.py
+    'staff': "SELECT staffID, staffName, staffRole FROM staff",
+}
+
+
+def _load_reference(table):
+    # Unlike fetch_all, errors propagate so an outage is never cached as an empty list
+    conn = _pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(_REF_QUERIES[table])
+            return cursor.fetchall()
+    finally:
+        release_conn(conn)
+
+
+def get_reference(table):
+    """Cached rows of a reference table ('doctor', 'treatment', 'room', 'staff'). Do not modify them."""
+    return _ref_cache.get(table, lambda: _load_reference(table))
+
+
+def get_doctors(): return get_reference('doctor')
+def get_treatments(): return get_reference('treatment')
+def get_room_numbers(): return [r['roomNumber'] for r in get_reference('room')]
+def get_staff(): return get_reference('staff')
+
+
+def get_doctor(doctor_id):
+    """The doctor's cached row, or None. A miss reloads the table once: the doctor may be newer than the cache."""
+    for attempt in range(2):
+        for d in get_doctors():
+            if str(d['doctorID']) == str(doctor_id):
+                return d
+        if attempt == 0:
+            invalidate_reference('doctor')
+    return None
+
+
+def invalidate_reference(*tables):
+    """Drops cached reference data. No arguments drops everything."""
+    _ref_cache.invalidate(*tables)
+
+
+def ref_cache_stats():
+    return _ref_cache.snapshot()
+
+# --- MIGRATIONS ---
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# MySQL errors that just mean "this change is already in the schema"
+# (duplicate column, duplicate key name, multiple primary key, can't drop missing key)
+_ALREADY_APPLIED = {1060, 1061, 1068, 1091}
+
+# The per-click queries the indexes are meant for, with sample parameters for EXPLAIN
+HOT_QUERIES = {
+    "DoctorScreen.refresh": (
+        "SELECT a.id FROM appointment a JOIN patient p ON a.patientID=p.patientID "
+        "WHERE a.doctorID=%s AND a.startsAt >= %s AND a.startsAt < %s "
+        "AND a.appointmentStatus IN ('Scheduled', 'Completed') ORDER BY a.startsAt ASC",
+        (1, '2025-01-06', '2025-01-13')),
+    "PatientScreen.refresh": (
+        "SELECT a.id FROM appointment a JOIN doctor d ON a.doctorID=d.doctorID "
+        "WHERE a.patientID=%s ORDER BY a.startsAt DESC",
+        (1,)),
+    "request_booking sequence check": (
+        "SELECT appointmentDate, appointmentTime FROM appointment WHERE patientID=%s AND startsAt >= %s "
+        "AND appointmentStatus != 'Cancelled' ORDER BY startsAt DESC LIMIT 1",
+        (1, '2025-01-01 09:00:00')),
+    "is_slot_available": (
+        "SELECT * FROM appointment WHERE roomNumber=%s AND startsAt=%s AND appointmentStatus!='Cancelled'",
+        (1, '2025-01-01 09:00:00')),
+    "occupancy.busy_slots": (
+        "SELECT roomNumber, startsAt FROM appointment WHERE roomNumber IN (%s, %s) "
+        "AND startsAt >= %s AND startsAt < %s AND appointmentStatus != 'Cancelled'",
+        (1, 2, '2025-01-01', '2025-01-08')),
+    "get_available_staff": (
+        "SELECT * FROM staff WHERE staffID NOT IN (SELECT staffID FROM appointment "
+        "WHERE startsAt=%s AND appointmentStatus!='Cancelled' AND staffID IS NOT NULL)",
+        ('2025-01-01 09:00:00',)),
+    "reports.revenue": (
+        "SELECT DATE_FORMAT(a.appointmentDate, '%%Y-%%m'), COUNT(*), SUM(pay.paymentAmount) FROM payment pay "
+        "JOIN appointment a ON a.paymentID = pay.paymentID WHERE a.appointmentDate >= %s "
+        "GROUP BY DATE_FORMAT(a.appointmentDate, '%%Y-%%m') WITH ROLLUP",
+        ('2025-01-01',)),
+}
+
+
+def _split_sql(text):
+    lines = [l for l in text.splitlines() if not l.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def pending_migrations():
+    applied = {r['version'] for r in fetch_all("SELECT version FROM schema_migrations")}
+    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    return [f for f in files if f[:-4] not in applied]
+
+
+def explain_hot_queries():
+    """Returns {query name: [EXPLAIN rows]} for HOT_QUERIES."""
+    plans = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        conn = _pool.acquire()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("EXPLAIN " + sql, params)
+                plans[name] = cursor.fetchall()
+        except pymysql.MySQLError as e:
+            plans[name] = [{'table': '-', 'type': 'error', 'key': None, 'rows': None, 'Extra': str(e)}]
+        finally:
+            release_conn(conn)
+    return plans
+
+
+def format_plans(plans):
+    out = []
+    for name, rows in plans.items():
+        for r in rows:
+            scan = "  <-- FULL SCAN" if r.get('type') == 'ALL' else ""
+            out.append(f"{name:<24} {str(r.get('table')):<12} type={str(r.get('type')):<7} "
+                       f"key={str(r.get('key')):<24} rows={r.get('rows')}{scan}")
+    return "\n".join(out)
+
+
+def migrate(explain=False, log=print):
+    """
+    Applies every migrations/NNN_*.sql not yet recorded in schema_migrations, in order.
+    With explain=True the hot-query plans are logged before and after.
+    Returns the list of versions applied.
+    """
+    conn = _pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version VARCHAR(100) PRIMARY KEY,
+                    appliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+    finally:
+        release_conn(conn)
+
+    if explain:
+        log("--- EXPLAIN before ---")
+        log(format_plans(explain_hot_queries()))
+
+    applied = []
+    for filename in pending_migrations():
+        version = filename[:-4]
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+            statements = _split_sql(f.read())
+
+        # DDL auto-commits in MySQL, so each statement stands on its own
+        conn = _pool.acquire()
+        try:
+            with conn.cursor() as cursor:
+                for stmt in statements:
+                    try:
+                        cursor.execute(stmt)
+                    except pymysql.MySQLError as e:
+                        if e.args and e.args[0] in _ALREADY_APPLIED:
+                            log(f"  {version}: skipped (already applied): {e.args[1]}")
+                            continue
+                        raise
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        finally:
+            release_conn(conn)
+        log(f"Applied {version}")
+        applied.append(version)
+
+    if explain:
+        log("--- EXPLAIN after ---")
+        log(format_plans(explain_hot_queries()))
+    return applied
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["migrate"]:
+        done = migrate(explain="--explain" in sys.argv)
+        print(f"{len(done)} migration(s) applied.")
+    else:
+        print("usage: python database.py migrate [--explain]")
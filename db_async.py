@@ -0,0 +1,190 @@
+import queue
+import sys
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+import query_stats
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Per-query latency histogram. Thread-safe; fed by the worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # name -> {'counts': [...], 'n': int, 'total': float, 'max': float}
+
+    def record(self, name, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            d = self._data.setdefault(name, {'counts': [0] * (len(BUCKETS_MS) + 1), 'n': 0, 'total': 0.0, 'max': 0.0})
+            i = 0
+            while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+                i += 1
+            d['counts'][i] += 1
+            d['n'] += 1
+            d['total'] += ms
+            d['max'] = max(d['max'], ms)
+
+    def percentile(self, name, pct):
+        """Upper bound (ms) of the bucket holding the pct-th percentile."""
+        with self._lock:
+            d = self._data.get(name)
+            if not d: return None
+            target, seen = d['n'] * pct / 100, 0
+            for i, count in enumerate(d['counts']):
+                seen += count
+                if seen >= target:
+                    return BUCKETS_MS[i] if i < len(BUCKETS_MS) else d['max']
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(d, counts=list(d['counts'])) for name, d in self._data.items()}
+
+    def report(self):
+        lines = [f"{'query':<28}{'n':>6}{'avg ms':>9}{'p50':>7}{'p95':>7}{'max ms':>9}"]
+        for name, d in sorted(self.snapshot().items()):
+            lines.append(f"{name:<28}{d['n']:>6}{d['total'] / d['n']:>9.1f}"
+                         f"{self.percentile(name, 50):>7.0f}{self.percentile(name, 95):>7.0f}{d['max']:>9.1f}")
+        return "\n".join(lines)
+
+
+class Ticket:
+    def __init__(self, name, generation, owner, on_done, on_error):
+        self.name = name
+        self.generation = generation
+        self.owner = owner
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future:
+            self.future.cancel()  # only succeeds if the worker has not started it yet
+
+
+class AsyncDB:
+    """
+    Runs database work on a small thread pool so the Tk main loop never blocks.
+    Results are queued by the workers and handed to callbacks on the Tk thread
+    through an after() poll. cancel_all() drops every request still in flight;
+    cancel_owned() drops only a screen's own requests. ClinicApp.show_view uses
+    the first when screens are rebuilt on every switch and the second when a
+    cached screen is evicted (hidden screens keep receiving their results).
+    """
+
+    def __init__(self, root, workers=4, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.latency = LatencyHistogram()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._results = queue.Queue()
+        self._generation = 0
+        self._pending = set()
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, name, fn, *args, on_done=None, on_error=None, owner=None):
+        """
+        Runs fn(*args) on a worker. on_done(result) / on_error(exc) run on the Tk thread,
+        unless the request was cancelled or its owner widget has been destroyed meanwhile.
+        """
+        ticket = Ticket(name, self._generation, owner, on_done, on_error)
+        ticket.future = self._executor.submit(self._run, ticket, fn, args, time.perf_counter())
+        self._pending.add(ticket)
+        return ticket
+
+    def load(self, name, fn, render, owner, placeholder=None):
+        """submit() for screen loads: optional Loading... placeholder until render(result) runs."""
+        overlay = show_loading(placeholder) if placeholder is not None else None
+
+        def finish(callback, value):
+            if overlay is not None and overlay.winfo_exists():
+                overlay.destroy()
+            callback(value)
+
+        return self.submit(name, fn, owner=owner,
+                           on_done=lambda result: finish(render, result),
+                           on_error=lambda error: finish(self._default_error, error))
+
+    def cancel_all(self):
+        self._generation += 1
+        for ticket in list(self._pending):
+            ticket.cancel()
+        self._pending.clear()
+
+    def cancel_owned(self, widget):
+        """Cancels the requests owned by widget or any of its children (a screen being destroyed)."""
+        prefix = str(widget) + "."
+        for ticket in list(self._pending):
+            owner = str(ticket.owner) if ticket.owner is not None else ""
+            if owner == str(widget) or owner.startswith(prefix):
+                ticket.cancel()
+                self._pending.discard(ticket)
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- internals ---
+    def _run(self, ticket, fn, args, queued_at):
+        if ticket.cancelled:
+            return
+        self.latency.record("(queue wait)", time.perf_counter() - queued_at)
+        started = time.perf_counter()
+        try:
+            with query_stats.stats.operation(ticket.name):  # counts this request's round trips
+                result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+        self.latency.record(ticket.name, time.perf_counter() - started)
+        self._results.put((ticket, result, error))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    ticket, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending.discard(ticket)
+                if ticket.cancelled or ticket.generation != self._generation:
+                    continue
+                if ticket.owner is not None and not ticket.owner.winfo_exists():
+                    continue
+                # A failing callback is reported like any Tk callback error; the next results still arrive
+                try:
+                    if error is not None:
+                        (ticket.on_error or self._default_error)(error)
+                    elif ticket.on_done:
+                        ticket.on_done(result)
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            if not self._closed:
+                self.root.after(self.poll_ms, self._poll)
+
+    def _default_error(self, error):
+        show_error(error)
+
+
+def show_error(error, parent=None):
+    """Message box for a failed request; clinic_service refusals carry their own title."""
+    options = {'parent': parent} if parent is not None else {}
+    messagebox.showerror(getattr(error, 'title', "Database Error"), str(error), **options)
+
+
+def show_loading(widget, text="Loading..."):
+    """Puts a 'Loading...' placeholder over widget. Call .destroy() on the result when done."""
+    label = tk.Label(widget, text=text, fg="#777", bg="white", font=("Arial", 10, "italic"))
+    label.place(relx=0.5, rely=0.5, anchor="center")
+    return label
@@ -1,30 +1,72 @@
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
+from datetime import date, timedelta
+import availability
 import database
-import login_view
+import clinic_service
+from tree_sync import KeyedTree
+
+WINDOW_DAYS = {'Week': 7, 'Day': 1}
+WINDOW_MAX_AGE = 60  # seconds a fetched window is shown again without a query (Refresh always queries)
+WINDOW_CACHE = 8  # windows kept per screen: the visible one, its neighbours and recent ones
+
+
+def window_start(day, days):
+    """First day of the window of `days` days that holds day; weeks start on Monday."""
+    return day - timedelta(days=day.weekday()) if days == 7 else day
 
 
 class DoctorScreen(tk.Frame):
+    user_bound = True  # dropped from the view cache on logout
+
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
         self.did = controller.current_user_id
-
-        doc = database.fetch_all("SELECT doctorName, assignedRoom, doctorSpecialty FROM doctor WHERE doctorID=%s",
-                                 (self.did,))[0]
+        self.db = controller.db
 
         header = tk.Frame(self, bg="#eee", pady=15)
         header.pack(fill="x")
-        tk.Label(header, text=f"Dr. {doc['doctorName']}", font=("Arial", 16, "bold"), bg="#eee").pack(side="left",
-                                                                                                      padx=20)
-        tk.Label(header, text=f"{doc['doctorSpecialty']} | Room: {doc['assignedRoom']}", bg="#eee").pack(side="left")
-        tk.Button(header, text="Logout", command=lambda: controller.show_view(login_view.LoginScreen)).pack(
+        self.lbl_name = tk.Label(header, text="Loading...", font=("Arial", 16, "bold"), bg="#eee")
+        self.lbl_name.pack(side="left", padx=20)
+        self.lbl_info = tk.Label(header, text="", bg="#eee")
+        self.lbl_info.pack(side="left")
+        tk.Button(header, text="Logout", command=controller.logout).pack(
             side="right", padx=20)
 
-        cols = ("ID", "Time", "Patient", "Status", "Current Notes")
-        self.tree = ttk.Treeview(self, columns=cols, show='headings')
+        # Calendar: only the visible day/week is queried (see fetch_window)
+        nav = tk.Frame(self, pady=5)
+        nav.pack(fill="x", padx=20)
+        tk.Button(nav, text="< Prev", command=lambda: self.shift(-1)).pack(side="left")
+        tk.Button(nav, text="Today", command=lambda: self.go_to(date.today())).pack(side="left", padx=5)
+        tk.Button(nav, text="Next >", command=lambda: self.shift(1)).pack(side="left")
+        self.cb_mode = ttk.Combobox(nav, values=list(WINDOW_DAYS), width=6, state="readonly")
+        self.cb_mode.set("Week")
+        self.cb_mode.bind("<<ComboboxSelected>>", self.change_mode)
+        self.cb_mode.pack(side="left", padx=10)
+        self.lbl_range = tk.Label(nav, text="", font=("Arial", 11, "bold"))
+        self.lbl_range.pack(side="left", padx=10)
+        tk.Button(nav, text="Refresh", command=self.refresh).pack(side="right")
+
+        # Grid: one row per slot, one column per day; clicking a cell selects its visits below
+        self.cal = ttk.Treeview(self, show='headings', selectmode="none", height=len(availability.SLOTS))
+        self.cal.pack(fill="x", padx=20)
+        self.cal.bind("<ButtonRelease-1>", self.on_cell_click)
+        self.cal_view = KeyedTree(self.cal)
+
+        cols = ("ID", "Day", "Time", "Patient", "Status", "Current Notes")
+        # Several visits can be selected and completed with the same treatment and note
+        self.tree = ttk.Treeview(self, columns=cols, show='headings', selectmode="extended")
         for c in cols: self.tree.heading(c, text=c)
         self.tree.pack(fill="both", expand=True, padx=20, pady=10)
+        self.view = KeyedTree(self.tree)
+
+        self.start = date.today()
+        self.shown = None  # (first day, days) on screen
+        self.windows = {}  # (first day, days) -> (time.monotonic() fetched, rows)
+        self.prefetching = set()
+        self.cells = {}  # (time iid, day) -> appointment ids in that calendar cell
 
         f_act = tk.LabelFrame(self, text="Consultation", padx=10, pady=10)
         f_act.pack(fill="x", padx=20, pady=10)
@@ -34,50 +76,172 @@ class DoctorScreen(tk.Frame):
         self.en_note.pack(side="left", padx=10)
 
         tk.Label(f_act, text="Treatment:").pack(side="left")
-        treats = database.fetch_all("SELECT treatmentID, treatment, treatmentCost FROM treatment")
-        self.t_map = {f"{t['treatment']} (${t['treatmentCost']})": t for t in treats}
-        self.cb_treat = ttk.Combobox(f_act, values=list(self.t_map.keys()));
+        self.t_map = {}
+        self.cb_treat = ttk.Combobox(f_act, values=[]);
         self.cb_treat.pack(side="left", padx=10)
 
         tk.Button(f_act, text="Complete Visit", bg="green", fg="white", command=self.complete).pack(side="left")
+
+        # Header and treatment list load in the background
+        self.db.submit("doctor_header", database.get_doctor, self.did, owner=self, on_done=self.show_header)
+        self.db.submit("treatments", database.get_treatments, owner=self, on_done=self.show_treatments)
+        self.refresh()
+
+    def on_show(self):
         self.refresh()
 
+    def show_header(self, doc):
+        if doc is None:
+            return self.lbl_name.config(text=f"Doctor #{self.did} not found")
+        self.lbl_name.config(text=f"Dr. {doc['doctorName']}")
+        self.lbl_info.config(text=f"{doc['doctorSpecialty']} | Room: {doc['assignedRoom']}")
+
+    def show_treatments(self, treats):
+        self.t_map = {f"{t['treatment']} (${t['treatmentCost']})": t for t in treats}
+        self.cb_treat['values'] = list(self.t_map.keys())
+
+    # --- CALENDAR WINDOWS ---
+    def window(self, day):
+        days = WINDOW_DAYS[self.cb_mode.get()]
+        return window_start(day, days), days
+
+    def shift(self, step):
+        start, days = self.window(self.start)
+        self.go_to(start + timedelta(days=step * days))
+
+    def change_mode(self, event=None):
+        # Week -> Day lands on today when today is in the week on screen
+        start, days = self.shown or self.window(self.start)
+        today = date.today()
+        self.go_to(today if start <= today < start + timedelta(days=days) else start)
+
     def refresh(self):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        # CHANGE: Added "AND a.appointmentStatus IN ('Scheduled', 'Completed')"
-        # This hides Pending (unverified) and Cancelled appointments from the doctor.
-        rows = database.fetch_all("""
-            SELECT a.id, a.appointmentTime, a.appointmentStatus, a.doctorNotes, p.patientName 
-            FROM appointment a JOIN patient p ON a.patientID=p.patientID 
-            WHERE a.doctorID=%s 
+        self.go_to(self.start, force=True)
+
+    def go_to(self, day, force=False):
+        """Shows the window holding day: from the cache when it is fresh, else one range query."""
+        key = self.window(day)
+        self.start = key[0]
+        cached = self.windows.get(key)
+        if cached and not force and time.monotonic() - cached[0] < WINDOW_MAX_AGE:
+            self.show_window(key, cached[1])
+            self.prefetch(key)
+            return
+        self.db.load("DoctorScreen.refresh", lambda: self.fetch_window(*key),
+                     lambda rows: self.window_loaded(key, rows), owner=self,
+                     placeholder=None if len(self.view) else self.tree)
+
+    def fetch_window(self, start, days):
+        # Pending (unverified) and Cancelled appointments are hidden from the doctor.
+        # A startsAt range on idx_appt_doctor_starts: cost grows with the window, not the history.
+        return database.fetch_all("""
+            SELECT a.id, a.startsAt, a.appointmentTime, a.appointmentStatus, a.doctorNotes, p.patientName
+            FROM appointment a JOIN patient p ON a.patientID=p.patientID
+            WHERE a.doctorID=%s
+            AND a.startsAt >= %s AND a.startsAt < %s
             AND a.appointmentStatus IN ('Scheduled', 'Completed')
-            ORDER BY a.appointmentDate ASC
-        """, (self.did,))
+            ORDER BY a.startsAt ASC
+        """, (self.did, str(start), str(start + timedelta(days=days))))
+
+    def window_loaded(self, key, rows):
+        self.store_window(key, rows)
+        if key == self.window(self.start):  # still the one wanted (no Prev/Next meanwhile)
+            self.show_window(key, rows)
+            self.prefetch(key)
+
+    def store_window(self, key, rows):
+        self.windows[key] = (time.monotonic(), rows)
+        while len(self.windows) > WINDOW_CACHE:
+            oldest = min((k for k in self.windows if k != key), key=lambda k: self.windows[k][0])
+            del self.windows[oldest]
+
+    def prefetch(self, key):
+        """Loads the windows before and after key in the background, so Prev/Next show at once."""
+        start, days = key
+        for neighbour in ((start - timedelta(days=days), days), (start + timedelta(days=days), days)):
+            cached = self.windows.get(neighbour)
+            if neighbour in self.prefetching or (cached and time.monotonic() - cached[0] < WINDOW_MAX_AGE):
+                continue
+            self.prefetching.add(neighbour)
+
+            def done(rows, neighbour=neighbour):
+                self.prefetching.discard(neighbour)
+                self.store_window(neighbour, rows)
 
+            self.db.submit("DoctorScreen.prefetch", self.fetch_window, *neighbour, owner=self, on_done=done,
+                           on_error=lambda e, neighbour=neighbour: self.prefetching.discard(neighbour))
+
+    def show_window(self, key, rows):
+        start, days = key
+        self.shown = key
+        day_list = [start + timedelta(days=i) for i in range(days)]
+        self.lbl_range.config(text=f"{start:%a %d %b %Y}" if days == 1 else f"{start:%d %b} - {day_list[-1]:%d %b %Y}")
+
+        columns = ["time"] + [f"d{i}" for i in range(days)]
+        if list(self.cal['columns']) != columns:
+            self.cal_view.clear()
+            self.cal['columns'] = columns
+            self.cal.column("time", width=80, stretch=False)
+        self.cal.heading("time", text="Time")
+        for i, d in enumerate(day_list):
+            self.cal.heading(f"d{i}", text=f"{d:%a %d/%m}" + (" (today)" if d == date.today() else ""))
+
+        self.cells, names = {}, {}
         for r in rows:
-            self.tree.insert("", "end", values=(
-                r['id'], r['appointmentTime'], r['patientName'], r['appointmentStatus'], r['doctorNotes']
-            ))
+            cell = (str(r['startsAt'].time()), r['startsAt'].date())
+            self.cells.setdefault(cell, []).append(r['id'])
+            names.setdefault(cell, []).append(("[done] " if r['appointmentStatus'] == 'Completed' else "") + r['patientName'])
+        times = sorted(set(availability.SLOTS) | {r['startsAt'].time() for r in rows})  # off-grid times get a row too
+        self.cal_view.sync((t, [t.strftime("%I:%M %p")] + [", ".join(names.get((str(t), d), [])) for d in day_list])
+                           for t in times)
+        self.view.sync((r['id'], (r['id'], f"{r['startsAt']:%a %d/%m}", r['appointmentTime'], r['patientName'],
+                                  r['appointmentStatus'], r['doctorNotes']))
+                       for r in rows)
+
+    def on_cell_click(self, event):
+        row, column = self.cal.identify_row(event.y), self.cal.identify_column(event.x)  # column is '#1', '#2', ...
+        if not row or not self.shown or column in ("", "#1"):
+            return
+        day = self.shown[0] + timedelta(days=int(column[1:]) - 2)
+        ids = [str(aid) for aid in self.cells.get((row, day), [])]
+        self.tree.selection_set(ids)
+        if ids:
+            self.tree.see(ids[0])
+
+    def completed(self, ids, note):
+        """Marks visits Completed in every cached window and redraws, instead of re-querying."""
+        done = {int(aid) for aid in ids}
+        for _, rows in self.windows.values():
+            for r in rows:
+                if r['id'] in done:
+                    r['appointmentStatus'], r['doctorNotes'] = 'Completed', note
+        if self.shown in self.windows:
+            self.show_window(self.shown, self.windows[self.shown][1])
 
     def complete(self):
         sel = self.tree.selection()
-        if not sel or not self.cb_treat.get(): return messagebox.showerror("Error", "Select Appt & Treatment")
+        if not sel or self.cb_treat.get() not in self.t_map: return messagebox.showerror("Error", "Select Appt & Treatment")
 
-        aid = self.tree.item(sel[0])['values'][0]
+        ids = [self.tree.item(iid)['values'][0] for iid in sel]
         treat = self.t_map[self.cb_treat.get()]
+        note = self.en_note.get()
+
+        if len(ids) == 1:
+            def done(_):
+                messagebox.showinfo("Success", "Visit Completed");
+                self.completed(ids, note);
+                self.en_note.delete(0, 'end')
+
+            return self.db.submit("complete", clinic_service.complete_appointment, ids[0], treat['treatmentID'],
+                                  note, owner=self, on_done=done)
+
+        def done_batch(skipped):
+            self.completed([aid for aid in ids if aid not in skipped], note)
+            self.en_note.delete(0, 'end')
+            text = f"{len(ids) - len(skipped)} visits completed."
+            if skipped:
+                text += "\n\n" + "\n".join(f"#{aid}: {error}" for aid, error in skipped.items())
+            messagebox.showinfo("Success", text)
 
-        # 1. Update Appt
-        database.execute_query(
-            "UPDATE appointment SET appointmentStatus='Completed', doctorNotes=%s, treatmentID=%s WHERE id=%s",
-            (self.en_note.get(), treat['treatmentID'], aid))
-        # 2. Update Payment
-        pid = database.fetch_all("SELECT paymentID FROM appointment WHERE id=%s", (aid,))[0]['paymentID']
-        database.execute_query("UPDATE payment SET paymentAmount=%s, paymentStatus='Paid' WHERE paymentID=%s",
-                               (treat['treatmentCost'], pid))
-        # 3. Free Room
-        room = database.fetch_all("SELECT roomNumber FROM appointment WHERE id=%s", (aid,))[0]['roomNumber']
-        if room: database.set_room_status(room, 'Available')
-
-        messagebox.showinfo("Success", "Visit Completed");
-        self.refresh();
-        self.en_note.delete(0, 'end')
\ No newline at end of file
+        self.db.submit("complete_batch", clinic_service.complete_appointments, ids, treat['treatmentID'], note,
+                       owner=self, on_done=done_batch)
\ No newline at end of file
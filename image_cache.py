@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+
+THUMB_DIRNAME = ".thumbs"  # created next to the source images, e.g. assets/.thumbs/
+MAX_BYTES = 16 * 1024 * 1024  # decoded pixels kept in memory before LRU eviction
+PREFETCH_WAIT = 5  # seconds get() waits for an image the prefetcher is already decoding
+
+
+class ImageCache:
+    """
+    (path, size) -> PhotoImage cache for the landing page.
+
+    Level 1: PhotoImages in memory, LRU-evicted past max_bytes.
+    Level 2: pre-scaled PNG thumbnails on disk, which Tk loads natively (no
+             JPEG decode, no Pillow). A thumbnail is rebuilt when the source
+             file is newer than it.
+    Only a miss on both levels decodes and resizes the original with Pillow.
+
+    prefetch() does the decode/resize on a background thread ahead of time, so
+    get() only has to wrap the ready PIL image in an ImageTk.PhotoImage.
+
+    Evicting an entry only drops the cache's reference; pages keep their own
+    references to the images they are showing.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()  # (path, size) -> (PhotoImage, bytes, decode_seconds)
+        self._bytes = 0
+        self._ready = {}     # (path, size) -> (PIL image, decode_seconds) decoded by the prefetcher
+        self._inflight = {}  # (path, size) -> threading.Event set when the prefetcher is done with it
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0, 'disk_hits': 0, 'decodes': 0, 'evictions': 0, 'prefetched': 0,
+            'decode_seconds': 0.0, 'saved_seconds': 0.0,
+        }
+
+    def get(self, path, size):
+        key = (path, tuple(size))
+        with self._lock:
+            entry = self._images.get(key)
+            if entry:
+                self._images.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                self.stats['saved_seconds'] += entry[2]
+                return entry[0]
+            pending = self._inflight.get(key)
+
+        if pending is not None:
+            pending.wait(PREFETCH_WAIT)  # already being decoded; cheaper than starting over
+        with self._lock:
+            ready = self._ready.pop(key, None)
+
+        if ready is not None:
+            img, cost = ready
+            photo = self.to_photo(img)
+            with self._lock:
+                self.stats['prefetched'] += 1
+            self._remember(key, photo, cost)
+            return photo
+
+        thumb = self.thumb_path(path, size)
+        cost = self._decode_cost(thumb)
+        if cost is not None and self._thumb_fresh(path, thumb):
+            photo = tk.PhotoImage(file=thumb)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+                self.stats['saved_seconds'] += cost
+        else:
+            img, cost = self.decode(path, size)
+            self.store_thumb(path, size, img, cost)
+            photo = self.to_photo(img)
+
+        self._remember(key, photo, cost)
+        return photo
+
+    def prefetch(self, items):
+        """Decodes [(path, size), ...] into PIL images on a background thread."""
+        todo = []
+        with self._lock:
+            for path, size in items:
+                key = (path, tuple(size))
+                if key in self._images or key in self._ready or key in self._inflight:
+                    continue
+                self._inflight[key] = threading.Event()
+                todo.append(key)
+        if todo:
+            threading.Thread(target=self._prefetch_run, args=(todo,), name="image-prefetch", daemon=True).start()
+
+    def load_pil(self, path, size):
+        """PIL image for (path, size) from a fresh thumbnail, else from the original. Thread-safe."""
+        from PIL import Image
+
+        thumb = self.thumb_path(path, size)
+        cost = self._decode_cost(thumb)
+        if cost is not None and self._thumb_fresh(path, thumb):
+            with Image.open(thumb) as src:
+                img = src.convert("RGB")
+            with self._lock:
+                self.stats['disk_hits'] += 1
+                self.stats['saved_seconds'] += cost
+            return img, cost
+        img, cost = self.decode(path, size)
+        self.store_thumb(path, size, img, cost)
+        return img, cost
+
+    def decode(self, path, size):
+        """Opens and LANCZOS-resizes the original. Returns (PIL image, seconds spent)."""
+        from PIL import Image  # only needed on a cold miss
+
+        started = time.perf_counter()
+        with Image.open(path) as src:
+            img = src.convert("RGB").resize(tuple(size), Image.Resampling.LANCZOS)
+        cost = time.perf_counter() - started
+        with self._lock:
+            self.stats['decodes'] += 1
+            self.stats['decode_seconds'] += cost
+        return img, cost
+
+    def to_photo(self, img):
+        from PIL import ImageTk
+        return ImageTk.PhotoImage(img)
+
+    def report(self):
+        with self._lock:
+            s = dict(self.stats)
+            held, count = self._bytes, len(self._images)
+        return (f"images: {count} held ({held / 1024:.0f} KB) | memory hits {s['memory_hits']}, "
+                f"prefetched {s['prefetched']}, disk hits {s['disk_hits']}, decodes {s['decodes']} ({s['decode_seconds'] * 1000:.0f} ms) | "
+                f"decode time saved {s['saved_seconds'] * 1000:.0f} ms")
+
+    @property
+    def bytes_held(self):
+        return self._bytes
+
+    def _prefetch_run(self, keys):
+        for key in keys:
+            try:
+                loaded = self.load_pil(*key)
+                with self._lock:
+                    self._ready[key] = loaded
+            except Exception as e:
+                print(f"[Image prefetch failed] {key[0]} -> {e}")
+            finally:
+                with self._lock:
+                    event = self._inflight.pop(key)
+                event.set()
+
+    # --- disk thumbnails ---
+    def thumb_path(self, path, size):
+        folder = os.path.join(os.path.dirname(path), THUMB_DIRNAME)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(folder, f"{name}-{size[0]}x{size[1]}.png")
+
+    def store_thumb(self, path, size, img, cost):
+        thumb = self.thumb_path(path, size)
+        try:
+            os.makedirs(os.path.dirname(thumb), exist_ok=True)
+            tmp = thumb + ".tmp"
+            img.save(tmp, "PNG")
+            os.replace(tmp, thumb)
+            with self._lock:
+                index = self._read_index(os.path.dirname(thumb))
+                index[os.path.basename(thumb)] = cost
+                with open(os.path.join(os.path.dirname(thumb), "index.json"), "w") as f:
+                    json.dump(index, f)
+        except OSError as e:
+            print(f"[Thumbnail not saved] {thumb} -> {e}")
+
+    def _thumb_fresh(self, path, thumb):
+        try:
+            return os.path.getmtime(thumb) >= os.path.getmtime(path)
+        except OSError:
+            return False
+
+    def _decode_cost(self, thumb):
+        # Seconds the original decode took, recorded when the thumbnail was made (None = no thumbnail)
+        with self._lock:
+            return self._read_index(os.path.dirname(thumb)).get(os.path.basename(thumb))
+
+    def _read_index(self, folder):
+        try:
+            with open(os.path.join(folder, "index.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # --- memory LRU ---
+    def _remember(self, key, photo, cost):
+        size = photo.width() * photo.height() * 4
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._images[key] = (photo, size, cost)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, (_, evicted, _) = self._images.popitem(last=False)
+                self._bytes -= evicted
+                self.stats['evictions'] += 1
+
+
+# Shared by every page
+images = ImageCache()
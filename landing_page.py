@@ -1,7 +1,11 @@
 import tkinter as tk
-from PIL import Image, ImageTk
-from login_view import LoginScreen  # Ensure this import matches your file name
-from admin import AdminScreen
+from image_cache import images
+
+# Images of the About / Services / Doctors sections, decoded in the background once Home is up
+PREFETCH_IMAGES = [("assets/about.jpg", (420, 280))]
+PREFETCH_IMAGES += [(f"assets/service_{name}.jpg", (220, 140))
+                    for name in ("checkup", "consult", "appointment", "lab", "vaccine", "emergency")]
+PREFETCH_IMAGES += [(f"assets/doc{i}.jpg", (120, 120)) for i in range(1, 6)]
 
 
 class ClinicLandingPage(tk.Frame):
@@ -9,7 +13,8 @@ class ClinicLandingPage(tk.Frame):
         super().__init__(parent)
         self.controller = controller
 
-        # keep PhotoImage references (important for Tkinter)
+        # PhotoImages shown by the current section (important for Tkinter);
+        # reset on every section switch, the shared cache keeps the decoded copies
         self._img_refs = []
 
         # --- THEME CONFIGURATION ---
@@ -42,6 +47,8 @@ class ClinicLandingPage(tk.Frame):
         self.content_frame.pack(fill="both", expand=True)
 
         self.show_home()
+        # Once Home has painted, warm the other sections' images off the UI thread
+        self.after_idle(lambda: images.prefetch(PREFETCH_IMAGES))
 
     # =========================
     # HELPERS
@@ -49,16 +56,15 @@ class ClinicLandingPage(tk.Frame):
     def clear_content(self):
         for widget in self.content_frame.winfo_children():
             widget.destroy()
+        self._img_refs = []
 
     def load_image(self, path, size):
         """
-        Loads and resizes an image using Pillow.
-        Keeps reference to prevent Tkinter garbage collection.
+        Returns a resized PhotoImage from the shared image cache (memory, then
+        pre-scaled thumbnail, then Pillow decode). Keeps a reference for this section.
         """
         try:
-            img = Image.open(path)
-            img = img.resize(size, Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
+            photo = images.get(path, size)
             self._img_refs.append(photo)
             return photo
         except Exception as e:
@@ -104,7 +110,7 @@ class ClinicLandingPage(tk.Frame):
             nav_frame, text="Login", bg=self.colors["accent_orange"],
             fg=self.colors["white"], font=("Arial", 10, "bold"),
             bd=0, padx=20, pady=8, cursor="hand2",
-            command=lambda: self.controller.show_view(LoginScreen)
+            command=lambda: self.controller.show_view("login")
         )
         login_btn.pack(side="right", padx=30)
 
@@ -130,9 +136,7 @@ class ClinicLandingPage(tk.Frame):
             btn.bind("<Leave>", lambda e, b=btn: b.config(fg=self.colors["text_dark"]))
 
     def go_to_admin(self):
-        """Switches to Admin Screen with lazy import to prevent crash"""
-        import admin
-        self.controller.show_view(admin.AdminScreen)
+        self.controller.show_view("admin")
 
     def navigate(self, page_name):
         self.clear_content()
@@ -453,7 +457,7 @@ class ClinicLandingPage(tk.Frame):
             tk.Button(
                 btns, text="Book", bg=self.colors["primary_blue"], fg="white",
                 bd=0, padx=18, pady=6, cursor="hand2",
-                command=lambda: self.controller.show_view(LoginScreen)
+                command=lambda: self.controller.show_view("login")
             ).pack(side="right")
 
             return card
@@ -0,0 +1,220 @@
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import admin
+import availability
+import clinic_service
+import database
+import doctor_view
+import patient_view
+import query_stats
+import reports
+
+# --- CLIENT MIXES ---
+# role -> [(operation, weight)]. Each simulated client picks its next operation from
+# its role's mix, runs it through the same code the screen runs, then "thinks".
+MIXES = {
+    'patient': [('patient_login', 1), ('patient_refresh', 6), ('book', 2)],
+    'doctor': [('doctor_refresh', 6), ('complete', 2)],
+    'frontdesk': [('schedule_refresh', 5), ('verify', 2), ('finance_refresh', 1)],
+}
+DEFAULT_CLIENTS = {'patient': 20, 'doctor': 5, 'frontdesk': 3}
+
+
+class Client:
+    """
+    One simulated user. Carries the attributes the screens' worker-side fetch methods
+    read from self (pid, did), so those methods are replayed unchanged, e.g.
+    patient_view.PatientScreen.fetch_rows(client).
+    """
+
+    def __init__(self, role, user_id, rng):
+        self.role = role
+        self.pid = self.did = user_id
+        self.rng = rng
+
+
+class Recorder:
+    """Per-operation latency samples and outcome counts. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)  # operation -> [seconds]
+        self.outcomes = defaultdict(lambda: defaultdict(int))  # operation -> outcome -> count
+
+    def record(self, op, seconds, outcome):
+        with self._lock:
+            self.samples[op].append(seconds)
+            self.outcomes[op][outcome] += 1
+
+    def report(self, wall_seconds):
+        lines = [f"{'operation':<18}{'n':>7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  outcomes"]
+        with self._lock:
+            for op in sorted(self.samples):
+                s = sorted(self.samples[op])
+                pct = lambda p: s[min(len(s) - 1, int(len(s) * p / 100))] * 1000
+                other = ", ".join(f"{k} {v}" for k, v in sorted(self.outcomes[op].items()) if k != "ok")
+                lines.append(f"{op:<18}{len(s):>7}{len(s) / wall_seconds:>9.1f}{pct(50):>9.1f}{pct(95):>9.1f}"
+                             f"{pct(99):>9.1f}{s[-1] * 1000:>9.1f}  {other}")
+        return "\n".join(lines)
+
+
+# --- OPERATIONS ---
+# Each returns None on success; service refusals are outcomes, not failures.
+def patient_login(c, ids):
+    database.fetch_all("SELECT * FROM patient WHERE patientID=%s", (c.pid,))  # login_view.LoginScreen.login
+
+
+def patient_refresh(c, ids):
+    patient_view.PatientScreen.fetch_rows(c)
+
+
+def book(c, ids):
+    # Like a real patient: the next visit goes after the latest one they already hold
+    # (request_booking refuses anything earlier with SequenceError)
+    latest = database.fetch_all("SELECT startsAt FROM appointment WHERE patientID=%s "
+                                "AND appointmentStatus != 'Cancelled' ORDER BY startsAt DESC LIMIT 1", (c.pid,))
+    after = max(ids['today'], latest[0]['startsAt'].date()) if latest else ids['today']
+    day = after + c.rng.randint(1, 14) * ids['one_day']
+    clinic_service.request_booking(c.pid, c.rng.choice(ids['doctors']), str(day),
+                                   c.rng.choice(ids['slot_labels']))
+
+
+def doctor_week(c, ids, day=None):
+    # A calendar window: the Monday-to-Sunday week holding day (default: this week)
+    return doctor_view.DoctorScreen.fetch_window(c, doctor_view.window_start(day or ids['today'], 7), 7)
+
+
+def doctor_refresh(c, ids):
+    doctor_week(c, ids)
+
+
+def complete(c, ids):
+    # The doctor pages to the week of their next Scheduled visit (bookings land days ahead)
+    nxt = database.fetch_all("SELECT startsAt FROM appointment WHERE doctorID=%s "
+                             "AND appointmentStatus = 'Scheduled' ORDER BY startsAt LIMIT 1", (c.did,))
+    if not nxt:
+        return "nothing to do"
+    rows = [r for r in doctor_week(c, ids, nxt[0]['startsAt'].date()) if r['appointmentStatus'] == 'Scheduled']
+    clinic_service.complete_appointment(c.rng.choice(rows)['id'], c.rng.choice(ids['treatments']), "load test")
+
+
+def schedule_refresh(c, ids):
+    admin.AdminScreen.fetch_schedule_page(c, (None, None), None, admin.SCHEDULE_PAGE_SIZE)
+
+
+def finance_refresh(c, ids):
+    # The Transactions tab: revenue summary for the last year + newest payments
+    year_ago = ids['today'] - 365 * ids['one_day']
+    reports.revenue("month", year_ago)
+    reports.payment_history(year_ago)
+
+
+def verify(c, ids):
+    rows = [r for r in admin.AdminScreen.fetch_schedule_page(c, (None, None), None, admin.SCHEDULE_PAGE_SIZE)
+            if r['appointmentStatus'] == 'Pending']
+    if not rows:
+        return "nothing to do"
+    appt = c.rng.choice(rows)
+    if appt['startsAt'] is None:
+        return "no start time"
+    free = database.get_available_staff(appt['startsAt'])
+    if not free:
+        return "no free staff"
+    clinic_service.verify_appointment(appt['id'], c.rng.choice(free)['staffID'])
+
+
+OPERATIONS = {f.__name__: f for f in (patient_login, patient_refresh, book, doctor_refresh, complete,
+                                       schedule_refresh, finance_refresh, verify)}
+
+
+# --- RUNNER ---
+def discover_ids(sample=5000):
+    """IDs to drive the clients with, read from the (seeded) database."""
+    ids = {
+        'patients': [r['patientID'] for r in database.fetch_all(
+            "SELECT patientID FROM patient ORDER BY patientID LIMIT %s", (sample,))],
+        'doctors': [d['doctorID'] for d in database.get_doctors() if d['assignedRoom']],
+        'treatments': [t['treatmentID'] for t in database.get_treatments()],
+        'slot_labels': availability.SLOT_LABELS,
+        'today': date.today(),
+        'one_day': timedelta(days=1),
+    }
+    missing = [k for k in ('patients', 'doctors', 'treatments') if not ids[k]]
+    if missing:
+        raise SystemExit(f"No {', '.join(missing)} found - seed the database first (python seed_data.py).")
+    return ids
+
+
+def run_client(client, ids, recorder, stop_at, think):
+    ops, weights = zip(*MIXES[client.role])
+    while time.monotonic() < stop_at:
+        op = client.rng.choices(ops, weights)[0]
+        started = time.perf_counter()
+        try:
+            with query_stats.stats.operation(op):
+                outcome = OPERATIONS[op](client, ids) or "ok"
+        except clinic_service.ServiceError as e:
+            outcome = type(e).__name__
+        except Exception as e:
+            outcome = f"error {type(e).__name__}"
+        recorder.record(op, time.perf_counter() - started, outcome)
+        if think:
+            time.sleep(client.rng.expovariate(1 / think))
+
+
+def run(clients=None, duration=30, think=1.0, seed=1, ids=None):
+    """
+    Runs {role: count} simulated clients for duration seconds, each on its own thread.
+    think: mean seconds between a client's operations (exponential). Returns (recorder, wall seconds).
+    """
+    clients = clients or DEFAULT_CLIENTS
+    ids = ids or discover_ids()
+    master = random.Random(seed)
+    recorder = Recorder()
+    stop_at = time.monotonic() + duration
+
+    threads = []
+    for role, count in clients.items():
+        for _ in range(count):
+            rng = random.Random(master.random())
+            user = rng.choice(ids['patients'] if role == 'patient' else ids['doctors'])
+            t = threading.Thread(target=run_client, args=(Client(role, user, rng), ids, recorder, stop_at, think),
+                                 daemon=True)
+            threads.append(t)
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Simulate concurrent clinic clients against a seeded database.")
+    ap.add_argument("--patients", type=int, default=DEFAULT_CLIENTS['patient'])
+    ap.add_argument("--doctors", type=int, default=DEFAULT_CLIENTS['doctor'])
+    ap.add_argument("--frontdesk", type=int, default=DEFAULT_CLIENTS['frontdesk'])
+    ap.add_argument("--duration", type=float, default=30, help="seconds")
+    ap.add_argument("--think", type=float, default=1.0, help="mean think time per client, seconds (0 = flat out)")
+    ap.add_argument("--pool", type=int, default=database.POOL_CONFIG['max_size'], help="connection pool size")
+    ap.add_argument("--database", help="schema to run against (default: DB_CONFIG)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.database:
+        database.DB_CONFIG['database'] = args.database
+    database.configure_pool(max_size=args.pool)
+
+    mix = {'patient': args.patients, 'doctor': args.doctors, 'frontdesk': args.frontdesk}
+    print(f"clients {mix}, think {args.think}s, pool {args.pool}, {args.duration:.0f}s ...")
+    rec, wall = run(mix, args.duration, args.think, args.seed)
+    print(rec.report(wall))
+    print("pool:", database.pool_stats())
+    print()
+    print(query_stats.stats.report())
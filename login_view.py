@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox, font
 import database
-import patient_view, doctor_view, admin
 
 class LoginScreen(tk.Frame):
     def __init__(self, parent, controller):
@@ -72,7 +71,7 @@ class LoginScreen(tk.Frame):
         # CHANGE 2: Create the Admin button (same as before)
         self.btn_admin = tk.Button(self.role_frame, text="Admin Portal", bg="#555", fg="white", bd=0, 
                                    font=("Arial", 9, "bold"), padx=10, pady=5, cursor="hand2",
-                                   command=lambda: controller.show_view(admin.AdminScreen))
+                                   command=lambda: controller.show_view("admin"))
 
         # CHANGE 3: Pack ALL buttons side-by-side with padding
         self.btn_patient.pack(side="left", padx=5)
@@ -87,7 +86,7 @@ class LoginScreen(tk.Frame):
         self.btn_doctor = self.create_role_btn(self.role_frame, "Doctor", "doctor")
         self.btn_admin = tk.Button(self.role_frame, text="Admin Portal", bg="#555", fg="white", bd=0, 
                                    font=("Arial", 9, "bold"), padx=10, pady=5, cursor="hand2",
-                                   command=lambda: controller.show_view(admin.AdminScreen))
+                                   command=lambda: controller.show_view("admin"))
 
         # Update buttons visuals to show Patient is selected by default
         self.update_role_visuals()
@@ -205,13 +204,15 @@ class LoginScreen(tk.Frame):
         if not name: return messagebox.showerror("Error", "Name Required")
         
         sql = "INSERT INTO patient (patientName, patientGender, patientBirthDate, patientPhoneNumber) VALUES (%s, %s, %s, %s)"
-        try:
-            new_id = database.execute_query(sql, (name, self.r_gender.get(), self.r_dob.get(), self.r_phone.get()))
+
+        def done(new_id):
             if new_id:
                 messagebox.showinfo("Success", f"Account Created!\n\nIMPORTANT: Your Patient ID is {new_id}.")
                 self.toggle_register_view() # Return to login
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
+
+        self.controller.db.submit("register", database.execute_query, sql,
+                                  (name, self.r_gender.get(), self.r_dob.get(), self.r_phone.get()),
+                                  owner=self, on_done=done)
 
     def login(self):
         uid = self.ent_id.get()
@@ -220,18 +221,26 @@ class LoginScreen(tk.Frame):
         table = "patient" if self.role == "patient" else "doctor"
         col = "patientID" if self.role == "patient" else "doctorID"
         
-        # Note: Ensure your database.py has fetch_all function
-        user = database.fetch_all(f"SELECT * FROM {table} WHERE {col}=%s", (uid,))
-        
-        if user:
-            self.controller.current_user_id = uid
-            if self.role == 'patient':
-                self.controller.show_view(patient_view.PatientScreen)
+        role = self.role
+
+        def done(user):
+            if user:
+                self.controller.current_user_id = uid
+                if role == 'patient':
+                    self.controller.show_view("patient")
+                else:
+                    self.controller.show_view("doctor")
             else:
-                self.controller.show_view(doctor_view.DoctorScreen)
-        else:
-            messagebox.showerror("Failed", "ID Not Found")
+                messagebox.showerror("Failed", "ID Not Found")
+
+        # Note: Ensure your database.py has fetch_all function
+        self.controller.db.submit("login", database.fetch_all, f"SELECT * FROM {table} WHERE {col}=%s", (uid,),
+                                  owner=self, on_done=done)
     
+    def on_hide(self):
+        # Don't leave the last person's ID or registration details on a cached screen
+        for entry in (self.ent_id, self.r_name, self.r_gender, self.r_dob, self.r_phone):
+            entry.delete(0, tk.END)
+
     def go_back_to_landing(self):
-        import landing_page   # lazy import prevents circular error
-        self.controller.show_view(landing_page.ClinicLandingPage)
\ No newline at end of file
+        self.controller.show_view("landing")
\ No newline at end of file
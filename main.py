@@ -1,29 +1,98 @@
 import tkinter as tk
-from login_view import LoginScreen
-from patient_view import PatientScreen
-from doctor_view import DoctorScreen
-from admin import AdminScreen
-from landing_page import ClinicLandingPage 
+from collections import OrderedDict
+from db_async import AsyncDB
+import views
+
+VIEW_CACHE_SIZE = 4  # built screens kept hidden for instant switching; 0 = rebuild on every switch
 
 class ClinicApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, view_cache=VIEW_CACHE_SIZE):
         super().__init__()
         self.title("Clinic System - Full Version")
         self.geometry("1250x800")
 
         self.current_user_id = None
+        self.db = AsyncDB(self)  # background query runner shared by every screen
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.container = tk.Frame(self)
         self.container.pack(fill="both", expand=True)
 
+        # view class -> (frame, user id it was built for), least recently shown first
+        self.view_cache = view_cache
+        self.views = OrderedDict()
+        self.current_view = None
+
         # CHANGE THIS LINE below to start with LandingScreen instead of LoginScreen
-        self.show_view(ClinicLandingPage)  # <--- 2. CHANGE THIS
-
-    def show_view(self, view_class):
-        for widget in self.container.winfo_children():
-            widget.destroy()
-        # We pass 'self' as the controller so the view can call app.show_view() later
-        frame = view_class(self.container, self)
-        frame.pack(fill="both", expand=True)
+        self.show_view("landing")  # <--- 2. CHANGE THIS
+
+    def show_view(self, view):
+        """
+        Shows a screen by registry name (see views.VIEWS) or class, importing its
+        module on first use and reusing a hidden instance when one is cached.
+        Views may define on_show() (called when a cached instance comes back, e.g. to
+        refresh its data) and on_hide() (called when it is put away).
+        """
+        view_class = views.view_class(view)
+        if not self.view_cache:
+            # Results for the screen we are leaving are no longer wanted
+            self.db.cancel_all()
+            for widget in self.container.winfo_children():
+                widget.destroy()
+            # We pass 'self' as the controller so the view can call app.show_view() later
+            frame = view_class(self.container, self)
+            frame.pack(fill="both", expand=True)
+            self.current_view = frame
+            return
+
+        if self.current_view is not None:
+            if isinstance(self.current_view, view_class):
+                return
+            self.hide_view(self.current_view)
+
+        frame, user = self.views.pop(view_class, (None, None))
+        if frame is not None and getattr(frame, 'user_bound', False) and user != self.current_user_id:
+            self.drop_view(frame)  # built for someone else
+            frame = None
+
+        if frame is None:
+            frame = view_class(self.container, self)
+            frame.pack(fill="both", expand=True)
+        else:
+            frame.pack(fill="both", expand=True)
+            if hasattr(frame, 'on_show'):
+                frame.on_show()
+        self.views[view_class] = (frame, self.current_user_id)
+        self.current_view = frame
+
+        while len(self.views) > self.view_cache:
+            old, _ = self.views.popitem(last=False)[1]
+            self.drop_view(old)
+
+    def hide_view(self, frame):
+        if hasattr(frame, 'on_hide'):
+            frame.on_hide()
+        frame.pack_forget()
+
+    def drop_view(self, frame):
+        self.db.cancel_owned(frame)
+        if frame is self.current_view:
+            self.current_view = None
+        frame.destroy()
+
+    def logout(self):
+        """Forgets the signed-in user and every screen built for them, then shows the login screen."""
+        self.current_user_id = None
+        for view_class, (frame, _) in list(self.views.items()):
+            if getattr(frame, 'user_bound', False):
+                del self.views[view_class]
+                if frame is self.current_view:
+                    self.hide_view(frame)
+                self.drop_view(frame)
+        self.show_view("login")
+
+    def on_close(self):
+        self.db.shutdown()
+        self.destroy()
 
 if __name__ == "__main__":
     app = ClinicApp()
@@ -0,0 +1,16 @@
+-- Bring clinicappointmentsystem.sql in line with what the screens actually use.
+-- Statements that were already applied by hand (duplicate column/key) are skipped by the runner.
+
+ALTER TABLE doctor ADD COLUMN assignedRoom INT NULL;
+ALTER TABLE appointment ADD COLUMN doctorNotes TEXT NULL;
+ALTER TABLE payment ADD COLUMN appointmentID INT NULL;
+
+-- Every screen addresses an appointment by a single id
+ALTER TABLE appointment ADD COLUMN id INT NOT NULL AUTO_INCREMENT UNIQUE FIRST;
+
+-- Statuses the code writes: 'Pending' bookings and 'Paid' payments
+ALTER TABLE appointment MODIFY appointmentStatus ENUM('Pending', 'Scheduled', 'Completed', 'Cancelled') DEFAULT 'Pending';
+ALTER TABLE payment MODIFY paymentStatus ENUM('Pending', 'Paid', 'Completed', 'Cancelled') DEFAULT 'Pending';
+
+-- Patients store '09:00 AM', admins store '09:00'
+ALTER TABLE appointment MODIFY appointmentTime VARCHAR(10) NOT NULL;
@@ -0,0 +1,16 @@
+-- Indexes for the per-click queries. Check with: python database.py migrate --explain
+
+-- DoctorScreen.refresh / availability.doctor_grids: WHERE doctorID=? ... ORDER BY appointmentDate
+CREATE INDEX idx_appt_doctor_date ON appointment (doctorID, appointmentDate, appointmentStatus);
+
+-- PatientScreen.refresh + the "latest appointment" check in book()
+CREATE INDEX idx_appt_patient_date ON appointment (patientID, appointmentDate, appointmentTime, appointmentStatus);
+
+-- is_slot_available / availability.room_grids
+CREATE INDEX idx_appt_room_slot ON appointment (roomNumber, appointmentDate, appointmentTime, appointmentStatus);
+
+-- get_available_staff
+CREATE INDEX idx_appt_staff_slot ON appointment (staffID, appointmentDate, appointmentTime, appointmentStatus);
+
+-- refresh_finance joins payment back to its appointment
+CREATE INDEX idx_payment_appointment ON payment (appointmentID);
@@ -0,0 +1,2 @@
+-- Master Schedule pages on (appointmentDate, id) - see AdminScreen.load_schedule_page
+CREATE INDEX idx_appt_date_id ON appointment (appointmentDate, id);
@@ -0,0 +1,11 @@
+-- One active booking per room slot, enforced by the database (see clinic_service.request_booking).
+-- activeRoomSlot is NULL for cancelled or room-less appointments, and a UNIQUE key allows any
+-- number of NULLs, so cancelling frees the slot while two live bookings can never share it.
+-- If this fails with "Duplicate entry", the table already holds double bookings: cancel the
+-- extra ones and run the migration again.
+ALTER TABLE appointment
+    ADD COLUMN activeRoomSlot VARCHAR(64)
+        AS (IF(appointmentStatus = 'Cancelled' OR roomNumber IS NULL, NULL,
+               CONCAT(roomNumber, '|', appointmentDate, '|', appointmentTime))) STORED;
+
+ALTER TABLE appointment ADD UNIQUE KEY uq_active_room_slot (activeRoomSlot);
@@ -0,0 +1,3 @@
+-- Revenue reports (reports.py) filter appointments by visit date and join payment, doctor and
+-- treatment. With these columns in the index the range scan never touches the appointment rows.
+CREATE INDEX idx_appt_date_report ON appointment (appointmentDate, paymentID, doctorID, treatmentID);
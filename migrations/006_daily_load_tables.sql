@@ -0,0 +1,58 @@
+-- Per-day appointment counts by status for each doctor, room and staff member (daily_load.py).
+-- clinic_service keeps them up to date in the same transaction as each booking, verify,
+-- cancel, complete and delete; "python daily_load.py rebuild" recomputes them (after bulk
+-- loads such as seed_data.py). The tables are filled at the end of this migration, with the
+-- same query as daily_load.rebuild, so the deltas start from the existing history.
+CREATE TABLE IF NOT EXISTS daily_doctor_load (
+    day DATE NOT NULL,
+    doctorID INT NOT NULL,
+    pending INT NOT NULL DEFAULT 0,
+    scheduled INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    cancelled INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, doctorID)
+);
+
+CREATE TABLE IF NOT EXISTS daily_room_load (
+    day DATE NOT NULL,
+    roomNumber INT NOT NULL,
+    pending INT NOT NULL DEFAULT 0,
+    scheduled INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    cancelled INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, roomNumber)
+);
+
+CREATE TABLE IF NOT EXISTS daily_staff_load (
+    day DATE NOT NULL,
+    staffID INT NOT NULL,
+    pending INT NOT NULL DEFAULT 0,
+    scheduled INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    cancelled INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, staffID)
+);
+
+DELETE FROM daily_doctor_load;
+INSERT INTO daily_doctor_load (day, doctorID, pending, scheduled, completed, cancelled)
+SELECT appointmentDate, doctorID,
+       SUM(appointmentStatus = 'Pending'), SUM(appointmentStatus = 'Scheduled'),
+       SUM(appointmentStatus = 'Completed'), SUM(appointmentStatus = 'Cancelled')
+FROM appointment WHERE doctorID IS NOT NULL
+GROUP BY appointmentDate, doctorID;
+
+DELETE FROM daily_room_load;
+INSERT INTO daily_room_load (day, roomNumber, pending, scheduled, completed, cancelled)
+SELECT appointmentDate, roomNumber,
+       SUM(appointmentStatus = 'Pending'), SUM(appointmentStatus = 'Scheduled'),
+       SUM(appointmentStatus = 'Completed'), SUM(appointmentStatus = 'Cancelled')
+FROM appointment WHERE roomNumber IS NOT NULL
+GROUP BY appointmentDate, roomNumber;
+
+DELETE FROM daily_staff_load;
+INSERT INTO daily_staff_load (day, staffID, pending, scheduled, completed, cancelled)
+SELECT appointmentDate, staffID,
+       SUM(appointmentStatus = 'Pending'), SUM(appointmentStatus = 'Scheduled'),
+       SUM(appointmentStatus = 'Completed'), SUM(appointmentStatus = 'Cancelled')
+FROM appointment WHERE staffID IS NOT NULL
+GROUP BY appointmentDate, staffID;
@@ -0,0 +1,4 @@
+-- Room state is now derived from the appointments (occupancy.py); bookings no longer write
+-- room.roomStatus, which only marks rooms taken out for 'Maintenance'. Clear the 'Occupied'
+-- flags the old booking code left behind.
+UPDATE room SET roomStatus = 'Available' WHERE roomStatus = 'Occupied';
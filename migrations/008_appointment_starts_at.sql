@@ -0,0 +1,40 @@
+-- One sortable timestamp per appointment. appointmentTime holds '09:00 AM' (patient screen)
+-- or '09:00' (admin screen), so ordering or comparing it as text is wrong; clinic_service
+-- writes startsAt next to it and every timeline query (sequence check, histories, range
+-- lookups) reads startsAt instead.
+ALTER TABLE appointment ADD COLUMN startsAt DATETIME NULL AFTER appointmentTime;
+
+-- Backfill: hour and minute are cut out of the text (no STR_TO_DATE, whose failures are
+-- errors in strict mode); an AM/PM suffix maps 12 AM -> 0 and 1..11 PM -> 13..23.
+UPDATE appointment
+SET startsAt = TIMESTAMP(appointmentDate, MAKETIME(
+        IF(UPPER(TRIM(appointmentTime)) LIKE '%M',
+           SUBSTRING_INDEX(TRIM(appointmentTime), ':', 1) % 12
+               + IF(UPPER(TRIM(appointmentTime)) LIKE '%PM', 12, 0),
+           SUBSTRING_INDEX(TRIM(appointmentTime), ':', 1)),
+        SUBSTRING(TRIM(appointmentTime), LOCATE(':', TRIM(appointmentTime)) + 1, 2),
+        0))
+WHERE startsAt IS NULL;
+
+-- Timelines per patient, doctor, room and staff member (status last, so the != 'Cancelled'
+-- filter is answered from the index). They replace the date/time-text indexes of migration 002;
+-- the room and staff ones serve the slot checks (is_slot_available, get_available_staff,
+-- verify_appointments), which now compare startsAt.
+CREATE INDEX idx_appt_patient_starts ON appointment (patientID, startsAt, appointmentStatus);
+CREATE INDEX idx_appt_doctor_starts ON appointment (doctorID, startsAt, appointmentStatus);
+CREATE INDEX idx_appt_room_starts ON appointment (roomNumber, startsAt, appointmentStatus);
+CREATE INDEX idx_appt_staff_starts ON appointment (staffID, startsAt, appointmentStatus);
+DROP INDEX idx_appt_patient_date ON appointment;
+DROP INDEX idx_appt_doctor_date ON appointment;
+DROP INDEX idx_appt_room_slot ON appointment;
+DROP INDEX idx_appt_staff_slot ON appointment;
+
+-- uq_active_room_slot (migration 004) keyed the time text, so '09:00' and '09:00 AM' were two
+-- slots. Rebuild it on the instant. If this fails with "Duplicate entry", the table holds
+-- double bookings only the text told apart: cancel the extra ones and run the migration again.
+ALTER TABLE appointment DROP INDEX uq_active_room_slot;
+ALTER TABLE appointment
+    MODIFY COLUMN activeRoomSlot VARCHAR(64)
+        AS (IF(appointmentStatus = 'Cancelled' OR roomNumber IS NULL OR startsAt IS NULL, NULL,
+               CONCAT(roomNumber, '|', startsAt))) STORED;
+ALTER TABLE appointment ADD UNIQUE KEY uq_active_room_slot (activeRoomSlot);
@@ -0,0 +1,163 @@
+import argparse
+import threading
+import time as clock
+from datetime import datetime, timedelta
+
+import availability
+import database
+
+# A room is occupied while one of its live (non-cancelled) appointments is running.
+# room.roomStatus only carries the manual 'Maintenance' flag; bookings never write it.
+SLOT_LENGTH = timedelta(hours=1)  # every appointment holds its room for one slot
+CACHE_TTL = 60  # seconds a (room, day) entry is trusted; covers writes made by other processes
+
+
+# --- CACHE ---
+class OccupancyCache:
+    """
+    (room, day) -> sorted start times of the live appointments in that room that day.
+    Misses are filled by ONE range query over idx_appt_room_starts for every missing room and
+    day; clinic_service invalidates the keys it writes. Thread-safe.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}  # (room, day) -> (expires_at, [time])
+        self._generation = 0  # bumped by every invalidation; a load that overlapped one is not stored
+        self.stats = {'hits': 0, 'misses': 0, 'queries': 0, 'invalidations': 0}
+
+    def get(self, rooms, start, end):
+        """{(room, day): [start time]} for every room and every day in [start, end]."""
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        now = clock.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            generation = self._generation
+            for room in rooms:
+                for day in days:
+                    entry = self._data.get((room, day))
+                    if entry and entry[0] > now:
+                        found[(room, day)] = entry[1]
+                    else:
+                        missing.append((room, day))
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(missing)
+        if not missing:
+            return found
+
+        loaded = _load(sorted({r for r, _ in missing}), min(d for _, d in missing), max(d for _, d in missing))
+        with self._lock:
+            self.stats['queries'] += 1
+            store = generation == self._generation
+            for key in missing:
+                found[key] = loaded.get(key, [])
+                if store:
+                    self._data[key] = (now + self.ttl, found[key])
+        return found
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def invalidate(self, room=None, day=None):
+        """Drops one (room, day), every day of a room, or everything."""
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidations'] += 1
+            if room is None:
+                self._data.clear()
+            elif day is None:
+                for key in [k for k in self._data if k[0] == room]:
+                    del self._data[key]
+            else:
+                self._data.pop((room, day), None)
+
+
+def _load(rooms, start, end):
+    sql = f"""
+        SELECT roomNumber, startsAt FROM appointment
+        WHERE roomNumber IN ({', '.join(['%s'] * len(rooms))})
+        AND startsAt >= %s AND startsAt < %s
+        AND appointmentStatus != 'Cancelled'
+    """
+    busy = {}
+    for r in database.fetch_all(sql, (*rooms, str(start), str(end + timedelta(days=1)))):
+        busy.setdefault((r['roomNumber'], r['startsAt'].date()), []).append(r['startsAt'].time())
+    for starts in busy.values():
+        starts.sort()
+    return busy
+
+
+_cache = OccupancyCache(CACHE_TTL)
+
+
+def invalidate(room=None, day=None):
+    _cache.invalidate(room, None if day is None else availability.as_date(day))
+
+
+def cache_stats():
+    return _cache.snapshot()
+
+
+# --- QUERIES ---
+def busy_slots(rooms, start, end=None):
+    """{(room, day): [start time]} of the live bookings, from the cache."""
+    start = availability.as_date(start)
+    return _cache.get(list(rooms), start, availability.as_date(end) if end else start)
+
+
+def free_slots(room, day):
+    """The clinic slots still open in a room on a day."""
+    day = availability.as_date(day)
+    taken = set(busy_slots([room], day)[(room, day)])
+    return [s for s in availability.SLOTS if s not in taken]
+
+
+def bookings_between(room, start, end):
+    """[(from, to)] datetimes of the live bookings in a room that overlap [start, end)."""
+    busy = busy_slots([room], start.date(), end.date())
+    spans = []
+    for day in sorted(d for _, d in busy):
+        for slot in busy[(room, day)]:
+            begins = datetime.combine(day, slot)
+            if begins < end and begins + SLOT_LENGTH > start:
+                spans.append((begins, begins + SLOT_LENGTH))
+    return spans
+
+
+def room_states(at=None):
+    """
+    Every room as it is at instant at (default now): one dict per room with roomNumber,
+    state ('Maintenance', 'Occupied' or 'Available'), until (when the current booking ends),
+    next_slot (the next booking later that day) and booked (slots taken that day).
+    """
+    at = at or datetime.now()
+    rooms = database.fetch_all("SELECT roomNumber, roomStatus FROM room ORDER BY roomNumber")
+    busy = busy_slots([r['roomNumber'] for r in rooms], at.date())
+    states = []
+    for r in rooms:
+        starts = [datetime.combine(at.date(), s) for s in busy[(r['roomNumber'], at.date())]]
+        current = next((s for s in starts if s <= at < s + SLOT_LENGTH), None)
+        if r['roomStatus'] == 'Maintenance':
+            state = 'Maintenance'
+        else:
+            state = 'Occupied' if current else 'Available'
+        states.append({
+            'roomNumber': r['roomNumber'], 'state': state,
+            'until': current + SLOT_LENGTH if current else None,
+            'next_slot': next((s for s in starts if s > at), None),
+            'booked': len(starts),
+        })
+    return states
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Room occupancy derived from appointments.")
+    ap.add_argument("--at", type=datetime.fromisoformat, help="YYYY-MM-DDTHH:MM (default: now)")
+    args = ap.parse_args()
+
+    for s in room_states(args.at):
+        until = f" until {s['until']:%H:%M}" if s['until'] else ""
+        nxt = f", next {s['next_slot']:%H:%M}" if s['next_slot'] else ""
+        print(f"Room {s['roomNumber']:<6} {s['state']}{until}{nxt} ({s['booked']}/{len(availability.SLOTS)} slots booked)")
@@ -2,22 +2,28 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 import database
-import login_view
+import availability
+import occupancy
+import clinic_service
+from db_async import show_error
+from tree_sync import KeyedTree
 
 
 class PatientScreen(tk.Frame):
+    user_bound = True  # dropped from the view cache on logout
+
     def __init__(self, parent, controller):
         super().__init__(parent)
+        self.controller = controller
         self.pid = controller.current_user_id
-
-        # Fetch current patient name
-        p = database.fetch_all("SELECT patientName FROM patient WHERE patientID=%s", (self.pid,))[0]
+        self.db = controller.db
 
         # --- HEADER ---
         header = tk.Frame(self, bg="#e3f2fd", pady=15)
         header.pack(fill="x")
-        tk.Label(header, text=f"Hello, {p['patientName']}", bg="#e3f2fd", font=("Arial", 14)).pack(side="left", padx=20)
-        tk.Button(header, text="Logout", command=lambda: controller.show_view(login_view.LoginScreen)).pack(
+        self.lbl_hello = tk.Label(header, text="Hello...", bg="#e3f2fd", font=("Arial", 14))
+        self.lbl_hello.pack(side="left", padx=20)
+        tk.Button(header, text="Logout", command=controller.logout).pack(
             side="right", padx=20)
 
         # --- BOOKING FORM ---
@@ -26,9 +32,8 @@ class PatientScreen(tk.Frame):
 
         # Doctor Selection
         tk.Label(form, text="Select Doctor:").grid(row=0, column=0, sticky="w")
-        docs = database.fetch_all("SELECT doctorID, doctorName, doctorSpecialty FROM doctor")
-        self.doc_map = {f"{d['doctorName']} ({d['doctorSpecialty']})": d['doctorID'] for d in docs}
-        self.cb_doc = ttk.Combobox(form, values=list(self.doc_map.keys()), width=35)
+        self.doc_map, self.doc_rooms = {}, {}
+        self.cb_doc = ttk.Combobox(form, values=[], width=35)
         self.cb_doc.grid(row=0, column=1, padx=10)
 
         # Date Selection (Dropdowns)
@@ -50,10 +55,13 @@ class PatientScreen(tk.Frame):
 
         # Time Selection
         tk.Label(form, text="Time:").grid(row=2, column=0, sticky="w")
-        self.cb_time = ttk.Combobox(form,
-                                    values=["09:00 AM", "10:00 AM", "11:00 AM", "01:00 PM", "02:00 PM", "03:00 PM"])
+        self.cb_time = ttk.Combobox(form, values=availability.SLOT_LABELS)
         self.cb_time.grid(row=2, column=1, padx=10, sticky="w")
 
+        # Only offer slots that are still open for the chosen doctor/day
+        for cb in (self.cb_doc, self.cb_day, self.cb_month, self.cb_year):
+            cb.bind("<<ComboboxSelected>>", self.update_open_slots)
+
         tk.Button(form, text="Book Now", bg="#4CAF50", fg="white", command=self.book).grid(row=3, columnspan=2, pady=15)
 
         # --- HISTORY TABLE ---
@@ -61,85 +69,84 @@ class PatientScreen(tk.Frame):
         self.tree = ttk.Treeview(self, columns=cols, show='headings')
         for c in cols: self.tree.heading(c, text=c)
         self.tree.pack(padx=20, fill="both", expand=True)
+        self.view = KeyedTree(self.tree)
+
+        # Fetch current patient name and the doctor list in the background
+        self.db.submit("patient_header", database.fetch_all,
+                       "SELECT patientName FROM patient WHERE patientID=%s", (self.pid,),
+                       owner=self, on_done=lambda rows: self.lbl_hello.config(text=f"Hello, {rows[0]['patientName']}"))
+        self.db.submit("doctor_list", database.get_doctors, owner=self, on_done=self.show_doctors)
         self.refresh()
 
+    def on_show(self):
+        self.refresh()
+        self.update_open_slots()
+
+    def show_doctors(self, docs):
+        self.doc_map = {f"{d['doctorName']} ({d['doctorSpecialty']})": d['doctorID'] for d in docs}
+        self.doc_rooms = {d['doctorID']: d['assignedRoom'] for d in docs}
+        self.cb_doc['values'] = list(self.doc_map.keys())
+
     def refresh(self):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        rows = database.fetch_all("""
-            SELECT a.appointmentDate, a.appointmentTime, a.appointmentStatus, d.doctorName, a.roomNumber, p.paymentAmount
+        self.db.load("PatientScreen.refresh", self.fetch_rows, self.show_rows, owner=self,
+                     placeholder=None if len(self.view) else self.tree)
+
+    def fetch_rows(self):
+        return database.fetch_all("""
+            SELECT a.id, a.appointmentDate, a.appointmentTime, a.appointmentStatus, d.doctorName, a.roomNumber, p.paymentAmount
             FROM appointment a JOIN doctor d ON a.doctorID=d.doctorID LEFT JOIN payment p ON a.paymentID=p.paymentID
-            WHERE a.patientID=%s ORDER BY a.appointmentDate DESC
+            WHERE a.patientID=%s ORDER BY a.startsAt DESC
         """, (self.pid,))
+
+    def show_rows(self, rows):
+        view = []
         for r in rows:
             cost = f"${r['paymentAmount']}" if r['paymentAmount'] else "-"
             room = r['roomNumber'] if r['roomNumber'] else "-"
-            self.tree.insert("", "end", values=(
+            view.append((r['id'], (
                 r['appointmentDate'], r['appointmentTime'], r['doctorName'], room, r['appointmentStatus'], cost
-            ))
+            )))
+        self.view.sync(view)
 
-    def book(self):
+    def update_open_slots(self, event=None):
+        if self.cb_doc.get() not in self.doc_map: return
+        room = self.doc_rooms.get(self.doc_map[self.cb_doc.get()])
         try:
-            # 1. Gather Input Data
-            if not self.cb_doc.get():
-                return messagebox.showerror("Error", "Please select a doctor.")
-
-            did = self.doc_map[self.cb_doc.get()]
-            date_str = f"{self.cb_year.get()}-{self.cb_month.get()}-{self.cb_day.get()}"
-            time_str = self.cb_time.get()
-
-            if not time_str:
-                return messagebox.showerror("Error", "Please select a time.")
-
-            # --- LOGIC: LINEAR TIMELINE CHECK ---
-            # "The next appointment cannot be before the one already set."
-
-            # A. Convert user's desired time to a compare-able object
-            new_booking_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
-
-            # B. Get the patient's LATEST active appointment from DB
-            last_appt_rows = database.fetch_all("""
-                SELECT appointmentDate, appointmentTime 
-                FROM appointment 
-                WHERE patientID=%s AND appointmentStatus != 'Cancelled'
-                ORDER BY appointmentDate DESC, appointmentTime DESC 
-                LIMIT 1
-            """, (self.pid,))
-
-            if last_appt_rows:
-                # Parse the database record
-                last_date = last_appt_rows[0]['appointmentDate']  # String: "2025-10-10"
-                last_time = last_appt_rows[0]['appointmentTime']  # String: "09:00 AM"
-
-                # Create a datetime object for the existing appointment
-                last_booking_dt = datetime.strptime(f"{last_date} {last_time}", "%Y-%m-%d %I:%M %p")
-
-                # C. The Comparison: Is the New Date BEHIND the Old Date?
-                if new_booking_dt <= last_booking_dt:
-                    return messagebox.showerror(
-                        "Sequence Error",
-                        f"Impossible Sequence.\n\nYou already have an appointment scheduled for:\n{last_date} at {last_time}\n\nYour next appointment must be AFTER this date."
-                    )
-            # -------------------------------------
-
-            # 2. Check Availability (Standard Check)
-            room = database.fetch_all("SELECT assignedRoom FROM doctor WHERE doctorID=%s", (did,))[0]['assignedRoom']
-            if not database.is_slot_available(room, date_str, time_str):
-                return messagebox.showerror("Unavailable", "Doctor/Room is busy at this time!")
-
-            # 3. Create Payment & Appointment Records
-            pay_id = database.execute_query("INSERT INTO payment (paymentAmount, paymentStatus) VALUES (0, 'Pending')")
-
-            database.execute_query(
-                "INSERT INTO appointment (patientID, doctorID, roomNumber, paymentID, appointmentDate, appointmentTime, appointmentStatus) VALUES (%s, %s, %s, %s, %s, %s, 'Pending')",
-                (self.pid, did, room, pay_id, date_str, time_str)
-            )
-
-            database.set_room_status(room, 'Occupied')
-
-            messagebox.showinfo("Success", "Booking Sent!")
-            self.refresh()
-
+            day = datetime.strptime(f"{self.cb_year.get()}-{self.cb_month.get()}-{self.cb_day.get()}", "%Y-%m-%d").date()
         except ValueError:
-            messagebox.showerror("Error", "Invalid Date selected.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
\ No newline at end of file
+            return
+        if room is None: return
+        self.db.submit("room_availability", occupancy.free_slots, room, day,
+                       owner=self, on_done=self.show_open_slots)
+
+    def show_open_slots(self, free):
+        self.cb_time['values'] = [s.strftime("%I:%M %p") for s in free]
+        if self.cb_time.get() not in self.cb_time['values']:
+            self.cb_time.set("")
+
+    def book(self):
+        # 1. Gather Input Data
+        if self.cb_doc.get() not in self.doc_map:
+            return messagebox.showerror("Error", "Please select a doctor.")
+
+        did = self.doc_map[self.cb_doc.get()]
+        date_str = f"{self.cb_year.get()}-{self.cb_month.get()}-{self.cb_day.get()}"
+        time_str = self.cb_time.get()
+
+        if not time_str:
+            return messagebox.showerror("Error", "Please select a time.")
+
+        # 2. Sequence check, availability and the payment/appointment records (see clinic_service)
+        self.db.submit("book", clinic_service.request_booking, self.pid, did, date_str, time_str, owner=self,
+                       on_done=self.book_done, on_error=self.book_failed)
+
+    def book_done(self, appointment_id):
+        messagebox.showinfo("Success", "Booking Sent!")
+        self.refresh()
+
+    def book_failed(self, error):
+        if isinstance(error, clinic_service.ValidationError):
+            return messagebox.showerror("Error", "Invalid Date selected.")
+        if isinstance(error, clinic_service.SlotUnavailable):
+            self.update_open_slots()  # the list we showed is out of date
+        show_error(error)
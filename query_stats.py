@@ -0,0 +1,257 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# --- CONFIGURATION ---
+SLOW_QUERY_MS = 200  # statements slower than this go to the slow-query log; None = no log
+SLOW_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.log")
+WINDOW = 1000  # most recent timings kept per statement / operation for the percentiles
+
+# Frames in these files are plumbing; the caller is the first frame outside them
+_PLUMBING = {"database.py", "query_stats.py", "contextlib.py", "threading.py", "thread.py"}
+
+
+# --- FINGERPRINTS ---
+_LITERALS = [
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), "?"),  # quoted strings
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # numbers
+    (re.compile(r"%s"), "?"),  # placeholders
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),  # IN (...) / VALUES (...) lists of any length
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """The statement with literals and placeholders replaced, e.g. 'SELECT * FROM patient WHERE patientID=?'."""
+    for pattern, repl in _LITERALS:
+        sql = pattern.sub(repl, sql)
+    return sql.strip()
+
+
+def caller():
+    """'module.Class.method' of the first frame outside the database plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None and os.path.basename(frame.f_code.co_filename) in _PLUMBING:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name).replace('.<locals>', '')}"
+
+
+def _pct(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# --- AGGREGATES ---
+class QueryStats:
+    """
+    Per-statement and per-operation aggregates, fed by database.py for every round trip.
+    An operation is a unit of UI work (an AsyncDB request such as 'book' or
+    'PatientScreen.refresh'); its round trips and DB time are counted while it runs.
+    Thread-safe.
+    """
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, slow_log=SLOW_LOG_PATH, window=WINDOW):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self.window = window
+        self.enabled = True
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._local = threading.local()
+        self.queries = {}  # fingerprint -> aggregate dict
+        self.operations = {}  # operation name -> aggregate dict
+
+    def record(self, sql, elapsed, rows, acquire=0.0, where=None):
+        """One round trip: elapsed/acquire in seconds, rows None when the statement failed."""
+        if not self.enabled:
+            return
+        fp = fingerprint(sql)
+        where = where or caller()
+        op = getattr(self._local, 'op', None)
+        with self._lock:
+            q = self.queries.get(fp)
+            if q is None:
+                q = self.queries[fp] = {'calls': 0, 'errors': 0, 'total': 0.0, 'max': 0.0, 'rows': 0,
+                                        'acquire': 0.0, 'recent': deque(maxlen=self.window), 'callers': Counter()}
+            q['calls'] += 1
+            q['total'] += elapsed
+            q['max'] = max(q['max'], elapsed)
+            q['acquire'] += acquire
+            q['recent'].append(elapsed)
+            q['callers'][where] += 1
+            if rows is None:
+                q['errors'] += 1
+            else:
+                q['rows'] += rows
+        if op is not None:
+            op['round_trips'] += 1
+            op['db_time'] += elapsed + acquire
+        if self.slow_ms is not None and self.slow_log and elapsed * 1000 >= self.slow_ms:
+            self._log_slow(fp, elapsed, acquire, rows, where, op['name'] if op else "-")
+
+    @contextmanager
+    def operation(self, name):
+        """Counts the round trips made on this thread until the block exits."""
+        outer = getattr(self._local, 'op', None)
+        op = self._local.op = {'name': name, 'round_trips': 0, 'db_time': 0.0}
+        started = time.perf_counter()
+        try:
+            yield op
+        finally:
+            self._local.op = outer
+            if self.enabled:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    o = self.operations.get(name)
+                    if o is None:
+                        o = self.operations[name] = {'calls': 0, 'round_trips': 0, 'max_round_trips': 0,
+                                                     'db_time': 0.0, 'total': 0.0,
+                                                     'recent': deque(maxlen=self.window)}
+                    o['calls'] += 1
+                    o['round_trips'] += op['round_trips']
+                    o['max_round_trips'] = max(o['max_round_trips'], op['round_trips'])
+                    o['db_time'] += op['db_time']
+                    o['total'] += elapsed
+                    o['recent'].append(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self.queries.clear()
+            self.operations.clear()
+            self.started = time.time()
+
+    def query_rows(self):
+        """One summary dict per statement, slowest p99 first. Times in ms."""
+        with self._lock:
+            items = [(fp, dict(q, recent=list(q['recent']), callers=q['callers'].most_common(3)))
+                     for fp, q in self.queries.items()]
+        rows = []
+        for fp, q in items:
+            rows.append({
+                'fingerprint': fp, 'calls': q['calls'], 'errors': q['errors'],
+                'avg_ms': q['total'] / q['calls'] * 1000, 'p50_ms': _pct(q['recent'], 50) * 1000,
+                'p95_ms': _pct(q['recent'], 95) * 1000, 'p99_ms': _pct(q['recent'], 99) * 1000,
+                'max_ms': q['max'] * 1000, 'total_ms': q['total'] * 1000,
+                'avg_rows': q['rows'] / max(1, q['calls'] - q['errors']),
+                'avg_acquire_ms': q['acquire'] / q['calls'] * 1000,
+                'callers': q['callers'],
+            })
+        return sorted(rows, key=lambda r: r['p99_ms'], reverse=True)
+
+    def operation_rows(self):
+        """One summary dict per operation, slowest p99 first. Times in ms."""
+        with self._lock:
+            items = [(name, dict(o, recent=list(o['recent']))) for name, o in self.operations.items()]
+        rows = []
+        for name, o in items:
+            rows.append({
+                'operation': name, 'calls': o['calls'],
+                'avg_round_trips': o['round_trips'] / o['calls'], 'max_round_trips': o['max_round_trips'],
+                'avg_db_ms': o['db_time'] / o['calls'] * 1000, 'avg_ms': o['total'] / o['calls'] * 1000,
+                'p95_ms': _pct(o['recent'], 95) * 1000, 'p99_ms': _pct(o['recent'], 99) * 1000,
+            })
+        return sorted(rows, key=lambda r: r['p99_ms'], reverse=True)
+
+    def report(self, top=20):
+        since = datetime.fromtimestamp(self.started).isoformat(timespec='seconds')
+        lines = [f"Query statistics since {since}", "",
+                 f"{'operation':<36}{'calls':>7}{'trips':>7}{'max':>5}{'db ms':>9}{'avg ms':>9}{'p95':>8}{'p99':>8}"]
+        for o in self.operation_rows()[:top]:
+            lines.append(f"{o['operation'][:35]:<36}{o['calls']:>7}{o['avg_round_trips']:>7.1f}{o['max_round_trips']:>5}"
+                         f"{o['avg_db_ms']:>9.1f}{o['avg_ms']:>9.1f}{o['p95_ms']:>8.1f}{o['p99_ms']:>8.1f}")
+        lines += ["", f"{'calls':>7}{'avg ms':>9}{'p95':>8}{'p99':>8}{'max':>8}{'rows':>8}{'acq ms':>8}  statement / callers"]
+        for q in self.query_rows()[:top]:
+            err = f"  [{q['errors']} failed]" if q['errors'] else ""
+            lines.append(f"{q['calls']:>7}{q['avg_ms']:>9.1f}{q['p95_ms']:>8.1f}{q['p99_ms']:>8.1f}{q['max_ms']:>8.1f}"
+                         f"{q['avg_rows']:>8.0f}{q['avg_acquire_ms']:>8.1f}  {q['fingerprint'][:100]}{err}")
+            lines.append(f"{'':>56}  <- {', '.join(f'{c} ({n})' for c, n in q['callers'])}")
+        return "\n".join(lines)
+
+    def dump(self, path, top=50):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.report(top) + "\n")
+
+    # --- internals ---
+    def _log_slow(self, fp, elapsed, acquire, rows, where, op):
+        line = (f"{datetime.now().isoformat(timespec='seconds')}\t{elapsed * 1000:.1f}\t{acquire * 1000:.1f}\t"
+                f"{'-' if rows is None else rows}\t{where}\t{op}\t{fp}\n")
+        try:
+            with self._log_lock, open(self.slow_log, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass  # diagnostics must never break a query
+
+
+class TimedCursor:
+    """Cursor proxy handed out by database.transaction(): every statement is recorded."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, sql, *args):
+        return self._timed(self._cursor.execute, sql, args)
+
+    def executemany(self, sql, *args):
+        return self._timed(self._cursor.executemany, sql, args)
+
+    def _timed(self, run, sql, args):
+        started = time.perf_counter()
+        rows = None
+        try:
+            result = run(sql, *args)
+            rows = self._cursor.rowcount
+            return result
+        finally:
+            self._stats.record(sql, time.perf_counter() - started, rows)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+stats = QueryStats()
+
+
+# --- SLOW LOG SUMMARY ---
+def summarize_slow_log(path, top=20):
+    """Groups a slow-query log by statement: count, median/max ms and the callers."""
+    groups = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) != 7:
+                continue
+            _, ms, _, _, where, op, fp = parts
+            g = groups.setdefault(fp, {'times': [], 'callers': Counter()})
+            g['times'].append(float(ms))
+            g['callers'][f"{where} [{op}]"] += 1
+    lines = [f"{'count':>7}{'p50 ms':>9}{'max ms':>9}  statement / callers"]
+    for fp, g in sorted(groups.items(), key=lambda kv: len(kv[1]['times']), reverse=True)[:top]:
+        lines.append(f"{len(g['times']):>7}{_pct(g['times'], 50):>9.1f}{max(g['times']):>9.1f}  {fp[:100]}")
+        lines.append(f"{'':>25}  <- {', '.join(f'{c} ({n})' for c, n in g['callers'].most_common(3))}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Summarize the slow-query log written by the app.")
+    ap.add_argument("log", nargs="?", default=SLOW_LOG_PATH)
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args()
+    if not os.path.exists(args.log):
+        sys.exit(f"No slow-query log at {args.log} (threshold {SLOW_QUERY_MS} ms).")
+    print(summarize_slow_log(args.log, args.top))
@@ -0,0 +1,152 @@
+import argparse
+import csv
+from datetime import date
+
+import pymysql
+
+import database
+
+# Revenue is reported by the date of the visit (appointmentDate): paymentDate is only set
+# for some bookings, while every payment belongs to a dated appointment (and that column is
+# indexed). Labels never come out NULL, so the WITH ROLLUP grand-total row is the NULL one.
+GROUPINGS = {
+    'day': ("a.appointmentDate", ""),
+    'week': ("DATE_SUB(a.appointmentDate, INTERVAL WEEKDAY(a.appointmentDate) DAY)", ""),  # its Monday
+    'month': ("DATE_FORMAT(a.appointmentDate, '%%Y-%%m')", ""),
+    'doctor': ("COALESCE(d.doctorName, CONCAT('Doctor #', a.doctorID))",
+               "LEFT JOIN doctor d ON d.doctorID = a.doctorID"),
+    'treatment': ("COALESCE(t.treatment, '(no treatment)')",
+                  "LEFT JOIN treatment t ON t.treatmentID = a.treatmentID"),
+    'status': ("COALESCE(pay.paymentStatus, 'Pending')", ""),
+}
+BY_AMOUNT = {'doctor', 'treatment'}  # listed biggest earner first; the others in label (date) order
+
+HISTORY_LIMIT = 500  # newest payments listed in the Transactions tab; Export streams the rest
+EXPORT_COLUMNS = ["paymentID", "visitDate", "paymentDate", "patientName", "doctorName", "treatment",
+                  "paymentAmount", "paymentStatus"]
+
+
+def _range(date_from, date_to):
+    conds, params = [], []
+    if date_from:
+        conds.append("a.appointmentDate >= %s")
+        params.append(str(date_from))
+    if date_to:
+        conds.append("a.appointmentDate <= %s")
+        params.append(str(date_to))
+    return ("WHERE " + " AND ".join(conds)) if conds else "", params
+
+
+def revenue(by="month", date_from=None, date_to=None):
+    """
+    Revenue grouped by day, week, month, doctor, treatment or status, between two visit
+    dates (inclusive, either may be None). One GROUP BY ... WITH ROLLUP query: the server
+    aggregates and only the groups come back.
+    Returns (groups, total); each is a dict with group, payments, paid, outstanding, cancelled.
+    """
+    label, join = GROUPINGS[by]
+    where, params = _range(date_from, date_to)
+    rows = database.fetch_all(f"""
+        SELECT {label} AS grp,
+               COUNT(*) AS payments,
+               COALESCE(SUM(CASE WHEN pay.paymentStatus IN ('Paid', 'Completed') THEN pay.paymentAmount END), 0) AS paid,
+               COALESCE(SUM(CASE WHEN pay.paymentStatus = 'Pending' THEN pay.paymentAmount END), 0) AS outstanding,
+               COALESCE(SUM(pay.paymentStatus = 'Cancelled'), 0) AS cancelled
+        FROM payment pay
+        JOIN appointment a ON a.paymentID = pay.paymentID
+        {join}
+        {where}
+        GROUP BY {label} WITH ROLLUP
+    """, params)
+    total = {'grp': None, 'payments': 0, 'paid': 0, 'outstanding': 0, 'cancelled': 0}
+    groups = []
+    for r in rows:
+        if r['grp'] is None:
+            total = r
+        else:
+            groups.append(r)
+    # WITH ROLLUP guarantees no row order, so sort here rather than trust the grouping order
+    if by in BY_AMOUNT:
+        groups.sort(key=lambda r: r['paid'], reverse=True)
+    else:
+        groups.sort(key=lambda r: r['grp'])
+    return groups, total
+
+
+def payment_history(date_from=None, date_to=None, limit=HISTORY_LIMIT):
+    """The newest payments in the range, for the Transactions list."""
+    where, params = _range(date_from, date_to)
+    return database.fetch_all(f"""
+        SELECT pay.paymentID, pay.paymentDate, a.appointmentDate,
+               pt.patientName, pay.paymentAmount, pay.paymentStatus
+        FROM payment pay
+        JOIN appointment a ON pay.paymentID = a.paymentID
+        JOIN patient pt ON a.patientID = pt.patientID
+        {where}
+        ORDER BY pay.paymentID DESC
+        LIMIT %s
+    """, (*params, limit))
+
+
+def export_payments(path, date_from=None, date_to=None, progress=None, every=10000):
+    """
+    Streams every payment in the range to a CSV file through a server-side cursor
+    (SSDictCursor): rows are written as they arrive, so memory stays flat however
+    many there are. Returns the row count.
+    """
+    where, params = _range(date_from, date_to)
+    conn = database.get_conn()
+    count = 0
+    try:
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cursor, open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            cursor.execute(f"""
+                SELECT pay.paymentID, a.appointmentDate AS visitDate, pay.paymentDate, pt.patientName,
+                       d.doctorName, t.treatment, pay.paymentAmount, pay.paymentStatus
+                FROM payment pay
+                JOIN appointment a ON a.paymentID = pay.paymentID
+                JOIN patient pt ON pt.patientID = a.patientID
+                LEFT JOIN doctor d ON d.doctorID = a.doctorID
+                LEFT JOIN treatment t ON t.treatmentID = a.treatmentID
+                {where}
+            """, params)
+            for row in cursor:
+                writer.writerow(["" if row[c] is None else row[c] for c in EXPORT_COLUMNS])
+                count += 1
+                if progress and count % every == 0:
+                    progress(count)
+    finally:
+        database.release_conn(conn)
+    if progress: progress(count)
+    return count
+
+
+def format_revenue(groups, total, by):
+    lines = [f"{by:<32}{'payments':>10}{'paid':>14}{'outstanding':>14}{'cancelled':>11}"]
+    for r in groups + [dict(total, grp="TOTAL")]:
+        lines.append(f"{str(r['grp'])[:31]:<32}{r['payments']:>10}{r['paid']:>14,.2f}"
+                     f"{r['outstanding']:>14,.2f}{int(r['cancelled']):>11}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Clinic revenue reports.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("revenue", help="revenue grouped in SQL")
+    p.add_argument("--by", choices=list(GROUPINGS), default="month")
+    p.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    p.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    p = sub.add_parser("export", help="stream payments to CSV")
+    p.add_argument("path")
+    p.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    p.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    args = ap.parse_args()
+
+    if args.command == "revenue":
+        groups, total = revenue(args.by, args.date_from, args.date_to)
+        print(format_revenue(groups, total, args.by))
+    else:
+        n = export_payments(args.path, args.date_from, args.date_to,
+                            progress=lambda n: print(f"\r{n:,} rows", end="", flush=True))
+        print(f"\r{n:,} payments written to {args.path}")
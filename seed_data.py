@@ -0,0 +1,302 @@
+import argparse
+import bisect
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import pymysql
+
+import availability
+import daily_load
+import database
+
+# --- VOCABULARY ---
+FIRST_NAMES = ["Adi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hadi", "Indah", "Joko", "Kartika", "Lestari",
+               "Maya", "Nina", "Oki", "Putri", "Rina", "Sari", "Tono", "Umar", "Vina", "Wati", "Yusuf", "Zahra"]
+LAST_NAMES = ["Santoso", "Wijaya", "Halim", "Gunawan", "Pratama", "Kusuma", "Saputra", "Hartono", "Lim", "Tan",
+              "Nugroho", "Setiawan", "Susanto", "Wibowo", "Hidayat", "Utomo"]
+SPECIALTIES = ["General", "Pediatrics", "Dermatology", "Cardiology", "Dentistry", "Orthopedics", "ENT", "Neurology"]
+STAFF_ROLES = ["Nurse", "Nurse", "Nurse", "Receptionist", "Assistant"]
+TREATMENTS = [("General Checkup", 50), ("Blood Test", 35), ("X-Ray", 120), ("Vaccination", 40), ("Dental Cleaning", 80),
+              ("Physiotherapy", 90), ("ECG", 70), ("Minor Surgery", 450), ("Skin Biopsy", 200), ("Consultation", 30)]
+NOTES = ["Follow up in two weeks", "Prescribed medication", "Rest advised", "All clear", "Refer to specialist",
+         "Lab results pending", "Improving", "Dressing changed"]
+
+# --- STATUS MIXES ---
+# Past slots are mostly closed visits; future ones are requests waiting for the front desk or verified.
+# A "Scheduled" visit in the past is one nobody completed (no-show).
+PAST_MIX = [('Completed', 82), ('Cancelled', 13), ('Scheduled', 5)]
+FUTURE_MIX = [('Scheduled', 55), ('Pending', 35), ('Cancelled', 10)]
+FUTURE_DAYS = 60  # how far ahead bookings reach
+FILL = 0.7  # share of a doctor's slots that are booked on a working day
+SPARE_ROOMS = 0.1  # rooms beyond one per doctor, in Maintenance
+
+# Column order of every generated row, i.e. of each table's TSV file
+COLUMNS = {
+    'room': ['roomNumber', 'roomStatus'],
+    'doctor': ['doctorID', 'doctorName', 'doctorSpecialty', 'assignedRoom'],
+    'staff': ['staffID', 'staffName', 'staffRole'],
+    'treatment': ['treatmentID', 'treatment', 'treatmentCost'],
+    'patient': ['patientID', 'patientName', 'patientGender', 'patientBirthDate', 'patientPhoneNumber'],
+    'payment': ['paymentID', 'paymentAmount', 'paymentDate', 'paymentStatus', 'appointmentID'],
+    'appointment': ['id', 'appointmentDate', 'appointmentTime', 'startsAt', 'appointmentStatus', 'patientID',
+                    'doctorID', 'roomNumber', 'treatmentID', 'paymentID', 'staffID', 'doctorNotes'],
+}
+LOAD_ORDER = ['room', 'doctor', 'staff', 'treatment', 'patient', 'payment', 'appointment']
+
+
+def _picker(rng, mix):
+    """Weighted choice over [(value, weight)] with one rng.random() call."""
+    values = [v for v, _ in mix]
+    cumulative, total = [], 0
+    for _, w in mix:
+        total += w
+        cumulative.append(total)
+    return lambda: values[bisect.bisect(cumulative, rng.random() * total)]
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+# --- GENERATION ---
+class Plan:
+    """
+    What to generate. Either give doctors, or give appointments and the doctor count
+    is derived from the years of working days (Mon-Sat) and FILL.
+    Same seed + same today -> byte-identical data.
+    """
+
+    def __init__(self, patients=10000, doctors=None, staff=None, years=3, appointments=None, seed=1, today=None):
+        self.today = today or date.today()
+        self.start = self.today - timedelta(days=round(365.25 * years))
+        self.end = self.today + timedelta(days=FUTURE_DAYS)
+        self.days = [self.start + timedelta(days=i) for i in range((self.end - self.start).days)
+                     if (self.start + timedelta(days=i)).weekday() != 6]
+        per_doctor = len(self.days) * len(availability.SLOTS) * FILL
+        if not doctors:
+            doctors = max(1, math.ceil(appointments / per_doctor)) if appointments else 20
+        self.doctors = doctors
+        self.rooms = self.doctors + math.ceil(self.doctors * SPARE_ROOMS)
+        self.staff = staff or self.doctors  # enough for every room to be verified in the same slot
+        self.patients = patients
+        self.appointments = appointments  # stop after this many (None: fill every day)
+        self.seed = seed
+
+    def estimate(self):
+        return self.appointments or round(self.doctors * len(self.days) * len(availability.SLOTS) * FILL)
+
+    def reference_rows(self):
+        rng = random.Random(f"{self.seed}-reference")
+        rooms = [(r, 'Maintenance' if r > self.doctors else 'Available') for r in range(1, self.rooms + 1)]
+        doctors = [(d, f"Dr. {_name(rng)}", SPECIALTIES[d % len(SPECIALTIES)], d) for d in range(1, self.doctors + 1)]
+        staff = [(s, _name(rng), rng.choice(STAFF_ROLES)) for s in range(1, self.staff + 1)]
+        treatments = [(i, name, cost) for i, (name, cost) in enumerate(TREATMENTS, 1)]
+        return {'room': rooms, 'doctor': doctors, 'staff': staff, 'treatment': treatments}
+
+    def patient_rows(self):
+        rng = random.Random(f"{self.seed}-patients")
+        born_from = date(1940, 1, 1).toordinal()
+        born_span = date(2020, 12, 31).toordinal() - born_from
+        for p in range(1, self.patients + 1):
+            yield (p, _name(rng), rng.choice(('Male', 'Female', 'Female', 'Male', 'Other')),
+                   date.fromordinal(born_from + rng.randrange(born_span)), f"08{rng.randrange(10 ** 10):010d}")
+
+    def appointment_rows(self):
+        """
+        Yields (appointment, payment) row pairs in date order. Every doctor books only
+        their own room, so no two active appointments share a room slot (migration 004);
+        within a slot, patients and verified staff are distinct. Appointment n has payment n.
+        """
+        rng = random.Random(f"{self.seed}-appointments")
+        past, future = _picker(rng, PAST_MIX), _picker(rng, FUTURE_MIX)
+        treatments = [(i, cost) for i, (_, cost) in enumerate(TREATMENTS, 1)]
+        n = 0
+        for day in self.days:
+            status_of = past if day < self.today else future
+            for slot, label in zip(availability.SLOTS, availability.SLOT_LABELS):
+                starts = datetime.combine(day, slot)
+                patients, staff_offset, verified = set(), rng.randrange(self.staff), 0
+                for doctor in range(1, self.doctors + 1):
+                    if rng.random() >= FILL:
+                        continue
+                    patient = rng.randrange(1, self.patients + 1)
+                    while patient in patients and len(patients) < self.patients:
+                        patient = rng.randrange(1, self.patients + 1)
+                    patients.add(patient)
+
+                    status = status_of()
+                    staff = None
+                    if status in ('Scheduled', 'Completed'):
+                        if verified < self.staff:
+                            staff = (staff_offset + verified) % self.staff + 1
+                            verified += 1
+                        else:
+                            status = 'Pending'  # nobody free to verify it
+                    n += 1
+                    treatment = notes = None
+                    if status == 'Completed':
+                        treatment, cost = rng.choice(treatments)
+                        notes = rng.choice(NOTES)
+                        payment = (n, cost, starts, 'Paid', n)
+                    elif status == 'Cancelled':
+                        payment = (n, 0, None, 'Cancelled', n)
+                    else:
+                        booked = day - timedelta(days=rng.randrange(1, 30))
+                        payment = (n, 0, booked, 'Pending', n)
+                    yield (n, day, label, starts, status, patient, doctor, doctor, treatment, n, staff, notes), payment
+                    if n == self.appointments:
+                        return
+
+
+# --- LOADING ---
+def write_tsv(rows, path):
+    """
+    Writes rows in LOAD DATA's default format (tab separated, \\N for NULL) and returns
+    the row count. Generated text never holds tabs, newlines or backslashes, so nothing is escaped.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for row in rows:
+            f.write("\t".join("\\N" if v is None else str(v) for v in row))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def _bulk_connection(local_infile):
+    conn = pymysql.connect(**dict(database.DB_CONFIG, autocommit=False, local_infile=local_infile))
+    with conn.cursor() as cur:
+        # Generated IDs are consistent by construction; skip per-row checks while loading
+        cur.execute("SET SESSION foreign_key_checks=0, unique_checks=0")
+    return conn
+
+
+def load_infile(conn, table, path):
+    with conn.cursor() as cur:
+        cur.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(COLUMNS[table])})", (path,))
+        loaded = cur.rowcount
+    conn.commit()
+    return loaded
+
+
+def load_insert(conn, table, rows, batch_size):
+    """Multi-row INSERTs (pymysql folds each executemany batch into one statement), committed per batch."""
+    sql = f"INSERT INTO {table} ({', '.join(COLUMNS[table])}) VALUES ({', '.join(['%s'] * len(COLUMNS[table]))})"
+    loaded, batch = 0, []
+    with conn.cursor() as cur:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                loaded += cur.executemany(sql, batch)
+                conn.commit()
+                batch = []
+        if batch:
+            loaded += cur.executemany(sql, batch)
+            conn.commit()
+    return loaded
+
+
+def _split(pairs, chunk):
+    """Splits the (appointment, payment) stream into chunk-sized lists of each."""
+    appts, pays = [], []
+    for appt, pay in pairs:
+        appts.append(appt)
+        pays.append(pay)
+        if len(appts) >= chunk:
+            yield appts, pays
+            appts, pays = [], []
+    if appts:
+        yield appts, pays
+
+
+def seed(plan, method="infile", reset=False, chunk=500000, batch_size=5000, out_dir=None, log=print):
+    """
+    Generates plan and loads it into DB_CONFIG's database (or only writes the TSV
+    files into out_dir when given). Refuses to load into a non-empty appointment
+    table unless reset=True, which empties every table first. The daily load summary
+    tables are rebuilt afterwards. Returns {table: rows}.
+    """
+    counts = {}
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = out_dir or tmp
+        conn = None if out_dir else _bulk_connection(method == "infile")
+        try:
+            if conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) AS n FROM appointment")
+                    existing = cur.fetchone()['n']
+                    if existing and not reset:
+                        raise SystemExit(f"appointment already holds {existing} rows; use --reset to replace them.")
+                    if reset:
+                        for table in reversed(LOAD_ORDER):
+                            cur.execute(f"TRUNCATE TABLE {table}")
+
+            def put(table, rows, part=0):
+                if method == "infile" or out_dir:
+                    path = os.path.join(folder, f"{table}.{part}.tsv" if part else f"{table}.tsv")
+                    n = write_tsv(rows, path)
+                    if conn:
+                        n = load_infile(conn, table, path)
+                        os.remove(path)
+                else:
+                    n = load_insert(conn, table, rows, batch_size)
+                counts[table] = counts.get(table, 0) + n
+
+            for table, rows in plan.reference_rows().items():
+                put(table, rows)
+            put('patient', plan.patient_rows())
+            log(f"reference data and {plan.patients} patients in {time.perf_counter() - started:.1f}s")
+
+            for part, (appts, pays) in enumerate(_split(plan.appointment_rows(), chunk), 1):
+                put('payment', pays, part)
+                put('appointment', appts, part)
+                elapsed = time.perf_counter() - started
+                log(f"  {counts['appointment']:>11,} appointments  {counts['appointment'] / elapsed:>9,.0f}/s")
+
+            if conn:
+                with conn.cursor() as cur:
+                    cur.execute("ANALYZE TABLE appointment, payment, patient")
+                    cur.fetchall()
+        finally:
+            if conn:
+                conn.close()
+    if not out_dir:
+        # The bulk load bypasses clinic_service, so the daily load counters are recounted
+        counts.update(daily_load.rebuild())
+    database.invalidate_reference()
+    log(f"done in {time.perf_counter() - started:.1f}s: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Generate and bulk-load a deterministic multi-year clinic dataset.")
+    ap.add_argument("--patients", type=int, default=10000)
+    ap.add_argument("--doctors", type=int, help="default: enough for --appointments, else 20")
+    ap.add_argument("--staff", type=int, help="default: one per doctor")
+    ap.add_argument("--years", type=float, default=3, help="history before --today")
+    ap.add_argument("--appointments", type=int, help="stop after this many, e.g. 10000000")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--today", type=date.fromisoformat, help="YYYY-MM-DD the data is relative to (default: today)")
+    ap.add_argument("--method", choices=["infile", "insert"], default="infile",
+                    help="LOAD DATA LOCAL INFILE (needs local_infile=ON on the server) or multi-row INSERT")
+    ap.add_argument("--chunk", type=int, default=500000, help="appointments per LOAD DATA file / progress line")
+    ap.add_argument("--database", help="schema to load into (default: DB_CONFIG)")
+    ap.add_argument("--reset", action="store_true", help="empty all clinic tables first")
+    ap.add_argument("--out", help="only write the TSV files into this directory")
+    args = ap.parse_args()
+
+    if args.database:
+        database.DB_CONFIG['database'] = args.database
+    plan = Plan(args.patients, args.doctors, args.staff, args.years, args.appointments, args.seed, args.today)
+    print(f"{plan.doctors} doctors, {plan.rooms} rooms, {plan.staff} staff, {plan.patients} patients, "
+          f"{plan.start} .. {plan.end}, ~{plan.estimate():,} appointments")
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    seed(plan, args.method, args.reset, args.chunk, out_dir=args.out)
@@ -0,0 +1,73 @@
+class KeyedTree:
+    """
+    Keeps a ttk.Treeview in step with a keyed result set without rebuilding it.
+
+    sync() diffs the new rows against what is on screen and only touches rows
+    that were added, removed, changed or moved. Row ids stay stable, so the
+    selection and the scroll position survive a refresh.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._values = {}  # iid -> values tuple currently shown
+        self._order = []   # iids in display order
+
+    def sync(self, rows):
+        """rows: iterable of (key, values) in the order they should be shown."""
+        tree = self.tree
+        new_order, new_values = [], {}
+        for key, values in rows:
+            iid = str(key)
+            if iid in new_values:
+                continue  # first occurrence wins, like a primary key
+            new_order.append(iid)
+            new_values[iid] = tuple(values)
+
+        first, _ = tree.yview()
+
+        # 1. Removed rows
+        gone = [iid for iid in self._order if iid not in new_values]
+        if gone:
+            tree.delete(*gone)
+
+        # 2. Changed rows
+        for iid, values in new_values.items():
+            old = self._values.get(iid)
+            if old is not None and old != values:
+                tree.item(iid, values=values)
+
+        # 3. New and moved rows
+        survivors = [iid for iid in self._order if iid in new_values]
+        if survivors == [iid for iid in new_order if iid in self._values]:
+            # Relative order unchanged: just slot the new rows into place
+            for index, iid in enumerate(new_order):
+                if iid not in self._values:
+                    tree.insert("", index, iid=iid, values=new_values[iid])
+        else:
+            for index, iid in enumerate(new_order):
+                if iid in self._values:
+                    tree.move(iid, "", index)
+                else:
+                    tree.insert("", index, iid=iid, values=new_values[iid])
+
+        self._order, self._values = new_order, new_values
+        tree.yview_moveto(first)
+
+    def append(self, rows):
+        """Adds rows after the ones already shown (e.g. the next page). Known keys are skipped."""
+        for key, values in rows:
+            iid = str(key)
+            if iid in self._values:
+                continue
+            values = tuple(values)
+            self.tree.insert("", "end", iid=iid, values=values)
+            self._order.append(iid)
+            self._values[iid] = values
+
+    def clear(self):
+        if self._order:
+            self.tree.delete(*self._order)
+        self._order, self._values = [], {}
+
+    def __len__(self):
+        return len(self._order)
@@ -0,0 +1,23 @@
+import importlib
+
+# --- VIEW REGISTRY ---
+# Screens are addressed by name and their modules are imported on first navigation,
+# so startup only pays for the landing page (database/pymysql, PIL and the
+# admin/patient/doctor screens load when they are first needed).
+VIEWS = {
+    'landing': ('landing_page', 'ClinicLandingPage'),
+    'login': ('login_view', 'LoginScreen'),
+    'patient': ('patient_view', 'PatientScreen'),
+    'doctor': ('doctor_view', 'DoctorScreen'),
+    'admin': ('admin', 'AdminScreen'),
+}
+
+
+def view_class(view):
+    """Resolves a registry name to its view class (classes are passed through)."""
+    if not isinstance(view, str):
+        return view
+    if view not in VIEWS:
+        raise KeyError(f"Unknown view '{view}'. Known views: {', '.join(VIEWS)}")
+    module, name = VIEWS[view]
+    return getattr(importlib.import_module(module), name)